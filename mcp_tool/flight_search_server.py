@@ -2,7 +2,11 @@ import sys
 import os
 import logging
 import asyncio
+import atexit
 import inspect
+import json
+import threading
+import time
 from typing import Annotated
 
 from pydantic import BaseModel, Field
@@ -10,12 +14,12 @@ from pydantic import BaseModel, Field
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
-from datetime import datetime
+from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor
 from contextlib import redirect_stdout
 from bs4 import BeautifulSoup
 from seleniumbase import SB
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 # --- Configure Logging to use STDERR ---
 logging.basicConfig(
     level=logging.INFO,
@@ -26,12 +30,38 @@ logger = logging.getLogger(__name__)
 try:
     from scrapper.mmt import mmt_scrap
     from scrapper.mmt import data_extraction as mmt_data_extraction
+    from scrapper.mmt import mmt_http
+    from scrapper.mmt import mmt_tab
     
     from scrapper.ixigo import ixigo_scrap
     from scrapper.ixigo import data_extraction as ixigo_data_extraction
+    from scrapper.ixigo import ixigo_http
+    from scrapper.ixigo import ixigo_tab
 
     from scrapper.expedia import expedia_scrap
     from scrapper.expedia import data_extraction as expedia_data_extraction
+    from scrapper.expedia import expedia_http
+    from scrapper.expedia import expedia_tab
+
+    from scrapper.browser_pool import BrowserPool
+    from scrapper.cancellation import CancelToken
+    from scrapper.circuit_breaker import CLOSED, EMPTY, FAILURE, SUCCESS, CircuitBreakers
+    from scrapper.provider_stats import ADAPTIVE_SELECTION, ProviderStats
+    from scrapper.hedging import HEDGE_DEFAULT, Hedger
+    from scrapper.itineraries import rank_itineraries
+    from scrapper.fares import cheapest_flights, fastest_flight, flight_minutes, parse_price
+    from scrapper.batch import BATCH_DIR, BATCH_LANES, BATCH_RETRIES, BatchCheckpoint, load_queries, query_id
+    from scrapper.jobs import CANCELLED, JobStore, TooManyJobs
+    from scrapper.result_cache import ResultCache
+    from scrapper.prefetch import Prefetcher, RoutePopularity
+    from scrapper.capture import new_request_id
+    from scrapper.concurrency import BACKGROUND, BATCH, INTERACTIVE, AdaptiveLimiter
+    from scrapper.http_fetch import HTTP_CONCURRENCY
+    from scrapper.rate_limit import ProviderRateLimiter, RateLimited
+    from scrapper.profiles import BROWSER_PROFILES, ProfilePool
+    from scrapper.readiness import wait_timings
+    from scrapper.tab_engine import tab_engine
+    from scrapper.worker_pool import WorkerPool
 
     functions = [name for name, obj in inspect.getmembers(mmt_scrap) if inspect.isfunction(obj)]
     logger.info(f"Functions found in mmt_scrap: {functions}")
@@ -43,20 +73,47 @@ except Exception as e:
 #from scrapper.mmt.mmt_scrap import scrap_sb_sync
 #from scrapper.mmt.data_extraction import get_flights
 
+# Providers fetched over plain HTTP instead of a browser, e.g. FLIGHT_HTTP_PROVIDERS="mmt,expedia"
+HTTP_PROVIDERS = {p.strip() for p in os.getenv("FLIGHT_HTTP_PROVIDERS", "").split(",") if p.strip()}
+# Providers scraped in tabs of one shared browser from the event loop, e.g. FLIGHT_TAB_PROVIDERS="ixigo"
+TAB_PROVIDERS = {p.strip() for p in os.getenv("FLIGHT_TAB_PROVIDERS", "").split(",") if p.strip()}
+
 registry = {
             "mmt": {
                 "scrap": mmt_scrap.scrap_data,
+                "fetch": mmt_http.fetch_data,
+                "tab": mmt_tab.scrap_data,
                 "parse": mmt_data_extraction.parse_flight_data
             },
             "ixigo": {
                 "scrap": ixigo_scrap.scrap_data,
+                "fetch": ixigo_http.fetch_data,
+                "tab": ixigo_tab.scrap_data,
                 "parse": ixigo_data_extraction.parse_flight_data
             },
             "expedia": {
                 "scrap": expedia_scrap.scrap_data,
+                "fetch": expedia_http.fetch_data,
+                "tab": expedia_tab.scrap_data,
                 "parse": expedia_data_extraction.parse_flight_data
             }
         }
+for key, entry in registry.items():
+    if key in HTTP_PROVIDERS:
+        entry["mode"] = "http"
+    elif key in TAB_PROVIDERS:
+        entry["mode"] = "tab"
+    else:
+        entry["mode"] = "browser"
+
+def source_names(source):
+    """A tool's ``source`` as a list of names; a JSON query may give one provider as a plain string."""
+    return [source] if isinstance(source, str) else list(source)
+
+def provider_keys(source):
+    """Registry keys selected by ``source``: every provider for "all", otherwise the known names in it."""
+    names = source_names(source)
+    return list(registry.keys()) if "all" in names else [name for name in names if name in registry]
 
 
 mcp = FastMCP("FlightSearch")
@@ -74,8 +131,330 @@ mcp = FastMCP("FlightSearch")
 # END_DURATION_SELECTOR = 'div[class*="timeInfoRight"]'
 # PRICE_SELECTOR = 'div[class*="priceSection"]'
 
-# Thread pool executor for blocking operations
-executor = ThreadPoolExecutor(max_workers=2)
+# --- Concurrency ---
+# In-flight browser and tab scrapes; the limit adapts to latency, free memory and
+# load between FLIGHT_CONCURRENCY_MIN and FLIGHT_CONCURRENCY_MAX, excess scrapes queue
+scrape_limiter = AdaptiveLimiter()
+SCRAPE_WORKERS = scrape_limiter.limit
+# HTTP fetches get a fixed number of slots (FLIGHT_HTTP_CONCURRENCY) shared out by
+# the same priority classes, so batches and prefetch do not crowd out live searches
+http_limiter = AdaptiveLimiter(floor=HTTP_CONCURRENCY, ceiling=HTTP_CONCURRENCY, initial=HTTP_CONCURRENCY,
+                               memory_probe=None, load_probe=None)
+# Token buckets per provider (FLIGHT_RATE_LIMIT / FLIGHT_RATE_BURST, or FLIGHT_RATE_<PROVIDER>)
+# so bursts of searches do not get us throttled or served CAPTCHAs
+rate_limiter = ProviderRateLimiter()
+# Providers that keep failing or returning nothing are skipped until a probe succeeds
+circuit_breakers = CircuitBreakers()
+# Per-provider, per-route latency, yield and cheapest-fare history behind the
+# fast-subset-first selection for source=["all"]
+provider_stats = ProviderStats()
+# Second attempts for provider scrapes running past their usual (percentile) latency
+hedger = Hedger()
+# Searches submitted with submit_flight_search, polled with get_search_status / get_search_results
+job_store = JobStore()
+# Parsed flights per provider/route/date, served for FLIGHT_CACHE_TTL_SECONDS without a scrape
+result_cache = ResultCache()
+# Route/date popularity learned from searches; hot entries are refreshed in idle capacity
+route_popularity = RoutePopularity()
+
+# --- Browser pool ---
+BROWSER_POOL_SIZE = int(os.getenv("FLIGHT_BROWSER_POOL_SIZE", str(SCRAPE_WORKERS)))
+BROWSER_MAX_USES = int(os.getenv("FLIGHT_BROWSER_MAX_USES", "20"))
+BROWSER_MAX_RSS_MB = int(os.getenv("FLIGHT_BROWSER_MAX_RSS_MB", "1500"))
+# Set FLIGHT_PROCESS_WORKERS=0 to scrape on in-process threads instead of worker processes
+PROCESS_WORKERS = os.getenv("FLIGHT_PROCESS_WORKERS", "1") == "1"
+WORKER_JOB_TIMEOUT = float(os.getenv("FLIGHT_WORKER_JOB_TIMEOUT", "120"))
+WORKERS_MAX_RSS_MB = int(os.getenv("FLIGHT_WORKERS_MAX_RSS_MB", "4000"))
+# A provider that has not returned by then is cancelled down to its browser
+PROVIDER_TIMEOUT = float(os.getenv("FLIGHT_PROVIDER_TIMEOUT", "150"))
+
+# Thread pool executor for blocking operations (scrapes up to the ceiling, plus parsing)
+executor = ThreadPoolExecutor(max_workers=scrape_limiter.ceiling + 2)
+
+# Warm undetected-chrome sessions leased to every provider scrape
+browser_pool = BrowserPool(
+    size=BROWSER_POOL_SIZE,
+    max_size=max(BROWSER_POOL_SIZE, scrape_limiter.ceiling),
+    max_uses=BROWSER_MAX_USES,
+    max_rss_mb=BROWSER_MAX_RSS_MB,
+    # Per-provider persistent profiles keep the HTTP cache and consent cookies warm
+    profiles=ProfilePool() if BROWSER_PROFILES else None,
+)
+BROWSER_PROVIDERS = [key for key, entry in registry.items() if entry["mode"] == "browser"]
+
+# Supervised worker processes, each with its own warm browser; hung scrapes are killed
+worker_pool = WorkerPool(
+    size=SCRAPE_WORKERS,
+    max_size=scrape_limiter.ceiling,
+    job_timeout=WORKER_JOB_TIMEOUT,
+    max_total_rss_mb=WORKERS_MAX_RSS_MB,
+    pool_options={"max_uses": BROWSER_MAX_USES, "max_rss_mb": BROWSER_MAX_RSS_MB,
+                  "profiles": BROWSER_PROFILES},
+)
+
+def scrap_with_pooled_browser(scrap, origin, destination, travel_date, request_id, provider=None, cancel=None):
+    """Runs a provider scraper on a browser leased from the pool (on that provider's profile)."""
+    with browser_pool.lease(provider=provider, cancel=cancel) as sb:
+        return scrap(origin, destination, travel_date, sb=sb, request_id=request_id, cancel=cancel)
+
+async def await_off_loop(future, on_cancel):
+    """
+    Awaits a scrape running off the event loop. If the awaiting task is cancelled
+    (the MCP client gave up, or a timeout) ``on_cancel`` stops the scrape so its
+    browser or worker is freed instead of finishing abandoned work.
+    """
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        on_cancel()
+        raise
+
+# Run Scraper (or HTTP fetch); the captured page is handed to the parser in memory.
+# HTTP and tab scrapes are coroutines, so cancelling the caller cancels them directly.
+# Every scrape queues for a slot in its ``priority`` class (interactive, batch, background):
+# HTTP fetches on http_limiter, browser and tab scrapes on scrape_limiter.
+def limiter_for(key):
+    return http_limiter if registry[key]["mode"] == "http" else scrape_limiter
+
+async def scrape_source(key, origin, destination, travel_date, request_id, priority=INTERACTIVE,
+                        on_admitted=None):
+    """Queues for a slot and a rate limit token, then scrapes; ``on_admitted()`` is called in between."""
+    limiter = limiter_for(key)
+    await limiter.acquire(priority)
+    elapsed = None
+    try:
+        # The rate limit token is taken once the slot is ours, so scrapes released together
+        # after a long queue still reach the provider no faster than its rate. The slot is
+        # held meanwhile, for at most FLIGHT_RATE_MAX_WAIT. Background scrapes only take a
+        # token when the provider's bucket is full.
+        await rate_limiter.acquire(key, spare_only=priority == BACKGROUND)
+        if on_admitted is not None:
+            on_admitted()
+        start = limiter.clock()
+        if registry[key]["mode"] == "http":
+            scrape = registry[key]["fetch"](
+                origin, destination, travel_date, request_id=f"{request_id}-{key}"
+            )
+        else:
+            scrape = scrape_in_browser(key, origin, destination, travel_date, request_id)
+        # PROVIDER_TIMEOUT runs from here: time queued on our side is not the provider's fault
+        scraped = await asyncio.wait_for(scrape, PROVIDER_TIMEOUT)
+        # Only the scrape itself is a latency sample for the limiter, not the token wait
+        elapsed = limiter.clock() - start
+        return scraped
+    finally:
+        limiter.release(key, elapsed)
+
+async def scrape_in_browser(key, origin, destination, travel_date, request_id):
+    if registry[key]["mode"] == "tab":
+        return await registry[key]["tab"](
+            origin, destination, travel_date, request_id=f"{request_id}-{key}"
+        )
+    if PROCESS_WORKERS:
+        # Workers run scrapper.scrape_worker, which maps ``key`` to the same scraper
+        future = worker_pool.submit(
+            key, origin, destination, travel_date, request_id=f"{request_id}-{key}"
+        )
+        return await await_off_loop(future, lambda: worker_pool.cancel(future))
+    cancel = CancelToken()
+    future = executor.submit(
+        scrap_with_pooled_browser,
+        registry[key]["scrap"],
+        origin,
+        destination,
+        travel_date,
+        f"{request_id}-{key}",
+        key,
+        cancel
+    )
+    return await await_off_loop(future, cancel.cancel)
+
+async def search_provider(key, origin, destination, travel_date, request_id, hedge=False, priority=INTERACTIVE,
+                          use_cache=True, record=True):
+    """
+    Scrapes then parses one provider behind its circuit breaker, hedging the
+    scrape if asked; fresh cached flights are returned without a scrape when
+    ``use_cache``. With ``record=False`` (prefetch) the scrape only runs while
+    the circuit is closed and its outcome and latency are kept out of the
+    breaker and the hedging history. Returns ``(flights, status)``; ``status``
+    says what happened for the response, with ``scrape_s`` once a scrape started.
+    """
+    cached = result_cache.get(key, origin, destination, travel_date) if use_cache else None
+    if cached is not None:
+        flights, age = cached
+        return flights, {"status": "ok", "flights": len(flights), "cached": True, "age_s": round(age, 1)}
+    breaker = circuit_breakers.get(key)
+    if not (breaker.allow() if record else breaker.state == CLOSED):
+        logger.info(f"{key} skipped, circuit open ({request_id}).")
+        return [], {"status": "circuit_open",
+                    "detail": f"{breaker.reason}; retrying in {breaker.retry_in():.0f}s"}
+    admitted = []  # when each attempt got its scrape slot and rate limit token
+    def attempt(on_admitted=None):
+        def started():
+            admitted.append(time.monotonic())
+            if on_admitted is not None:
+                on_admitted()
+        return scrape_source(key, origin, destination, travel_date, request_id, priority, started)
+    flights, outcome = [], None
+    try:
+        try:
+            # No hedge while others queue for slots: it would take one of theirs
+            busy = lambda: limiter_for(key).queued > 0
+            scraped = await (hedger.run(key, attempt, hedge, busy) if record else attempt())
+        except asyncio.TimeoutError:
+            outcome = FAILURE
+            logger.warning(f"{key} did not finish within {PROVIDER_TIMEOUT:.0f}s ({request_id}); cancelled.")
+            status = {"status": "timeout", "detail": f"no result within {PROVIDER_TIMEOUT:.0f}s"}
+        except RateLimited as e:
+            logger.warning(f"{key} skipped by its rate limit ({request_id}): {e}")
+            status = {"status": "rate_limited", "detail": str(e)}
+        else:
+            # Run Parser
+            data = []
+            if scraped is not None:
+                data = await asyncio.get_running_loop().run_in_executor(executor, registry[key]["parse"], scraped)
+            if data and isinstance(data, list):
+                for flight in data:
+                    flight["provider"] = key
+                outcome = SUCCESS
+                result_cache.put(key, origin, destination, travel_date, data)
+                flights, status = data, {"status": "ok", "flights": len(data)}
+            else:
+                outcome = EMPTY
+                status = {"status": "empty", "flights": 0}
+    except Exception as e:
+        outcome = FAILURE
+        logger.error(f"Error processing {key} ({request_id}): {e}")
+        status = {"status": "error", "detail": str(e)}
+    finally:
+        if record and outcome is None:
+            breaker.abandon()
+        elif record:
+            breaker.record(outcome)
+    if admitted:
+        # Scrape and parse time, without the time queued on our side
+        status["scrape_s"] = round(time.monotonic() - admitted[0], 2)
+    return flights, status
+
+async def search_providers(keys, origin, destination, travel_date, request_id, hedge=False, deadline=None,
+                           progress=None, priority=INTERACTIVE):
+    """
+    Searches ``keys`` concurrently; returns provider -> (flights, status) with
+    each search's latency. Providers still running at ``deadline`` (event loop
+    time) are cancelled and reported as such. ``progress(key, flights, status)``
+    (a function or coroutine function) is called as each provider starts and finishes.
+    """
+    async def timed(key):
+        start = time.monotonic()
+        await report(key, [], {"status": "running"})
+        flights, status = await search_provider(key, origin, destination, travel_date, request_id, hedge,
+                                                priority)
+        if status["status"] != "circuit_open":
+            status["elapsed_s"] = round(time.monotonic() - start, 2)
+        await report(key, flights, status)
+        return flights, status
+    async def report(key, flights, status):
+        if progress:
+            reported = progress(key, flights, status)
+            if inspect.isawaitable(reported):
+                await reported
+    if not keys:
+        return {}
+    tasks = {key: asyncio.ensure_future(timed(key)) for key in keys}
+    timeout = None if deadline is None else max(0.0, deadline - asyncio.get_running_loop().time())
+    try:
+        done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    results = {}
+    for key, task in tasks.items():
+        if task in done:
+            results[key] = task.result()
+        else:
+            logger.warning(f"{key} missed the deadline ({request_id}); cancelled.")
+            results[key] = ([], {"status": "cancelled", "detail": "still running at the deadline"})
+    return results
+
+async def search_route(keys, origin, destination, travel_date, request_id, adaptive=False,
+                       hedge=False, deadline_ms=0, deadline=None, progress=None, priority=INTERACTIVE):
+    """
+    Searches one route. With ``adaptive``, providers the history says are
+    slow and not needed are only queried if the others come back thin. With
+    ``deadline_ms`` (or an absolute event loop ``deadline`` shared by a larger
+    job), whatever has not returned by then is cancelled. ``progress`` and
+    the scrape ``priority`` class are passed on to search_providers.
+    Returns ``(flights, providers)`` for format_search_response.
+    """
+    loop = asyncio.get_running_loop()
+    if deadline is None and deadline_ms:
+        deadline = loop.time() + deadline_ms / 1000
+    route = provider_stats.route(origin, destination)
+    first, fallback = provider_stats.plan(keys, route) if adaptive else (keys, [])
+    results = await search_providers(first, origin, destination, travel_date, request_id, hedge, deadline,
+                                     progress, priority)
+    found = sum(len(flights) for flights, _ in results.values())
+    if fallback and found < provider_stats.min_flights and (deadline is None or loop.time() < deadline):
+        logger.info(f"{found} flights from {first} ({request_id}); adding {fallback}.")
+        results.update(await search_providers(fallback, origin, destination, travel_date, request_id,
+                                              hedge, deadline, progress, priority))
+    else:
+        detail = (f"{found} flights from faster providers were enough" if found >= provider_stats.min_flights
+                  else "deadline reached before it was needed")
+        for key in fallback:
+            results[key] = ([], {"status": "skipped", "detail": detail})
+    provider_stats.record_search(route, results)
+    flights = [flight for key in keys for flight in results[key][0]]
+    providers = {key: results[key][1] for key in keys}
+    return flights, providers
+
+async def prefetch_route(key, origin, destination, travel_date):
+    """
+    Refreshes one provider's cached flights for a popular route at background
+    priority, on spare rate limit tokens and without touching its circuit breaker.
+    """
+    _, status = await search_provider(key, origin, destination, travel_date, f"prefetch-{new_request_id()}",
+                                      priority=BACKGROUND, use_cache=False, record=False)
+    logger.info(f"Prefetched {key} {origin}-{destination} on {travel_date}: {status['status']}")
+    return status["status"] in ("ok", "empty")
+
+# Keeps the hottest routes cached, refreshing entries a quarter of the TTL before they expire
+prefetcher = Prefetcher(
+    route_popularity,
+    refresh=prefetch_route,
+    cache_age=result_cache.age,
+    # No scrape queued and no HTTP search in flight (those never enter scrape_limiter)
+    is_idle=lambda: scrape_limiter.idle and not http_limiter.in_flight,
+    refresh_after=result_cache.ttl * 0.75,
+)
+
+def stream_partial_results(ctx, total):
+    """
+    Progress callback that sends each provider's flights to the MCP client as
+    soon as that provider finishes: a progress notification (when the client
+    asked for progress) and a log notification carrying the partial JSON.
+    """
+    finished = []
+    async def send(key, flights, status):
+        if status["status"] in ("pending", "running"):
+            return
+        finished.append(key)
+        try:
+            await ctx.report_progress(len(finished), total, f"{key}: {status['status']}, {len(flights)} flights")
+            await ctx.log("info", json.dumps({"provider": key, "status": status, "flights": flights}),
+                          logger_name="flight_search.partial")
+        except Exception as e:
+            logger.warning(f"Could not stream {key} results to the client: {e}")
+    return send
+
+def format_search_response(flights, providers):
+    """JSON returned by the search tools: the flights plus how each provider fared."""
+    response = {"flights": flights, "providers": providers}
+    if not flights:
+        response["message"] = "No flights found across the selected sources."
+    return json.dumps(response, indent=2)
 
 # def scrap_sb_sync(origin, destination, travel_date):
 #     """Synchronous scraping function to run in thread"""
@@ -247,6 +626,17 @@ class FlightSearchInput(BaseModel):
     travel_date: str = Field( description="Travel date in DD/MM/YYYY format (e.g., '28/12/2025')")
     source: list = Field(default=["all"], description="a list containing following options mmt, expedia,ixigo  or all ")
 
+class FlightLeg(BaseModel):
+    origin: str = Field(description="IATA airport code for origin (e.g., 'LKO')")
+    destination: str = Field(description="IATA airport code for destination (e.g., 'IXL')")
+    travel_date: str = Field(description="Travel date in DD/MM/YYYY format (e.g., '28/12/2025')")
+
+# Legs one multi-city search may plan (itineraries are combined across all of them)
+MAX_LEGS = 6
+# Days one search_flights_range call may cover, and how many of them are searched at once
+RANGE_MAX_DAYS = int(os.getenv("FLIGHT_RANGE_MAX_DAYS", "31"))
+RANGE_PARALLELISM = int(os.getenv("FLIGHT_RANGE_PARALLELISM", "3"))
+
 
 # @mcp.tool( name="search_mmt_flights", description="Searches for available flights between two airports on a specific date using give source website expedia,ixigo or mmt(Makemytrip website) or all if source is all.")
 # async def search_flights(
@@ -305,80 +695,444 @@ class FlightSearchInput(BaseModel):
 
 @mcp.tool(
     name="search_flights", 
-    description="Searches for flights on mmt, ixigo, or expedia concurrently."
+    description="Searches for flights on mmt, ixigo, or expedia concurrently. Returns JSON with the "
+                "`flights` and a `providers` entry per source saying whether it returned flights or was "
+                "empty, failed, timed out, rate limited, skipped because its circuit is open, or skipped "
+                "because with source ['all'] faster providers already returned enough flights, or cancelled "
+                "at the deadline_ms deadline; flights served from the cache are marked cached with their age_s. With stream=true each provider's flights are also sent as a "
+                "progress and log notification (logger flight_search.partial) as soon as it finishes."
 )
 async def search_flights(
     origin: str = Field(description="IATA airport code for origin (e.g., 'LKO')"),
     destination: str = Field(description="IATA airport code for destination (e.g., 'IXL')"),
     travel_date: str = Field(description="Travel date in DD/MM/YYYY format (e.g., '28/12/2025')"),
-    source: list = Field(default=["all"], description="List containing: mmt, expedia, ixigo, or all")
+    source: list = Field(default=["all"], description="List containing: mmt, expedia, ixigo, or all"),
+    deadline_ms: int = Field(default=0, description="Return after this many milliseconds with whatever providers finished; late ones are cancelled. 0 waits for every provider"),
+    hedge: bool = Field(default=HEDGE_DEFAULT, description="Start a second attempt for a provider running longer than usual and take whichever returns first"),
+    stream: bool = Field(default=False, description="Send each provider's flights as a progress/log notification as soon as it finishes, before the full result"),
+    ctx: Context = None
 ) -> str:
-    logger.info(f"Concurrent search: {origin} to {destination} on {travel_date} via {source}")
+    request_id = new_request_id()
+    logger.info(f"Concurrent search {request_id}: {origin} to {destination} on {travel_date} via {source}")
     
     try:
         required_date_format = convert_to_date_std(travel_date)
         travel_date_str = required_date_format.strftime("%d/%m/%Y")
-        loop = asyncio.get_event_loop()
 
-        registry = {
-            "mmt": {
-                "scrap": mmt_scrap.scrap_data,
-                "parse": mmt_data_extraction.parse_flight_data
-            },
-            # "ixigo": {
-            #     "scrap": ixigo_scrap.scrap_data,
-            #     "parse": ixigo_data_extraction.parse_flight_data
-            # },
-            # "expedia": {
-            #     "scrap": expedia_scrap.scrap_data,
-            #     "parse": expedia_data_extraction.parse_flight_data
-            # }
+        keys_to_process = provider_keys(source)
+
+        if not keys_to_process:
+            return "Error: No valid sources provided."
+
+        route_popularity.record(origin, destination, travel_date_str, keys_to_process)
+        prefetcher.start()
+        flights, providers = await search_route(
+            keys_to_process, origin, destination, travel_date_str, request_id,
+            adaptive=ADAPTIVE_SELECTION and "all" in source_names(source), hedge=hedge, deadline_ms=deadline_ms,
+            progress=stream_partial_results(ctx, len(keys_to_process)) if stream and ctx else None
+        )
+        return format_search_response(flights, providers)
+        
+    except Exception as e:
+        logger.error(f"Fatal tool error: {e}", exc_info=True)
+        return f"Error executing search: {str(e)}"
+
+async def run_search_job(job, keys, origin, destination, travel_date, adaptive, hedge, deadline_ms):
+    """Runs a submitted search in the background, recording progress on ``job``."""
+    try:
+        _, providers = await search_route(
+            keys, origin, destination, travel_date, job.job_id, adaptive=adaptive, hedge=hedge,
+            deadline_ms=deadline_ms, progress=job.progress
+        )
+        job.finish(providers)
+    except asyncio.CancelledError:
+        job.finish(error="search was cancelled", state=CANCELLED)
+        raise
+    except Exception as e:
+        logger.error(f"Search job {job.job_id} failed: {e}", exc_info=True)
+        job.finish(error=str(e))
+
+@mcp.tool(
+    name="submit_flight_search",
+    description="Starts a one-way flight search in the background and returns a job_id immediately. Poll it "
+                "with get_search_status (per-provider progress) and get_search_results (flights found so "
+                "far); do other work meanwhile."
+)
+async def submit_flight_search(
+    origin: str = Field(description="IATA airport code for origin (e.g., 'LKO')"),
+    destination: str = Field(description="IATA airport code for destination (e.g., 'IXL')"),
+    travel_date: str = Field(description="Travel date in DD/MM/YYYY format (e.g., '28/12/2025')"),
+    source: list = Field(default=["all"], description="List containing: mmt, expedia, ixigo, or all"),
+    deadline_ms: int = Field(default=0, description="Stop the search after this many milliseconds; late providers are cancelled. 0 waits for every provider"),
+    hedge: bool = Field(default=HEDGE_DEFAULT, description="Start a second attempt for a provider running longer than usual and take whichever returns first")
+) -> str:
+    request_id = new_request_id()
+    logger.info(f"Submitted search {request_id}: {origin} to {destination} on {travel_date} via {source}")
+
+    try:
+        travel_date_str = convert_to_date_std(travel_date).strftime("%d/%m/%Y")
+
+        keys_to_process = provider_keys(source)
+
+        if not keys_to_process:
+            return "Error: No valid sources provided."
+
+        route_popularity.record(origin, destination, travel_date_str, keys_to_process)
+        prefetcher.start()
+        job = job_store.create(
+            request_id, {"origin": origin, "destination": destination, "travel_date": travel_date_str},
+            keys_to_process
+        )
+        job.task = asyncio.create_task(run_search_job(
+            job, keys_to_process, origin, destination, travel_date_str,
+            ADAPTIVE_SELECTION and "all" in source_names(source), hedge, deadline_ms
+        ))
+        return json.dumps({"job_id": job.job_id, "state": job.state, "providers": keys_to_process}, indent=2)
+
+    except TooManyJobs as e:
+        logger.warning(f"Search {request_id} refused: {e}")
+        return f"Error: Server busy, {e}. Try again shortly."
+    except Exception as e:
+        logger.error(f"Fatal tool error: {e}", exc_info=True)
+        return f"Error submitting search: {str(e)}"
+
+@mcp.tool(
+    name="get_search_status",
+    description="Reports a submitted search's state (pending, running, done, failed, cancelled), how many "
+                "flights are ready and each provider's progress."
+)
+async def get_search_status(
+    job_id: str = Field(description="job_id returned by submit_flight_search")
+) -> str:
+    job = job_store.get(job_id)
+    if job is None:
+        return f"Error: Unknown or expired job_id {job_id}."
+    return json.dumps(job.status(), indent=2)
+
+@mcp.tool(
+    name="get_search_results",
+    description="Returns the flights a submitted search has found so far (all of them once its state is "
+                "done) in the same JSON shape as search_flights, plus the job state."
+)
+async def get_search_results(
+    job_id: str = Field(description="job_id returned by submit_flight_search")
+) -> str:
+    job = job_store.get(job_id)
+    if job is None:
+        return f"Error: Unknown or expired job_id {job_id}."
+    response = {"job_id": job.job_id, "state": job.state, "flights": job.flights, "providers": job.providers}
+    if job.error:
+        response["error"] = job.error
+    elif not job.active and not response["flights"]:
+        response["message"] = "No flights found across the selected sources."
+    return json.dumps(response, indent=2)
+
+async def search_itinerary(legs, source, deadline_ms, hedge, max_itineraries):
+    """
+    Searches every leg concurrently as one job (each leg a one-way search over
+    the pooled browsers) and ranks the combined itineraries by total price.
+    """
+    request_id = new_request_id()
+    logger.info(f"Itinerary search {request_id}: "
+                f"{', '.join(f'{leg.origin}-{leg.destination} on {leg.travel_date}' for leg in legs)} via {source}")
+    try:
+        if not legs or len(legs) > MAX_LEGS:
+            return f"Error: Provide between 1 and {MAX_LEGS} legs."
+        dates = [convert_to_date_std(leg.travel_date) for leg in legs]
+        if any(later < earlier for earlier, later in zip(dates, dates[1:])):
+            return "Error: Legs must be listed in travel-date order."
+
+        keys_to_process = provider_keys(source)
+
+        if not keys_to_process:
+            return "Error: No valid sources provided."
+
+        routes = await asyncio.gather(*(
+            search_route(keys_to_process, leg.origin, leg.destination, date.strftime("%d/%m/%Y"),
+                         f"{request_id}-{number}", adaptive=ADAPTIVE_SELECTION and "all" in source_names(source),
+                         hedge=hedge, deadline_ms=deadline_ms)
+            for number, (leg, date) in enumerate(zip(legs, dates), start=1)
+        ))
+        itineraries = rank_itineraries([flights for flights, _ in routes], dates, limit=max_itineraries)
+        response = {
+            "itineraries": itineraries,
+            "legs": [{"origin": leg.origin, "destination": leg.destination,
+                      "travel_date": date.strftime("%d/%m/%Y"), "flights": len(flights), "providers": providers}
+                     for leg, date, (flights, providers) in zip(legs, dates, routes)],
         }
+        if not itineraries:
+            response["message"] = "No complete itinerary found across the selected sources."
+        return json.dumps(response, indent=2)
+
+    except Exception as e:
+        logger.error(f"Fatal tool error: {e}", exc_info=True)
+        return f"Error executing search: {str(e)}"
+
+@mcp.tool(
+    name="search_round_trip",
+    description="Searches the outbound and return flights of a round trip concurrently on mmt, ixigo or "
+                "expedia and returns JSON with `itineraries` (outbound + return pairs ranked by total "
+                "price) and per-leg provider status under `legs`."
+)
+async def search_round_trip(
+    origin: str = Field(description="IATA airport code for origin (e.g., 'LKO')"),
+    destination: str = Field(description="IATA airport code for destination (e.g., 'IXL')"),
+    departure_date: str = Field(description="Outbound date in DD/MM/YYYY format (e.g., '28/12/2025')"),
+    return_date: str = Field(description="Return date in DD/MM/YYYY format (e.g., '02/01/2026')"),
+    source: list = Field(default=["all"], description="List containing: mmt, expedia, ixigo, or all"),
+    deadline_ms: int = Field(default=0, description="Return after this many milliseconds with whatever providers finished; late ones are cancelled. 0 waits for every provider"),
+    hedge: bool = Field(default=HEDGE_DEFAULT, description="Start a second attempt for a provider running longer than usual and take whichever returns first"),
+    max_itineraries: int = Field(default=10, description="Number of ranked itineraries to return")
+) -> str:
+    legs = [FlightLeg(origin=origin, destination=destination, travel_date=departure_date),
+            FlightLeg(origin=destination, destination=origin, travel_date=return_date)]
+    return await search_itinerary(legs, source, deadline_ms, hedge, max_itineraries)
 
-        keys_to_process = list(registry.keys()) if "all" in source else [s for s in source if s in registry]
+@mcp.tool(
+    name="search_multi_city",
+    description="Searches every leg of a multi-city trip concurrently on mmt, ixigo or expedia and returns "
+                "JSON with `itineraries` (one flight per leg, ranked by total price, same-day connections "
+                "checked) and per-leg provider status under `legs`."
+)
+async def search_multi_city(
+    legs: list[FlightLeg] = Field(description=f"Legs in travel order (at most {MAX_LEGS}), each with origin, destination and travel_date (DD/MM/YYYY)"),
+    source: list = Field(default=["all"], description="List containing: mmt, expedia, ixigo, or all"),
+    deadline_ms: int = Field(default=0, description="Return after this many milliseconds with whatever providers finished; late ones are cancelled. 0 waits for every provider"),
+    hedge: bool = Field(default=HEDGE_DEFAULT, description="Start a second attempt for a provider running longer than usual and take whichever returns first"),
+    max_itineraries: int = Field(default=10, description="Number of ranked itineraries to return")
+) -> str:
+    return await search_itinerary(legs, source, deadline_ms, hedge, max_itineraries)
+
+def summarize_day(travel_date, flights, providers, details):
+    """One day of a range search: its cheapest and fastest flight plus the cheapest few."""
+    by_price = cheapest_flights(flights)
+    fastest = fastest_flight(flights)
+    return {
+        "travel_date": travel_date,
+        "flights": len(flights),
+        "cheapest": {"price": parse_price(by_price[0]["Price"]), "flight": by_price[0]} if by_price else None,
+        "fastest": {"minutes": flight_minutes(fastest), "flight": fastest} if fastest else None,
+        "details": by_price[:details],
+        "providers": providers,
+    }
+
+@mcp.tool(
+    name="search_flights_range",
+    description="Searches one route on every day from start_date to end_date in a single bounded parallel "
+                f"job (at most {RANGE_MAX_DAYS} days) and returns JSON with the overall cheapest day and, "
+                "per day, the cheapest and fastest flight, the cheapest few flights and provider status."
+)
+async def search_flights_range(
+    origin: str = Field(description="IATA airport code for origin (e.g., 'LKO')"),
+    destination: str = Field(description="IATA airport code for destination (e.g., 'DEL')"),
+    start_date: str = Field(description="First travel date in DD/MM/YYYY format (e.g., '22/12/2025')"),
+    end_date: str = Field(description="Last travel date in DD/MM/YYYY format (e.g., '28/12/2025')"),
+    source: list = Field(default=["all"], description="List containing: mmt, expedia, ixigo, or all"),
+    max_parallel: int = Field(default=RANGE_PARALLELISM, description=f"Days searched at once (1 to {RANGE_PARALLELISM})"),
+    deadline_ms: int = Field(default=0, description="Return after this many milliseconds with whatever finished; late providers are cancelled and days not yet started are skipped. 0 waits for everything"),
+    hedge: bool = Field(default=HEDGE_DEFAULT, description="Start a second attempt for a provider running longer than usual and take whichever returns first"),
+    details_per_day: int = Field(default=5, description="Cheapest flights listed per day")
+) -> str:
+    request_id = new_request_id()
+    logger.info(f"Range search {request_id}: {origin} to {destination} from {start_date} to {end_date} via {source}")
+
+    try:
+        start = convert_to_date_std(start_date)
+        end = convert_to_date_std(end_date)
+        if end < start:
+            return "Error: end_date is before start_date."
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        if len(days) > RANGE_MAX_DAYS:
+            return f"Error: The range covers {len(days)} days; at most {RANGE_MAX_DAYS} are allowed."
+
+        keys_to_process = provider_keys(source)
 
         if not keys_to_process:
             return "Error: No valid sources provided."
 
-        # Define a task for a single source: Scrape then Parse
-        async def fetch_source_data(key):
-            try:
-                # Run Scraper
-                await loop.run_in_executor(
-                    executor, 
-                    registry[key]["scrap"], 
-                    origin, 
-                    destination, 
-                    travel_date_str
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + deadline_ms / 1000 if deadline_ms else None
+        # Each day's providers still go through the scrape limiter and warm pools; this
+        # only bounds how many days are in flight so one range cannot crowd out other searches
+        gate = asyncio.Semaphore(max(1, min(max_parallel, RANGE_PARALLELISM)))
+
+        async def search_day(day):
+            travel_date_str = day.strftime("%d/%m/%Y")
+            async with gate:
+                if deadline is not None and loop.time() >= deadline:
+                    skipped = {"status": "skipped", "detail": "deadline reached before this day was searched"}
+                    return summarize_day(travel_date_str, [], {key: skipped for key in keys_to_process}, 0)
+                flights, providers = await search_route(
+                    keys_to_process, origin, destination, travel_date_str, f"{request_id}-{day:%d%m}",
+                    adaptive=ADAPTIVE_SELECTION and "all" in source_names(source), hedge=hedge, deadline=deadline
                 )
-                # Run Parser
-                data = await loop.run_in_executor(executor, registry[key]["parse"])
-                
-                if data and isinstance(data, list):
-                    for flight in data:
-                        flight["provider"] = key
-                    return data
-                return []
-            except Exception as e:
-                logger.error(f"Error processing {key}: {e}")
-                return []
-
-        # Trigger all tasks concurrently
-        tasks = [fetch_source_data(key) for key in keys_to_process]
-        results_nested = await asyncio.gather(*tasks)
-
-        # Flatten the list of lists
-        all_results = [item for sublist in results_nested for item in sublist]
-
-        if not all_results:
-            return "No flights found across the selected sources."
-            
-        import json
-        return json.dumps(all_results, indent=2)
-        
+            return summarize_day(travel_date_str, flights, providers, details_per_day)
+
+        summaries = await asyncio.gather(*(search_day(day) for day in days))
+        priced = [day for day in summaries if day["cheapest"]]
+        best = min(priced, key=lambda day: day["cheapest"]["price"]) if priced else None
+        response = {
+            "cheapest_day": {"travel_date": best["travel_date"], **best["cheapest"]} if best else None,
+            "days": summaries,
+        }
+        if not best:
+            response["message"] = "No flights found across the selected sources and dates."
+        return json.dumps(response, indent=2)
+
     except Exception as e:
         logger.error(f"Fatal tool error: {e}", exc_info=True)
         return f"Error executing search: {str(e)}"
 
+# Provider statuses a batch retries (up to BATCH_RETRIES times) before writing the query
+BATCH_RETRY_STATUSES = ("error", "timeout", "rate_limited")
+
+async def run_batch(queries, output_path, resume=True, lanes=BATCH_LANES, retries=BATCH_RETRIES):
+    """
+    Runs many one-way searches as one batch job and streams each finished
+    query as a JSON line to ``output_path`` (also the checkpoint: with
+    ``resume``, queries already written are skipped).
+
+    ``queries`` are dicts (or FlightSearchInput) with origin, destination,
+    travel_date and optional source. Work is split per provider: each provider
+    drains its own queue with ``lanes`` concurrent scrapes, so its warm
+    browsers and profiles serve back-to-back searches, and providers run side
+    by side. Scrapes queue in the batch priority class, so interactive searches
+    take the next free slot. Returns a summary with the throughput in routes
+    per minute.
+    """
+    started = time.monotonic()
+    batch_id = new_request_id()
+    checkpoint = BatchCheckpoint(output_path, resume=resume)
+    pending, invalid = {}, 0
+    try:
+        for query in queries:
+            if isinstance(query, BaseModel):
+                query = query.model_dump()
+            source = query.get("source") or ["all"]
+            keys = provider_keys(source)
+            try:
+                travel_date = convert_to_date_std(str(query["travel_date"])).strftime("%d/%m/%Y")
+                origin, destination = query["origin"], query["destination"]
+            except (KeyError, ValueError) as e:
+                invalid += 1
+                logger.warning(f"Batch {batch_id}: skipping invalid query {query}: {e}")
+                continue
+            qid = query_id(origin, destination, travel_date, keys)
+            if qid in checkpoint.done or qid in pending or not keys:
+                continue
+            pending[qid] = {"query_id": qid, "origin": origin, "destination": destination,
+                            "travel_date": travel_date, "keys": keys, "results": {}}
+        resumed = len(checkpoint.done)
+        logger.info(f"Batch {batch_id}: {len(pending)} queries to run, {resumed} already done, "
+                    f"{invalid} invalid -> {output_path}")
+
+        # Same-provider work is grouped: one queue per provider, ordered by route
+        queues = {}
+        for job in sorted(pending.values(), key=lambda j: (j["origin"], j["destination"], j["travel_date"])):
+            for key in job["keys"]:
+                queues.setdefault(key, asyncio.Queue()).put_nowait((job, 0))
+        written = {"queries": 0, "flights": 0}
+
+        def finish(job):
+            results = job["results"]
+            route = provider_stats.route(job["origin"], job["destination"])
+            provider_stats.record_search(route, results)
+            flights = [flight for key in job["keys"] for flight in results[key][0]]
+            providers = {key: results[key][1] for key in job["keys"]}
+            record = {key: job[key] for key in ("query_id", "origin", "destination", "travel_date")}
+            record.update(flights=flights, providers=providers)
+            if not any(status["status"] in ("ok", "empty") for status in providers.values()):
+                record["error"] = "no provider returned results"
+            checkpoint.write(record)
+            written["queries"] += 1
+            written["flights"] += len(flights)
+            del pending[job["query_id"]]
+
+        async def lane(key, queue):
+            while not queue.empty():
+                job, attempt = queue.get_nowait()
+                request_id = f"{batch_id}-{job['query_id'][:6]}"
+                start = time.monotonic()
+                flights, status = await search_provider(
+                    key, job["origin"], job["destination"], job["travel_date"], request_id, priority=BATCH
+                )
+                if status["status"] in BATCH_RETRY_STATUSES and attempt < retries:
+                    queue.put_nowait((job, attempt + 1))
+                    continue
+                if status["status"] != "circuit_open":
+                    status["elapsed_s"] = round(time.monotonic() - start, 2)
+                job["results"][key] = (flights, status)
+                if len(job["results"]) == len(job["keys"]):
+                    finish(job)
+
+        await asyncio.gather(*(lane(key, queue) for key, queue in queues.items() for _ in range(max(1, lanes))))
+    finally:
+        checkpoint.close()
+
+    elapsed = time.monotonic() - started
+    summary = {
+        "output": output_path,
+        "completed": written["queries"],
+        "already_done": resumed,
+        "invalid": invalid,
+        "unfinished": len(pending),
+        "flights": written["flights"],
+        "elapsed_s": round(elapsed, 1),
+        "routes_per_minute": round(written["queries"] / elapsed * 60, 1) if elapsed > 0 else None,
+    }
+    logger.info(f"Batch {batch_id} done: {summary}")
+    return summary
+
+@mcp.tool(
+    name="search_flights_batch",
+    description="Runs a batch of one-way searches (a list of queries, or a JSON / JSON Lines file of them) as one "
+                "job grouped per provider, streaming each finished query as a JSON line to output_path. The "
+                "file is also the checkpoint: rerunning with the same output_path resumes where a crash left "
+                "off. Returns a summary (counts, routes per minute), not the flights."
+)
+async def search_flights_batch(
+    queries: list[FlightSearchInput] = Field(default=[], description="Queries with origin, destination, travel_date (DD/MM/YYYY) and optional source"),
+    queries_file: str = Field(default="", description="Path of a JSON list or JSON Lines file of queries, used instead of queries"),
+    output_path: str = Field(default="", description=f"JSON Lines results file; defaults to a new file under {BATCH_DIR}"),
+    resume: bool = Field(default=True, description="Skip queries already written to output_path")
+) -> str:
+    try:
+        batch_queries = load_queries(queries_file) if queries_file else queries
+        if not batch_queries:
+            return "Error: No queries provided."
+        output_path = output_path or os.path.join(BATCH_DIR, f"batch-{datetime.now():%Y%m%d-%H%M%S}.jsonl")
+        return json.dumps(await run_batch(batch_queries, output_path, resume=resume), indent=2)
+    except Exception as e:
+        logger.error(f"Fatal tool error: {e}", exc_info=True)
+        return f"Error executing batch: {str(e)}"
+
+@mcp.tool(
+    name="get_scraper_stats",
+    description="Reports the adaptive scrape concurrency limit and queue depth, browser pool and worker usage, and how long each provider's page readiness waits took."
+)
+async def get_scraper_stats() -> str:
+    return json.dumps({
+        "concurrency": scrape_limiter.stats(),
+        "http_concurrency": http_limiter.stats(),
+        "rate_limits": rate_limiter.stats(),
+        "circuit_breakers": circuit_breakers.stats(),
+        "provider_stats": provider_stats.stats(),
+        "hedging": hedger.stats(),
+        "jobs": job_store.stats(),
+        "result_cache": result_cache.stats(),
+        "prefetch": prefetcher.stats(),
+        "browser_pool": browser_pool.stats(),
+        "workers": worker_pool.stats(),
+        "tab_engine": tab_engine.stats(),
+        "readiness_waits": wait_timings.summary(),
+    }, indent=2)
+
 if __name__ == "__main__":
+    if BROWSER_PROVIDERS and PROCESS_WORKERS:
+        worker_pool.start()
+    elif BROWSER_PROVIDERS:
+        threading.Thread(target=browser_pool.warm, args=(BROWSER_PROVIDERS,), daemon=True).start()
+    atexit.register(worker_pool.close)
+    atexit.register(browser_pool.close)
+    atexit.register(tab_engine.close)
     mcp.run(transport="stdio")
\ No newline at end of file
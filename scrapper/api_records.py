@@ -0,0 +1,78 @@
+import re
+
+# ISO-ish timestamps ("2025-12-28T06:05:00") are reduced to the "06:05" the DOM shows
+ISO_TIME = re.compile(r"^\d{4}-\d{2}-\d{2}[T ](\d{2}:\d{2})")
+
+
+def iter_results(payload, path):
+    """
+    Yields the result dicts at ``path`` in a decoded JSON payload: dotted keys,
+    with ``*`` stepping into every item of a list. A list at the end of the
+    path yields its dict items.
+    """
+    nodes = [payload]
+    for part in path.split("."):
+        found = []
+        for node in nodes:
+            if part == "*":
+                if isinstance(node, list):
+                    found.extend(node)
+            elif isinstance(node, dict) and part in node:
+                found.append(node[part])
+        nodes = found
+    for node in nodes:
+        if isinstance(node, dict):
+            yield node
+        elif isinstance(node, list):
+            yield from (item for item in node if isinstance(item, dict))
+
+
+def first_value(obj, keys):
+    """Returns the first scalar found under any of ``keys`` (dotted paths allowed)."""
+    for key in keys:
+        value = obj
+        for part in key.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+            if value is None:
+                break
+        if isinstance(value, (str, int, float)) and value != "":
+            return value
+    return None
+
+
+def _clean(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        match = ISO_TIME.match(value)
+        return match.group(1) if match else value.strip()
+    return str(value)
+
+
+def map_api_records(payloads, result_paths, field_keys, required, defaults=None):
+    """
+    Maps captured API payloads into flight records shaped like the DOM parsers'.
+
+    ``result_paths`` are the provider's paths (see iter_results) to its list
+    of flights; only those dicts are mapped, never the filters, fare
+    breakdowns and the like elsewhere in the payload. ``field_keys`` maps
+    each output field to candidate JSON keys; a result without a value for
+    every ``required`` field is skipped. Duplicates (the same flight repeated
+    across payloads) are dropped.
+    """
+    records, seen = [], set()
+    for payload in payloads:
+        for path in result_paths:
+            for obj in iter_results(payload, path):
+                record = {field: _clean(first_value(obj, keys)) for field, keys in field_keys.items()}
+                if any(record[field] is None for field in required):
+                    continue
+                for field, default in (defaults or {}).items():
+                    if record.get(field) is None:
+                        record[field] = default
+                key = tuple(record.items())
+                if key in seen:
+                    continue
+                seen.add(key)
+                records.append(record)
+    return records
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+BATCH_DIR = os.getenv("FLIGHT_BATCH_DIR", "./batch_results")
+# Scrapes of one provider a batch keeps in flight (each on that provider's warm browsers)
+BATCH_LANES = int(os.getenv("FLIGHT_BATCH_LANES", "2"))
+# Extra attempts for a provider search that errored, timed out or was rate limited
+BATCH_RETRIES = int(os.getenv("FLIGHT_BATCH_RETRIES", "1"))
+
+
+def query_id(origin, destination, travel_date, sources):
+    """Stable id of a batch query, so a resumed batch recognises what it already wrote."""
+    key = "|".join([origin.strip().upper(), destination.strip().upper(), travel_date, ",".join(sorted(sources))])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def load_queries(path):
+    """Reads batch queries from a JSON list or a JSON Lines file of query objects."""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read().strip()
+    if content.startswith("["):
+        return json.loads(content)
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+class BatchCheckpoint:
+    """
+    JSON Lines results file that doubles as the batch checkpoint. Every
+    finished query is appended and fsynced as it completes; on resume the
+    queries already written without an error are skipped. A line cut short by
+    a crash is ignored, so that query simply runs again.
+    """
+
+    def __init__(self, path, resume=True):
+        self.path = path
+        self.done = set()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        if resume and os.path.exists(path):
+            self._load()
+        elif os.path.exists(path):
+            logger.info(f"Batch {path}: starting over, previous results are overwritten.")
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        if resume and self._file.tell() and not self._ends_with_newline():
+            self._file.write("\n")  # close off a line cut short by a crash
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not record.get("error"):
+                    self.done.add(record.get("query_id"))
+        logger.info(f"Batch {self.path}: resuming, {len(self.done)} queries already done.")
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def write(self, record):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.done.add(record["query_id"])
+
+    def close(self):
+        self._file.close()
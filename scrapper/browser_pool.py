@@ -0,0 +1,290 @@
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from seleniumbase import SB
+
+from scrapper.cancellation import check_cancelled
+
+try:
+    import psutil
+except ImportError:  # RSS based recycling is skipped without psutil
+    psutil = None
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Options every pooled session is launched with (same as the old per-call SB()).
+DEFAULT_SB_OPTIONS = {"uc": True, "test": True, "xvfb": True}
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_USES = 20
+DEFAULT_MAX_RSS_MB = 1500
+DEFAULT_LEASE_TIMEOUT = 120
+CANCEL_POLL = 0.5  # how often a waiting lease checks its CancelToken
+
+
+def ensure_window_size(sb, width, height):
+    """Resize the window of a session that may already be in CDP mode."""
+    if getattr(sb, "cdp", None):
+        sb.cdp.set_window_rect(0, 0, width, height)
+    else:
+        sb.set_window_size(width, height)
+
+
+class PooledBrowser:
+    """A live SB session plus the bookkeeping the pool needs to recycle it."""
+
+    def __init__(self, context, sb, provider=None, profile=None):
+        self.context = context
+        self.sb = sb
+        self.provider = provider
+        self.profile = profile  # persistent user-data-dir, if any
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+    def browser_pid(self):
+        driver = getattr(self.sb, "driver", None)
+        pid = getattr(driver, "browser_pid", None)
+        if pid is None:
+            service = getattr(driver, "service", None)
+            process = getattr(service, "process", None)
+            pid = getattr(process, "pid", None)
+        return pid
+
+    def rss_mb(self):
+        """Resident memory of Chrome and all its child processes, in MB."""
+        pid = self.browser_pid()
+        if psutil is None or pid is None:
+            return None
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+
+    def is_healthy(self):
+        try:
+            return self.sb.execute_script("return 1 + 1;") == 2
+        except Exception as e:
+            logger.warning(f"Pooled browser failed health check: {e}")
+            return False
+
+    def reset(self):
+        """Drop page state left behind by the previous lease.
+
+        Browsers on a persistent profile keep their cookies (consent, dismissed
+        popups) since the profile only ever serves one provider.
+        """
+        if getattr(self.sb, "cdp", None):
+            self.sb.cdp.open("about:blank")
+            if self.profile is None:
+                self.sb.cdp.clear_cookies()
+        else:
+            self.sb.open("about:blank")
+            if self.profile is None:
+                self.sb.delete_all_cookies()
+
+    def quit(self):
+        try:
+            self.context.__exit__(None, None, None)
+        except Exception as e:
+            logger.warning(f"Error while closing pooled browser: {e}")
+        if self.profile is not None:
+            self.profile.release()
+
+
+class BrowserPool:
+    """
+    Keeps warm undetected-chrome SB sessions alive and leases them to scrapers.
+
+    Sessions are health-checked before each lease and reset after it. A session
+    is recycled once it has served ``max_uses`` leases or its Chrome process
+    tree grows beyond ``max_rss_mb``.
+
+    With a ``profiles`` ProfilePool, each browser runs on a persistent profile
+    of the provider it was leased for and is only handed out for that provider
+    again, so its HTTP cache and cookies stay warm between searches.
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, max_size=None, max_uses=DEFAULT_MAX_USES,
+                 max_rss_mb=DEFAULT_MAX_RSS_MB, sb_options=None, profiles=None):
+        self.size = size
+        self.max_size = max(max_size or size, size)
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.sb_options = dict(sb_options or DEFAULT_SB_OPTIONS)
+        self.profiles = profiles
+        self._idle = []
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def _launch(self, provider=None):
+        options = dict(self.sb_options)
+        profile = None
+        if self.profiles is not None and provider:
+            profile = self.profiles.acquire(provider)
+            if profile is not None:
+                options["user_data_dir"] = profile.path
+        try:
+            context = SB(**options)
+            sb = context.__enter__()
+        except Exception:
+            if profile is not None:
+                profile.release()
+            raise
+        logger.info(f"Launched pooled browser{f' on {profile.path}' if profile else ''}.")
+        return PooledBrowser(context, sb, provider=provider, profile=profile)
+
+    def _matches(self, browser, provider):
+        return self.profiles is None or browser.provider == provider
+
+    def _take_idle(self, provider):
+        for i in range(len(self._idle) - 1, -1, -1):
+            if self._matches(self._idle[i], provider):
+                return self._idle.pop(i)
+        return None
+
+    def _discard(self, browser):
+        browser.quit()
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def warm(self, providers=None):
+        """Pre-launch browsers until ``size`` sessions are alive, round-robin over ``providers``."""
+        launched = 0
+        while True:
+            with self._cond:
+                if self._closed or self._total >= self.size:
+                    return
+                self._total += 1
+            provider = providers[launched % len(providers)] if providers else None
+            launched += 1
+            try:
+                browser = self._launch(provider)
+            except Exception as e:
+                logger.error(f"Could not warm browser pool: {e}")
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                return
+            with self._cond:
+                self._idle.append(browser)
+                self._cond.notify()
+
+    def acquire(self, timeout=DEFAULT_LEASE_TIMEOUT, provider=None, cancel=None):
+        deadline = time.monotonic() + timeout
+        while True:
+            evicted = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Browser pool is closed.")
+                    check_cancelled(cancel)
+                    browser = self._take_idle(provider)
+                    if browser is not None or self._total < self.max_size:
+                        break
+                    if self._idle:
+                        # Full, but an idle browser of another provider can make room
+                        evicted = self._idle.pop(0)
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a pooled browser.")
+                    self._cond.wait(min(remaining, CANCEL_POLL) if cancel is not None else remaining)
+                if browser is None and evicted is None:
+                    self._total += 1
+            if evicted is not None:
+                logger.info(f"Recycling idle {evicted.provider} browser for a {provider} lease.")
+                evicted.quit()
+                browser = None
+            if browser is None:
+                try:
+                    return self._launch(provider)
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+            if browser.is_healthy():
+                return browser
+            self._discard(browser)
+
+    def release(self, browser, failed=False):
+        browser.uses += 1
+        if failed and not browser.is_healthy():
+            logger.info("Recycling pooled browser after a failed lease.")
+            self._discard(browser)
+            return
+        if browser.uses >= self.max_uses:
+            logger.info(f"Recycling pooled browser after {browser.uses} uses.")
+            self._discard(browser)
+            return
+        rss = browser.rss_mb()
+        if rss is not None and rss > self.max_rss_mb:
+            logger.info(f"Recycling pooled browser using {rss:.0f} MB RSS.")
+            self._discard(browser)
+            return
+        try:
+            browser.reset()
+        except Exception as e:
+            logger.warning(f"Could not reset pooled browser: {e}")
+            self._discard(browser)
+            return
+        with self._cond:
+            if self._closed:
+                self._total -= 1
+                browser.quit()
+            else:
+                self._idle.append(browser)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout=DEFAULT_LEASE_TIMEOUT, provider=None, cancel=None):
+        """Borrow a warm ``sb`` (for ``provider``'s profile, if any) for the duration of the block.
+
+        A scrape that ends in an exception (including ScrapeCancelled) is
+        health-checked and reset to about:blank, which also stops any page
+        that is still loading.
+        """
+        browser = self.acquire(timeout, provider, cancel)
+        failed = False
+        try:
+            yield browser.sb
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.release(browser, failed=failed)
+
+    def stats(self):
+        with self._cond:
+            stats = {"idle": len(self._idle), "total": self._total,
+                     "size": self.size, "max_size": self.max_size}
+        if self.profiles is not None:
+            stats["profiles"] = self.profiles.stats()
+        return stats
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for browser in idle:
+            browser.quit()
@@ -0,0 +1,36 @@
+import threading
+
+
+class ScrapeCancelled(BaseException):
+    """
+    Raised inside a scrape once its request was cancelled. Like
+    asyncio.CancelledError it is a BaseException, so the scrapers'
+    ``except Exception`` fallbacks do not swallow it.
+    """
+
+
+class CancelToken:
+    """
+    Cancellation flag handed from the server down to a blocking scrape. Wraps a
+    threading.Event, or a multiprocessing Event shared with a worker process.
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise ScrapeCancelled()
+
+
+def check_cancelled(cancel):
+    """Raises ScrapeCancelled if ``cancel`` (a CancelToken or None) was cancelled."""
+    if cancel is not None:
+        cancel.raise_if_cancelled()
@@ -0,0 +1,60 @@
+import logging
+import os
+import sys
+import uuid
+from dataclasses import dataclass, field
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Set FLIGHT_SCRAPER_DEBUG=1 to also dump captured pages under DEBUG_DIR
+SCRAPER_DEBUG = os.getenv("FLIGHT_SCRAPER_DEBUG", "0") == "1"
+DEBUG_DIR = "./scrapper/ss/debug"
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:12]
+
+
+@dataclass
+class ScrapeResult:
+    """Everything one scrape captured, handed straight to the provider's parser."""
+    provider: str
+    request_id: str
+    pages: list = field(default_factory=list)  # captured HTML, in capture order
+    api_payloads: list = field(default_factory=list)  # search API JSON captured over CDP
+    cards: list = field(default_factory=list)  # records already extracted in the browser
+
+    def add_page(self, html):
+        self.pages.append(html)
+        if SCRAPER_DEBUG:
+            save_debug_html(self.provider, self.request_id, html, suffix=str(len(self.pages) - 1))
+
+
+def html_pages(scraped):
+    """Returns the captured HTML pages from a ScrapeResult, str or bytes."""
+    if isinstance(scraped, ScrapeResult):
+        return scraped.pages
+    if isinstance(scraped, bytes):
+        return [scraped.decode("utf-8", errors="replace")]
+    if isinstance(scraped, str):
+        return [scraped]
+    return list(scraped or [])
+
+
+def save_debug_html(provider, request_id, html, suffix=""):
+    """Writes a captured page to a request-scoped file; only used for debugging."""
+    name = f"{provider}_{request_id}_{suffix}.html" if suffix else f"{provider}_{request_id}.html"
+    path = os.path.join(DEBUG_DIR, name)
+    try:
+        os.makedirs(DEBUG_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+    except OSError as e:
+        logger.warning(f"Could not write debug page {path}: {e}")
+    return path
@@ -0,0 +1,138 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+BREAKER_WINDOW = int(os.getenv("FLIGHT_BREAKER_WINDOW", "10"))
+BREAKER_MIN_CALLS = int(os.getenv("FLIGHT_BREAKER_MIN_CALLS", "4"))
+BREAKER_ERROR_RATE = float(os.getenv("FLIGHT_BREAKER_ERROR_RATE", "0.5"))
+# Empty results can be genuine (no flights on a route), so this trips later
+BREAKER_EMPTY_RATE = float(os.getenv("FLIGHT_BREAKER_EMPTY_RATE", "0.8"))
+BREAKER_OPEN_SECONDS = float(os.getenv("FLIGHT_BREAKER_OPEN_SECONDS", "60"))
+BREAKER_MAX_OPEN_SECONDS = 900
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+SUCCESS, EMPTY, FAILURE = "success", "empty", "failure"
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker for one provider.
+
+    Over the last ``window`` outcomes (once there are ``min_calls``), an error
+    rate of ``error_rate`` or an empty-result rate of ``empty_rate`` opens the
+    circuit: calls are refused for ``open_seconds``. Then one probe call is let
+    through (half-open); success closes the circuit, anything else re-opens it
+    with the open time doubled (up to BREAKER_MAX_OPEN_SECONDS).
+    """
+
+    def __init__(self, provider, window=BREAKER_WINDOW, min_calls=BREAKER_MIN_CALLS,
+                 error_rate=BREAKER_ERROR_RATE, empty_rate=BREAKER_EMPTY_RATE,
+                 open_seconds=BREAKER_OPEN_SECONDS, clock=time.monotonic):
+        self.provider = provider
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.empty_rate = empty_rate
+        self.base_open_seconds = open_seconds
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.state = CLOSED
+        self.opened_at = None
+        self.reason = None
+        self._outcomes = deque(maxlen=window)
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _rates(self):
+        calls = len(self._outcomes)
+        if not calls:
+            return 0.0, 0.0
+        return (sum(o == FAILURE for o in self._outcomes) / calls,
+                sum(o == EMPTY for o in self._outcomes) / calls)
+
+    def retry_in(self):
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.open_seconds - self.clock())
+
+    def allow(self):
+        """True if a call may go to the provider now (at most one probe while half-open)."""
+        with self._lock:
+            if self.state == OPEN and self.retry_in() <= 0:
+                self.state = HALF_OPEN
+                logger.info(f"{self.provider} circuit half-open; probing.")
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def _open(self, reason):
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self.reason = reason
+        logger.warning(f"{self.provider} circuit opened for {self.open_seconds:.0f}s: {reason}")
+
+    def record(self, outcome):
+        """Records SUCCESS, EMPTY or FAILURE for a call that ``allow`` let through."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probing:
+                self._probing = False
+                if outcome == SUCCESS:
+                    logger.info(f"{self.provider} circuit closed after a successful probe.")
+                    self.state, self.reason = CLOSED, None
+                    self.open_seconds = self.base_open_seconds
+                    self._outcomes.clear()
+                else:
+                    self.open_seconds = min(self.open_seconds * 2, BREAKER_MAX_OPEN_SECONDS)
+                    self._open(f"probe returned {outcome}")
+                return
+            self._outcomes.append(outcome)
+            if self.state != CLOSED or len(self._outcomes) < self.min_calls:
+                return
+            errors, empties = self._rates()
+            if errors >= self.error_rate:
+                self._open(f"{errors:.0%} of the last {len(self._outcomes)} searches failed")
+            elif empties >= self.empty_rate:
+                self._open(f"{empties:.0%} of the last {len(self._outcomes)} searches returned no flights")
+
+    def abandon(self):
+        """Frees the half-open probe slot of a call that ended without an outcome (cancelled)."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+
+    def stats(self):
+        with self._lock:
+            errors, empties = self._rates()
+            return {"state": self.state, "reason": self.reason, "retry_in_s": round(self.retry_in(), 1),
+                    "error_rate": round(errors, 2), "empty_rate": round(empties, 2),
+                    "calls": len(self._outcomes)}
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per provider, created on first use."""
+
+    def __init__(self, clock=time.monotonic, **options):
+        self.clock = clock
+        self.options = options
+        self._breakers = {}
+
+    def get(self, provider):
+        if provider not in self._breakers:
+            self._breakers[provider] = CircuitBreaker(provider, clock=self.clock, **self.options)
+        return self._breakers[provider]
+
+    def stats(self):
+        return {provider: breaker.stats() for provider, breaker in self._breakers.items()}
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+
+try:
+    import psutil
+except ImportError:  # free memory is then read from /proc/meminfo where available
+    psutil = None
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+CPU_COUNT = os.cpu_count() or 1
+CONCURRENCY_MIN = int(os.getenv("FLIGHT_CONCURRENCY_MIN", "1"))
+CONCURRENCY_MAX = int(os.getenv("FLIGHT_CONCURRENCY_MAX", str(max(2, min(CPU_COUNT, 16)))))
+CONCURRENCY_INITIAL = int(os.getenv("FLIGHT_CONCURRENCY_INITIAL", "2"))
+MIN_FREE_MB = int(os.getenv("FLIGHT_MIN_FREE_MB", "768"))
+MAX_LOAD_PER_CPU = float(os.getenv("FLIGHT_MAX_LOAD_PER_CPU", "1.5"))
+LATENCY_TOLERANCE = float(os.getenv("FLIGHT_LATENCY_TOLERANCE", "2.0"))
+ADJUST_INTERVAL = 5.0      # seconds between limit changes
+BASELINE_HISTORY = 50      # recent scrapes per provider the latency baseline is taken from
+EWMA_ALPHA = 0.2
+
+# Scrape classes, highest priority first: live chat searches, batch jobs, cache warmers
+INTERACTIVE, BATCH, BACKGROUND = "interactive", "batch", "background"
+PRIORITY_CLASSES = (INTERACTIVE, BATCH, BACKGROUND)
+
+
+def parse_weights(spec):
+    """Parses "interactive=16,batch=3,background=1" into a weight per priority class."""
+    weights = {INTERACTIVE: 16.0, BATCH: 3.0, BACKGROUND: 1.0}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = part.partition("=")
+        if name.strip() not in weights:
+            raise ValueError(f"Unknown priority class in FLIGHT_PRIORITY_WEIGHTS: {name!r}")
+        weights[name.strip()] = max(float(value), 0.01)
+    return weights
+
+
+# Share of freed scrape slots each class gets while several are waiting
+PRIORITY_WEIGHTS = parse_weights(os.getenv("FLIGHT_PRIORITY_WEIGHTS", ""))
+
+
+def available_memory_mb():
+    """Memory the host can still hand out, in MB, or None if it cannot be read."""
+    if psutil is not None:
+        return psutil.virtual_memory().available / (1024 * 1024)
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def load_per_cpu():
+    """One-minute load average per CPU, or None where the OS has none."""
+    try:
+        return os.getloadavg()[0] / CPU_COUNT
+    except (AttributeError, OSError):
+        return None
+
+
+class AdaptiveLimiter:
+    """
+    Caps in-flight scrapes at a limit that moves between ``floor`` and ``ceiling``.
+
+    The limit grows by one while it is saturated and scrapes run close to their
+    provider's baseline latency (the fastest of its recent scrapes), and shrinks
+    by a quarter when latency degrades past ``latency_tolerance`` x baseline,
+    free memory drops under ``min_free_mb`` or load per CPU passes
+    ``max_load_per_cpu``.
+
+    Excess scrapes wait in one FIFO queue per priority class. Freed slots
+    (every scrape is a job boundary) go to the waiting classes in proportion to
+    ``weights`` by stride scheduling; a class that was idle re-enters at the
+    current virtual time and wins ties by priority, so an interactive search
+    waits for at most one running scrape to finish even behind a large batch.
+    """
+
+    def __init__(self, floor=CONCURRENCY_MIN, ceiling=CONCURRENCY_MAX, initial=CONCURRENCY_INITIAL,
+                 latency_tolerance=LATENCY_TOLERANCE, min_free_mb=MIN_FREE_MB,
+                 max_load_per_cpu=MAX_LOAD_PER_CPU, adjust_interval=ADJUST_INTERVAL,
+                 memory_probe=available_memory_mb, load_probe=load_per_cpu, clock=time.monotonic,
+                 weights=PRIORITY_WEIGHTS):
+        self.floor = max(1, floor)
+        self.ceiling = max(self.floor, ceiling)
+        self.limit = min(max(initial, self.floor), self.ceiling)
+        self.latency_tolerance = latency_tolerance
+        self.min_free_mb = min_free_mb
+        self.max_load_per_cpu = max_load_per_cpu
+        self.adjust_interval = adjust_interval
+        self.memory_probe = memory_probe
+        self.load_probe = load_probe
+        self.clock = clock
+        self.in_flight = 0
+        self.latency_ratio = None     # EWMA of latency / provider baseline
+        self.queue_wait = None        # EWMA of seconds spent queued
+        self.last_reason = "initial"
+        self._last_adjust = clock()
+        self.weights = dict(weights)
+        self._waiters = {cls: deque() for cls in PRIORITY_CLASSES}
+        self._pass = {cls: 0.0 for cls in PRIORITY_CLASSES}   # stride scheduling position per class
+        self._virtual_time = 0.0
+        self._class_wait = {cls: None for cls in PRIORITY_CLASSES}   # EWMA of seconds queued
+        self._class_max_wait = {cls: 0.0 for cls in PRIORITY_CLASSES}
+        self._granted = {cls: 0 for cls in PRIORITY_CLASSES}
+        self._latencies = defaultdict(lambda: deque(maxlen=BASELINE_HISTORY))
+
+    def _ewma(self, current, sample):
+        return sample if current is None else current + EWMA_ALPHA * (sample - current)
+
+    def _queued(self):
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @property
+    def queued(self):
+        """Requests waiting for a slot."""
+        return self._queued()
+
+    @property
+    def idle(self):
+        """True while a slot is free and nothing is queued."""
+        return self.in_flight < self.limit and not self._queued()
+
+    async def acquire(self, priority=INTERACTIVE):
+        if priority not in self._waiters:
+            raise ValueError(f"Unknown scrape priority {priority!r}; expected one of {PRIORITY_CLASSES}")
+        start = self.clock()
+        if self.in_flight < self.limit and not self._queued():
+            self.in_flight += 1
+        else:
+            waiters = self._waiters[priority]
+            if not waiters:
+                # An idle class does not bank credit for the time it had nothing queued
+                self._pass[priority] = max(self._pass[priority], self._virtual_time)
+            waiter = asyncio.get_running_loop().create_future()
+            waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in waiters:
+                    waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # Granted a slot just as we were cancelled; hand it on
+                    self.in_flight -= 1
+                    self._wake()
+                raise
+        waited = self.clock() - start
+        self.queue_wait = self._ewma(self.queue_wait, waited)
+        self._class_wait[priority] = self._ewma(self._class_wait[priority], waited)
+        self._class_max_wait[priority] = max(self._class_max_wait[priority], waited)
+        self._granted[priority] += 1
+
+    def release(self, provider=None, elapsed=None):
+        """Frees a slot; ``elapsed`` (seconds) of a completed scrape feeds the controller."""
+        self.in_flight -= 1
+        if elapsed is not None and provider is not None:
+            latencies = self._latencies[provider]
+            latencies.append(elapsed)
+            baseline = min(latencies)
+            if baseline > 0:
+                self.latency_ratio = self._ewma(self.latency_ratio, elapsed / baseline)
+        self._adjust()
+        self._wake()
+
+    def _next_class(self):
+        waiting = [cls for cls in PRIORITY_CLASSES if self._waiters[cls]]
+        if not waiting:
+            return None
+        # Lowest pass wins; PRIORITY_CLASSES order breaks ties
+        return min(waiting, key=lambda cls: (self._pass[cls], PRIORITY_CLASSES.index(cls)))
+
+    def _wake(self):
+        while self.in_flight < self.limit:
+            cls = self._next_class()
+            if cls is None:
+                return
+            waiter = self._waiters[cls].popleft()
+            if waiter.done():
+                continue
+            self._virtual_time = self._pass[cls]
+            self._pass[cls] += 1 / self.weights[cls]
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _pressure(self):
+        free_mb = self.memory_probe() if self.memory_probe else None
+        if free_mb is not None and free_mb < self.min_free_mb:
+            return f"free memory {free_mb:.0f} MB < {self.min_free_mb} MB"
+        load = self.load_probe() if self.load_probe else None
+        if load is not None and load > self.max_load_per_cpu:
+            return f"load {load:.2f}/CPU > {self.max_load_per_cpu}"
+        if self.latency_ratio is not None and self.latency_ratio > self.latency_tolerance:
+            return f"latency {self.latency_ratio:.2f}x baseline"
+        return None
+
+    def _adjust(self):
+        now = self.clock()
+        if now - self._last_adjust < self.adjust_interval:
+            return
+        pressure = self._pressure()
+        previous = self.limit
+        if pressure:
+            self.limit = max(self.floor, int(self.limit * 0.75))
+            self.last_reason = pressure
+        elif self.in_flight + self._queued() + 1 >= self.limit and (
+                self.latency_ratio is None or self.latency_ratio <= (1 + self.latency_tolerance) / 2):
+            # Demand filled every slot and latency held up: probe one more
+            self.limit = min(self.ceiling, self.limit + 1)
+            self.last_reason = "saturated with healthy latency"
+        if self.limit != previous:
+            self._last_adjust = now
+            logger.info(f"Scrape concurrency {previous} -> {self.limit} ({self.last_reason}).")
+
+    @asynccontextmanager
+    async def slot(self, provider, priority=INTERACTIVE):
+        """Holds one scrape slot; only scrapes that complete are latency samples."""
+        await self.acquire(priority)
+        start = self.clock()
+        elapsed = None
+        try:
+            yield
+            elapsed = self.clock() - start
+        finally:
+            self.release(provider, elapsed)
+
+    def stats(self):
+        free_mb = self.memory_probe() if self.memory_probe else None
+        load = self.load_probe() if self.load_probe else None
+        return {
+            "limit": self.limit,
+            "floor": self.floor,
+            "ceiling": self.ceiling,
+            "in_flight": self.in_flight,
+            "queued": self._queued(),
+            "queue_wait_s": round(self.queue_wait, 3) if self.queue_wait is not None else None,
+            "latency_ratio": round(self.latency_ratio, 2) if self.latency_ratio is not None else None,
+            "free_memory_mb": round(free_mb, 0) if free_mb is not None else None,
+            "load_per_cpu": round(load, 2) if load is not None else None,
+            "last_reason": self.last_reason,
+            "classes": {
+                cls: {
+                    "weight": self.weights[cls],
+                    "queued": len(self._waiters[cls]),
+                    "granted": self._granted[cls],
+                    "queue_wait_s": round(self._class_wait[cls], 3) if self._class_wait[cls] is not None else None,
+                    "max_queue_wait_s": round(self._class_max_wait[cls], 3),
+                }
+                for cls in PRIORITY_CLASSES
+            },
+        }
@@ -1,7 +1,11 @@
 import csv
-from bs4 import BeautifulSoup
 import re
 import logging,sys
+
+from scrapper.api_records import map_api_records
+from scrapper.capture import SCRAPER_DEBUG, html_pages
+from scrapper.html_backend import parse_html
+from scrapper.js_extraction import build_extract_script
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -29,17 +33,89 @@ END_DURATION_SELECTOR = 'div[class*="timeInfoRight"]'
 # 5. Selector for the Final Price
 PRICE_SELECTOR = 'div[class*="priceSection"]'
 
+# --- Search API (GraphQL, captured over CDP) ---
+# Where the search response keeps its list of flights (see api_records.iter_results).
+# These paths and the keys below are not yet checked against live responses, which is
+# why FLIGHT_CDP_CAPTURE is off by default.
+API_RESULT_PATHS = ['data.flightsSearch.listingResult.listings']
+# Candidate JSON keys for each record field, first match wins
+API_FIELD_KEYS = {
+    'Airline': ['airlineName', 'carrier.name', 'marketingCarrierName'],
+    'Departure_Time': ['departureTime', 'departure.time', 'departureDateTime'],
+    'Departure_City': ['departureAirport.name', 'origin.name', 'departureLocation'],
+    'Arrival_Time': ['arrivalTime', 'arrival.time', 'arrivalDateTime'],
+    'Arrival_City': ['arrivalAirport.name', 'destination.name', 'arrivalLocation'],
+    'Layover_Duration': ['layoverDuration', 'connectionDuration'],
+    'Layover_City': ['layoverAirport.code', 'connectionAirport'],
+    'Price': ['price.formatted', 'totalPrice.formatted', 'formattedPrice', 'price.amount'],
+    'Offers': ['offerText'],
+}
+API_REQUIRED_FIELDS = ('Airline', 'Departure_Time', 'Arrival_Time', 'Price')
+API_DEFAULTS = {}
+
+# --- In-browser extraction ---
+OFFER_LISTING_SELECTOR = 'li[data-test-id="offer-listing"]'
+# JavaScript twin of extract_flight_data for one card; run through sb.execute_script.
+# ``state`` carries values over from the previous card the same way the Python loop does.
+BROWSER_EXTRACT_CARD = """
+function (card, state) {
+    var airline = 'N/A';
+    var secondarySection = card.querySelector('div[data-stid="secondary-section"]');
+    if (secondarySection) {
+        var labels = secondarySection.querySelectorAll('div.truncate-lines-2');
+        if (labels.length >= 2) {
+            var route = fx.strippedText(labels[0]).split(' - ');
+            airline = fx.strippedText(labels[1]);
+            state.departureCity = route[0];
+            state.arrivalCity = fx.defined(route[1]);
+        }
+    }
+    var tertiarySection = card.querySelector('div[data-stid="tertiary-section"]');
+    if (tertiarySection) {
+        var spans = tertiarySection.querySelectorAll('span');
+        var stops = spans.length >= 3 ? fx.strippedText(spans[2]) : null;
+        state.layoverDuration = null;
+        state.layoverCity = null;
+        if (stops !== 'Direct') {
+            var layover = fx.strippedText(tertiarySection.querySelectorAll('div.truncate-lines-2')[0]).split(' in ');
+            state.layoverDuration = layover[0];
+            state.layoverCity = fx.defined(layover[1]);
+        }
+    }
+    var times = card.querySelectorAll('div.step-indicator-brand-color-time');
+    var priceSection = card.querySelector('div[data-stid="price-column"]');
+    if (priceSection) {
+        var priceSpans = priceSection.querySelectorAll('span');
+        if (priceSpans.length < 2) { throw new Error('unexpected price column'); }
+        state.price = fx.strippedText(priceSpans[priceSpans.length === 2 ? 1 : 2]);
+    }
+    return {
+        'Airline': airline,
+        'Departure_Time': times.length > 0 ? fx.strippedText(times[0]) : 'N/A',
+        'Departure_City': fx.defined(state.departureCity),
+        'Arrival_Time': times.length > 1 ? fx.strippedText(times[1]) : 'N/A',
+        'Arrival_City': fx.defined(state.arrivalCity),
+        'Layover_Duration': fx.defined(state.layoverDuration),
+        'Layover_City': state.layoverCity,
+        'Price': fx.defined(state.price),
+        'Offers': null
+    };
+}
+"""
+BROWSER_EXTRACT_SCRIPT = build_extract_script(OFFER_LISTING_SELECTOR, BROWSER_EXTRACT_CARD)
+
 def write_html_to_file(html_content, filename="./scrapper/ss/mmt_pretty.html"):
     with open(filename, 'w', encoding='utf-8') as f:
         f.write(html_content)
 
-def extract_flight_data(html_content):
+def extract_flight_data(html_content, backend=None):
     """
-    Parses the HTML content to extract flight details using Beautiful Soup.
+    Parses the HTML content to extract flight details with the configured
+    HTML backend (FLIGHT_HTML_BACKEND, or ``backend``; see scrapper.html_backend).
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    pretty_html_string = soup.prettify()
-    write_html_to_file(pretty_html_string)
+    soup = parse_html(html_content, backend)
+    if SCRAPER_DEBUG:
+        write_html_to_file(soup.prettify())
     flight_data = []
     flight_html = soup.find_all('li',attrs={"data-test-id":"offer-listing"})
     for flight in flight_html:
@@ -86,7 +162,7 @@ def extract_flight_data(html_content):
                     price_element = price_element[2].get_text(strip=True)   
 
 
-            logger.info(flight,route,airline,dep_time,arr_time,duration,stops)
+            logger.debug(f"{route} {airline} {dep_time}-{arr_time} {duration} {stops}")
             flight_data.append({
                     'Airline': airline,
                     'Departure_Time': dep_time,
@@ -103,6 +179,13 @@ def extract_flight_data(html_content):
              
     return flight_data
 
+def extract_flight_data_from_api(payloads):
+    """
+    Maps search API JSON captured over CDP into the same records as extract_flight_data.
+    """
+    return map_api_records(payloads, API_RESULT_PATHS, API_FIELD_KEYS, API_REQUIRED_FIELDS,
+                           defaults=API_DEFAULTS)
+
 def save_to_csv(data, filename):
     """Saves the extracted data to a CSV file."""
     if not data:
@@ -120,8 +203,19 @@ def save_to_csv(data, filename):
         logger.info(f"Error saving to CSV: {e}")
 
 
-def parse_flight_data():
-    """Main function to run the script."""
+def parse_flight_data(scraped=None):
+    """
+    Parses the results markup captured by scrap_data (a ScrapeResult or raw HTML).
+    Without one, falls back to the saved page at HTML_FILE_PATH.
+    """
+    if scraped is not None:
+        if getattr(scraped, "cards", None):
+            return scraped.cards
+        api_records = extract_flight_data_from_api(getattr(scraped, "api_payloads", None) or [])
+        if api_records:
+            return api_records
+        pages = html_pages(scraped)
+        return extract_flight_data(pages[-1]) if pages else []
     try:
         with open(HTML_FILE_PATH, 'r', encoding='utf-8') as f:
             html_content = f.read()
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from scrapper.http_fetch import base_url_for, fetch_into_result
+
+BASE_URL = base_url_for("expedia", "https://www.expedia.co.in")
+
+
+async def fetch_data(origin, destination, travel_date, request_id=None, client=None):
+    """
+    Browserless counterpart of expedia_scrap.scrap_data: fetches the search page over
+    the pooled HTTP client and returns a ScrapeResult for ``parse_flight_data``.
+    Format for expedia: travel_date=02/01/2026
+    """
+    iso_date = datetime.strptime(travel_date, "%d/%m/%Y")
+    params = {
+        "flight-type": "on",
+        "mode": "search",
+        "trip": "oneway",
+        "leg1": f"from: ({origin}),to: ({destination}),departure:{travel_date}TANYT,fromType:U,toType:AIRPORT",
+        "options": "cabinclass:economy",
+        "fromDate": travel_date,
+        "d1": f"{iso_date.year}-{iso_date.month}-{iso_date.day}",
+        "passengers": "adults:1,infantinlap:N",
+    }
+    return await fetch_into_result("expedia", f"{BASE_URL}/Flights-Search", params=params,
+                                   request_id=request_id, client=client)
@@ -1,32 +1,84 @@
+from datetime import datetime
+import logging
+import sys
+
 from seleniumbase import SB
 
-def scrap_data(origin="LKO", destination="DEL", travel_date="02/01/2026"):
+from scrapper.browser_pool import ensure_window_size
+from scrapper.capture import ScrapeResult, new_request_id
+from scrapper.expedia.data_extraction import BROWSER_EXTRACT_SCRIPT, extract_flight_data_from_api
+from scrapper.js_extraction import JS_EXTRACT, extract_in_browser
+from scrapper.network_capture import CDP_CAPTURE, ResponseCapture, wait_for_results
+from scrapper.readiness import ReadinessStrategy
+from scrapper.resource_blocking import BlockingPolicy, block_resources
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr 
+)
+logger = logging.getLogger(__name__)
+
+# Results are ready once the offer list stops growing
+READINESS = ReadinessStrategy(selector='li[data-test-id=offer-listing]', timeout=20)
+# Expedia loads its listings through GraphQL
+API_URL_PATTERNS = [r"expedia\.co\.in/graphql"]
+# The 1400x8000 window would otherwise pull every airline logo and ad slot on the page
+RESOURCE_POLICY = BlockingPolicy()
+
+def search_url(origin, destination, travel_date):
+    """Format for expedia: travel_date=02/01/2026"""
+    iso_date = datetime.strptime(travel_date, "%d/%m/%Y")
+    return f"https://www.expedia.co.in/Flights-Search?flight-type=on&mode=search&trip=oneway&leg1=from:%20({origin}),to:%20({destination}),departure:{travel_date}TANYT,fromType:U,toType:AIRPORT&options=cabinclass:economy&fromDate={travel_date}&d1={iso_date.year}-{iso_date.month}-{iso_date.day}&passengers=adults:1,infantinlap:N"
+
+def scrap_data(origin="LKO", destination="DEL", travel_date="02/01/2026", sb=None, request_id=None, cancel=None):
     '''
     Format for mmt: travel_date="18/11/2025"
     Format for ixigo: travel_date=15122025
     Format for expedia: travel_date=02/01/2026
+    Pass ``sb`` to reuse a pooled browser instead of launching one; a cancelled
+    ``cancel`` CancelToken aborts the scrape at its next wait.
+    Returns a ScrapeResult holding the results list markup, or the GraphQL
+    payloads when those are captured over CDP.
     '''
     #with SB(uc=True, test=True, headless2=True) as sb:
+    if sb is None:
+        with SB(uc=True, test=True) as sb:
+            return scrap_data(origin, destination, travel_date, sb=sb, request_id=request_id, cancel=cancel)
+    result = ScrapeResult(provider="expedia", request_id=request_id or new_request_id())
+    capture = ResponseCapture(API_URL_PATTERNS) if CDP_CAPTURE else None
+    blocker = None
     try:
-        with SB(uc=True, test=True) as sb:    
-            #url = f"https://www.makemytrip.com/flight/search?itinerary={origin}-{destination}-{travel_date}&tripType=O&paxType=A-1_C-0_I-0&intl=false&cabinClass=E&lang=eng"
-            url = f"https://www.expedia.co.in/Flights-Search?flight-type=on&mode=search&trip=oneway&leg1=from:%20({origin}),to:%20({destination}),departure:{travel_date}TANYT,fromType:U,toType:AIRPORT&options=cabinclass:economy&fromDate=02/01/2026&d1=2026-1-2&passengers=adults:1,infantinlap:N"
-            #url = f"https://www.ixigo.com/search/result/flight?from={origin}&to={destination}&date={travel_date}&adults=1&children=0&infants=0&class=e&source=Search+Form"
-            sb.set_window_size(1400, 8000)
-
-            sb.activate_cdp_mode(url)
-            sb.activate_jquery()
-            sb.sleep(12)
-            
-            sb.sleep(2)
-            
-            sr = sb.get_page_source()
+        #url = f"https://www.makemytrip.com/flight/search?itinerary={origin}-{destination}-{travel_date}&tripType=O&paxType=A-1_C-0_I-0&intl=false&cabinClass=E&lang=eng"
+        url = search_url(origin, destination, travel_date)
+        #url = f"https://www.ixigo.com/search/result/flight?from={origin}&to={destination}&date={travel_date}&adults=1&children=0&infants=0&class=e&source=Search+Form"
+        ensure_window_size(sb, 1400, 8000)
+
+        blocker = block_resources(sb, RESOURCE_POLICY, "expedia")
+        if capture:
+            capture.attach(sb)
+        sb.activate_cdp_mode(url)
+        result.api_payloads = wait_for_results(sb, READINESS, "expedia", capture, extract_flight_data_from_api,
+                                               cancel=cancel)
+        if result.api_payloads:
+            logger.info(f"Scraping completed from search API ({result.request_id})")
+            return result
+        sb.activate_jquery()
+        
+        if JS_EXTRACT:
+            result.cards = extract_in_browser(sb, BROWSER_EXTRACT_SCRIPT, "expedia") or []
+        if not result.cards:
             sr = sb.get_attribute("#app-flights-shopping-pwa div","innerHTML")
-            write_to_file(sr,filename=f"./scrapper/ss/mmt_res_expedia.html",mode="w")
-            print("Scraping completed")
-            sb.quit()
+            result.add_page(sr)
+        logger.info(f"Scraping completed ({result.request_id})")
+        return result
     except Exception as e:
-        print(e)
+        logger.error(f"Error during scraping: {e}")
+        raise e
+    finally:
+        if capture:
+            capture.detach()
+        if blocker:
+            blocker.detach(sb)
 
 def write_to_file(content, filename="./scrapper/mmt_res.html",mode="a"):
     with open(filename, mode, encoding="utf-8") as f:
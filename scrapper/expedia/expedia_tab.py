@@ -0,0 +1,44 @@
+import logging
+import sys
+
+from scrapper.capture import ScrapeResult, new_request_id
+from scrapper.expedia.data_extraction import BROWSER_EXTRACT_SCRIPT, extract_flight_data_from_api
+from scrapper.expedia.expedia_scrap import API_URL_PATTERNS, READINESS, RESOURCE_POLICY, search_url
+from scrapper.js_extraction import JS_EXTRACT, evaluate_in_tab, extract_in_tab
+from scrapper.network_capture import wait_for_results_async
+from scrapper.tab_engine import tab_engine
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# The tab's viewport stands in for the 1400x8000 window of the SB scraper
+VIEWPORT = (1400, 8000)
+RESULTS_HTML_SCRIPT = "return document.querySelector('#app-flights-shopping-pwa div').innerHTML;"
+
+
+async def scrap_data(origin, destination, travel_date, request_id=None, engine=None):
+    """
+    Async counterpart of expedia_scrap.scrap_data, run in a tab of the shared
+    TabEngine browser.
+    Format for expedia: travel_date=02/01/2026
+    """
+    engine = engine or tab_engine
+    result = ScrapeResult(provider="expedia", request_id=request_id or new_request_id())
+    url = search_url(origin, destination, travel_date)
+    async with engine.tab("expedia", RESOURCE_POLICY, API_URL_PATTERNS, VIEWPORT) as (tab, capture):
+        await tab.get(url)
+        result.api_payloads = await wait_for_results_async(tab, READINESS, "expedia", capture,
+                                                           extract_flight_data_from_api)
+        if result.api_payloads:
+            logger.info(f"Scraping completed from search API ({result.request_id})")
+            return result
+        if JS_EXTRACT:
+            result.cards = await extract_in_tab(tab, BROWSER_EXTRACT_SCRIPT, "expedia") or []
+        if not result.cards:
+            result.add_page(await evaluate_in_tab(tab, RESULTS_HTML_SCRIPT))
+    logger.info(f"Scraping completed in a tab ({result.request_id})")
+    return result
@@ -0,0 +1,83 @@
+import re
+
+# First amount in a price string: "₹ 5,432", "$120.50", "5432"
+PRICE_AMOUNT = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def parse_price(value):
+    """Returns the amount of a scraped price as a float, or None when it has none."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = PRICE_AMOUNT.search(value)
+    if not match:
+        return None
+    return float(match.group().replace(",", ""))
+
+
+def cheapest_price(flights):
+    """Lowest parsable ``Price`` among ``flights``, or None."""
+    prices = [price for price in (parse_price(flight.get("Price")) for flight in flights) if price is not None]
+    return min(prices) if prices else None
+
+
+# Clock times as the cards show them: "06:05", "6:05 pm", "18:05+1"
+CLOCK_TIME = re.compile(r"(\d{1,2}):(\d{2})\s*([ap]\.?m\.?)?", re.IGNORECASE)
+
+
+def parse_clock_minutes(value):
+    """Minutes after midnight of a scraped "HH:MM" (optionally am/pm) time, or None."""
+    if not isinstance(value, str):
+        return None
+    match = CLOCK_TIME.search(value)
+    if not match:
+        return None
+    hours, minutes, meridiem = int(match.group(1)), int(match.group(2)), match.group(3)
+    if meridiem:
+        hours = hours % 12 + (12 if meridiem.lower().startswith("p") else 0)
+    if hours > 23 or minutes > 59:
+        return None
+    return hours * 60 + minutes
+
+
+# Journey durations as the cards show them: "2h 15m", "02 h 10 m", "1 hr 5 min", "55m"
+DURATION = re.compile(r"(?:(\d+)\s*h(?:rs?|ours?)?)?\s*(?:(\d+)\s*m(?:in(?:utes?|s)?)?)?", re.IGNORECASE)
+
+
+def parse_duration_minutes(value):
+    """Minutes of a scraped journey duration, or None when it has none."""
+    if not isinstance(value, str):
+        return None
+    for match in DURATION.finditer(value):
+        if match.group(1) or match.group(2):
+            return int(match.group(1) or 0) * 60 + int(match.group(2) or 0)
+    return None
+
+
+def flight_minutes(flight):
+    """
+    Journey time of a flight in minutes: its ``Duration`` when the card has
+    one, else the span from departure to arrival (past midnight if it lands
+    earlier than it left). None when neither can be read.
+    """
+    minutes = parse_duration_minutes(flight.get("Duration"))
+    if minutes:
+        return minutes
+    departed = parse_clock_minutes(flight.get("Departure_Time"))
+    arrived = parse_clock_minutes(flight.get("Arrival_Time"))
+    if departed is None or arrived is None:
+        return None
+    return (arrived - departed) % (24 * 60) or None
+
+
+def cheapest_flights(flights, limit=None):
+    """Priced ``flights`` sorted by fare, cheapest first."""
+    priced = [flight for flight in flights if parse_price(flight.get("Price")) is not None]
+    return sorted(priced, key=lambda flight: parse_price(flight.get("Price")))[:limit]
+
+
+def fastest_flight(flights):
+    """Flight with the shortest readable journey time, or None."""
+    timed = [flight for flight in flights if flight_minutes(flight) is not None]
+    return min(timed, key=flight_minutes) if timed else None
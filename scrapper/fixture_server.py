@@ -0,0 +1,82 @@
+"""
+Local stand-in for the provider sites that replays the saved scrapper/ss pages.
+
+Point the browserless fetchers at it to exercise the HTTP path end to end:
+
+    python -m scrapper.fixture_server --port 8765
+    FLIGHT_HTTP_PROVIDERS=mmt,ixigo,expedia \
+    FLIGHT_HTTP_BASE_URL_MMT=http://127.0.0.1:8765 \
+    FLIGHT_HTTP_BASE_URL_IXIGO=http://127.0.0.1:8765 \
+    FLIGHT_HTTP_BASE_URL_EXPEDIA=http://127.0.0.1:8765 \
+    python mcp_tool/flight_search_server.py
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "ss")
+# Search path of each provider -> saved results page
+FIXTURE_ROUTES = {
+    "/flight/search": "mmt1_res.html",
+    "/search/result/flight": "mmt_res.html",
+    "/Flights-Search": "mmt_res_expedia.html",
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pages = {}
+
+    def do_GET(self):
+        body = self.pages.get(urlparse(self.path).path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def load_pages(fixture_dir=FIXTURE_DIR):
+    pages = {}
+    for path, filename in FIXTURE_ROUTES.items():
+        with open(os.path.join(fixture_dir, filename), "rb") as f:
+            pages[path] = f.read()
+    return pages
+
+
+def serve_fixtures(host="127.0.0.1", port=0):
+    """Starts the stand-in server on a background thread; returns it (see ``server_address``)."""
+    handler = type("Handler", (FixtureHandler,), {"pages": load_pages()})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Serving scrapper/ss fixtures on http://{host}:{server.server_address[1]}")
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = serve_fixtures(args.host, args.port)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
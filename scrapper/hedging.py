@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import defaultdict, deque
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Default of search_flights' hedge parameter
+HEDGE_DEFAULT = os.getenv("FLIGHT_HEDGE", "0") == "1"
+# A second attempt starts once the first has run longer than this percentile of the provider's scrapes
+HEDGE_PERCENTILE = float(os.getenv("FLIGHT_HEDGE_PERCENTILE", "90"))
+# Scrapes of a provider needed before it is hedged at all
+HEDGE_MIN_SAMPLES = int(os.getenv("FLIGHT_HEDGE_MIN_SAMPLES", "5"))
+HEDGE_MIN_DELAY = float(os.getenv("FLIGHT_HEDGE_MIN_DELAY", "1.0"))
+LATENCY_HISTORY = 100      # recent scrapes per provider the percentile is taken from
+
+
+class Hedger:
+    """
+    Hedged provider requests. ``run`` starts one attempt; if it has not
+    returned after the provider's ``percentile`` scrape latency, a second
+    attempt (another pooled browser, tab or request) races it and the first
+    usable result wins, the other attempt being cancelled. Latencies and the
+    hedge delay count from when an attempt got its slot, not its queue wait.
+    """
+
+    def __init__(self, percentile=HEDGE_PERCENTILE, min_samples=HEDGE_MIN_SAMPLES,
+                 min_delay=HEDGE_MIN_DELAY, clock=time.monotonic):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.clock = clock
+        self._latencies = defaultdict(lambda: deque(maxlen=LATENCY_HISTORY))
+        self.hedged = defaultdict(int)   # second attempts started per provider
+        self.won = defaultdict(int)      # ... that returned first
+        self.skipped = defaultdict(int)  # hedges not started because searches were queued
+
+    def record(self, provider, seconds):
+        self._latencies[provider].append(seconds)
+
+    def delay(self, provider):
+        """Seconds to wait before hedging ``provider``, or None while its history is too short."""
+        latencies = sorted(self._latencies.get(provider, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        index = min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))
+        return max(self.min_delay, latencies[index])
+
+    async def _timed(self, provider, attempt, admitted):
+        """Awaits ``attempt(on_admitted)``, timing it from when it reports getting its slot."""
+        start = []
+        def on_admitted():
+            start.append(self.clock())
+            if not admitted.done():
+                admitted.set_result(None)
+        result = await attempt(on_admitted)
+        if result is not None and start:
+            self.record(provider, self.clock() - start[0])
+        return result
+
+    async def run(self, provider, attempt, hedge=True, busy=None):
+        """
+        Awaits ``attempt(on_admitted)`` (a coroutine factory that calls
+        ``on_admitted()`` once it holds its slot and starts the scrape),
+        hedging it when ``hedge``. The hedge delay runs from the primary's
+        admission, and no second attempt is started while ``busy()`` is true
+        (other searches are queued for slots). A result of None or an
+        exception counts as unusable; if both attempts end unusable the
+        primary's outcome is returned or raised.
+        """
+        admitted = asyncio.get_running_loop().create_future()
+        primary = asyncio.ensure_future(self._timed(provider, attempt, admitted))
+        delay = self.delay(provider) if hedge else None
+        if delay is None:
+            return await primary
+        tasks = [primary]
+        try:
+            await asyncio.wait([primary, admitted], return_when=asyncio.FIRST_COMPLETED)
+            if not primary.done():
+                await asyncio.wait(tasks, timeout=delay)
+            if primary.done():
+                return primary.result()
+            if busy is not None and busy():
+                logger.info(f"{provider} has not returned after {delay:.1f}s, but searches are queued; not hedging.")
+                self.skipped[provider] += 1
+                return await primary
+            logger.info(f"{provider} has not returned after {delay:.1f}s (p{self.percentile:.0f}); hedging.")
+            self.hedged[provider] += 1
+            tasks.append(asyncio.ensure_future(self._timed(provider, attempt, admitted)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None and task.result() is not None:
+                        if task is not primary:
+                            self.won[provider] += 1
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self):
+        return {
+            provider: {"hedge_after_s": round(self.delay(provider), 2) if self.delay(provider) is not None else None,
+                       "samples": len(latencies), "hedged": self.hedged[provider],
+                       "hedge_won": self.won[provider], "hedge_skipped": self.skipped[provider]}
+            for provider, latencies in self._latencies.items()
+        }
@@ -0,0 +1,123 @@
+import logging
+import os
+import sys
+
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # the fast path is optional; BeautifulSoup backends are used instead
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401  (only needs to be importable for BeautifulSoup's "lxml" builder)
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# HTML parser behind extract_flight_data: selectolax (lexbor), lxml, html.parser, or auto
+# (the fastest one installed)
+HTML_BACKEND = os.getenv("FLIGHT_HTML_BACKEND", "auto")
+BACKENDS = ("selectolax", "lxml", "html.parser")
+
+
+def _css_string(value):
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class LexborNode:
+    """
+    selectolax (lexbor) node exposing the BeautifulSoup subset the card
+    extractors use: select/select_one, find/find_all by tag, class and
+    attributes, ``text`` and ``get_text(strip=True)``. Whitespace-only text is
+    collapsed like BeautifulSoup does (cards hold no <pre> or <textarea>).
+
+    Matching follows BeautifulSoup: a one-word class matches any of an
+    element's classes, a multi-word class the whole (whitespace-normalised)
+    class attribute.
+    """
+
+    __slots__ = ("_node",)
+
+    def __init__(self, node):
+        self._node = node
+
+    def select(self, selector):
+        return [LexborNode(node) for node in self._node.css(selector)]
+
+    def select_one(self, selector):
+        node = self._node.css_first(selector)
+        return LexborNode(node) if node is not None else None
+
+    def find_all(self, name=None, attrs=None, class_=None):
+        attrs = dict(attrs or {})
+        if class_ is not None:
+            attrs["class"] = class_
+        exact_class = None
+        selector = name or "*"
+        for attr, value in attrs.items():
+            if attr == "class" and len(value.split()) > 1:
+                exact_class = " ".join(value.split())
+                selector += "".join(f"[class~={_css_string(token)}]" for token in value.split())
+            elif attr == "class":
+                selector += f"[class~={_css_string(value)}]"
+            else:
+                selector += f"[{attr}={_css_string(value)}]"
+        nodes = self._node.css(selector)
+        if exact_class is not None:
+            nodes = [node for node in nodes if " ".join((node.attributes.get("class") or "").split()) == exact_class]
+        return [LexborNode(node) for node in nodes]
+
+    def find(self, name=None, attrs=None, class_=None):
+        found = self.find_all(name, attrs, class_)
+        return found[0] if found else None
+
+    @property
+    def text(self):
+        # BeautifulSoup collapses whitespace-only strings to one newline or space
+        parts = []
+        for node in self._node.traverse(include_text=True):
+            if node.tag != "-text":
+                continue
+            value = node.text_content
+            if not value.strip():
+                value = "\n" if "\n" in value else " "
+            parts.append(value)
+        return "".join(parts)
+
+    def get_text(self, strip=False):
+        return self._node.text(deep=True, strip=strip)
+
+    def prettify(self):
+        return self._node.html
+
+
+def resolve_backend(backend=None):
+    """Name of the backend ``backend`` (default HTML_BACKEND) resolves to on this install."""
+    backend = backend or HTML_BACKEND
+    if backend not in BACKENDS + ("auto",):
+        raise ValueError(f"Unknown FLIGHT_HTML_BACKEND {backend!r}; expected one of {BACKENDS + ('auto',)}")
+    if backend in ("auto", "selectolax") and LexborHTMLParser is not None:
+        return "selectolax"
+    if backend in ("auto", "selectolax", "lxml") and LXML_AVAILABLE:
+        return "lxml"
+    return "html.parser"
+
+
+def parse_html(html_content, backend=None):
+    """
+    Parses a captured page with the configured backend. The result supports the
+    BeautifulSoup calls the extractors make, whichever backend produced it.
+    """
+    backend = resolve_backend(backend)
+    if backend == "selectolax":
+        return LexborNode(LexborHTMLParser(html_content).root)
+    return BeautifulSoup(html_content, backend)
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import os
+import sys
+import weakref
+
+import httpx
+
+from scrapper.capture import ScrapeResult, new_request_id
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+HTTP_TIMEOUT = float(os.getenv("FLIGHT_HTTP_TIMEOUT", "20"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("FLIGHT_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("FLIGHT_HTTP_MAX_KEEPALIVE", "20"))
+# In-flight HTTP searches; beyond it fetches queue and are admitted by priority class
+HTTP_CONCURRENCY = int(os.getenv("FLIGHT_HTTP_CONCURRENCY", "8"))
+DEFAULT_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"),
+    "Accept": "text/html,application/json;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-IN,en;q=0.9",
+}
+
+# One pooled client per event loop; its cookie jar is shared by every request
+_clients = weakref.WeakKeyDictionary()
+
+
+def base_url_for(provider, default):
+    """Provider base URL, overridable with FLIGHT_HTTP_BASE_URL_<PROVIDER> (e.g. a fixture server)."""
+    return os.getenv(f"FLIGHT_HTTP_BASE_URL_{provider.upper()}", default).rstrip("/")
+
+
+def get_client():
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            headers=DEFAULT_HEADERS,
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                                max_keepalive_connections=HTTP_MAX_KEEPALIVE),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_client():
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def fetch_into_result(provider, url, params=None, request_id=None, client=None):
+    """
+    GETs ``url`` on the pooled client and wraps the body in a ScrapeResult:
+    JSON responses become ``api_payloads``, anything else a captured page.
+    """
+    client = client or get_client()
+    result = ScrapeResult(provider=provider, request_id=request_id or new_request_id())
+    response = await client.get(url, params=params)
+    response.raise_for_status()
+    if "json" in response.headers.get("content-type", ""):
+        result.api_payloads.append(response.json())
+    else:
+        result.add_page(response.text)
+    logger.info(f"Fetched {provider} over {response.http_version} in "
+                f"{response.elapsed.total_seconds():.2f}s ({result.request_id})")
+    return result
@@ -0,0 +1,72 @@
+import heapq
+import os
+
+from scrapper.fares import parse_clock_minutes, parse_price
+
+# --- Configuration ---
+# Combinations of leg flights examined, cheapest first, before ranking gives up on more itineraries
+ITINERARY_MAX_COMBINATIONS = int(os.getenv("FLIGHT_ITINERARY_MAX_COMBINATIONS", "20000"))
+# Shortest connection accepted between two legs flown on the same day
+MIN_CONNECTION_MINUTES = int(os.getenv("FLIGHT_MIN_CONNECTION_MINUTES", "90"))
+
+
+def _connects(previous, following, same_day):
+    """False only when both legs are on one day and the times show the connection cannot be made."""
+    if not same_day:
+        return True
+    departed = parse_clock_minutes(previous.get("Departure_Time"))
+    arrived = parse_clock_minutes(previous.get("Arrival_Time"))
+    leaves = parse_clock_minutes(following.get("Departure_Time"))
+    if arrived is None or leaves is None:
+        return True
+    if departed is not None and arrived < departed:
+        return False  # lands the next day
+    return leaves - arrived >= MIN_CONNECTION_MINUTES
+
+
+def rank_itineraries(leg_flights, leg_dates, limit=10, max_combinations=ITINERARY_MAX_COMBINATIONS):
+    """
+    Combines per-leg flight lists into itineraries ranked by total price.
+
+    ``leg_flights`` holds one list of flights per leg and ``leg_dates`` each
+    leg's travel date. Priced flights (one per airline and times, whichever
+    provider lists it) are combined cheapest total first, and combinations
+    whose same-day legs leave less than MIN_CONNECTION_MINUTES are passed
+    over, until ``limit`` itineraries are found or ``max_combinations`` were
+    examined. Returns dicts with ``total_price`` and the chosen ``legs``.
+    """
+    candidates = []
+    for flights in leg_flights:
+        cheapest = {}  # the same flight listed by several providers is kept once, at its lowest fare
+        for flight in flights:
+            price = parse_price(flight.get("Price"))
+            if price is None:
+                continue
+            key = (flight.get("Airline"), flight.get("Departure_Time"), flight.get("Arrival_Time"))
+            if key not in cheapest or price < cheapest[key][0]:
+                cheapest[key] = (price, flight)
+        if not cheapest:
+            return []
+        candidates.append(sorted(cheapest.values(), key=lambda priced: priced[0]))
+
+    def total(indexes):
+        return sum(candidates[leg][i][0] for leg, i in enumerate(indexes))
+
+    # Best-first over per-leg indexes: a popped combination is the cheapest not yet examined
+    start = (0,) * len(candidates)
+    heap, seen = [(total(start), start)], {start}
+    itineraries, examined = [], 0
+    while heap and len(itineraries) < limit and examined < max_combinations:
+        price, indexes = heapq.heappop(heap)
+        examined += 1
+        flights = [candidates[leg][i][1] for leg, i in enumerate(indexes)]
+        if all(_connects(flights[i], flights[i + 1], leg_dates[i] == leg_dates[i + 1])
+               for i in range(len(flights) - 1)):
+            itineraries.append({"total_price": round(price, 2), "legs": flights})
+        for leg in range(len(indexes)):
+            if indexes[leg] + 1 < len(candidates[leg]):
+                following = indexes[:leg] + (indexes[leg] + 1,) + indexes[leg + 1:]
+                if following not in seen:
+                    seen.add(following)
+                    heapq.heappush(heap, (total(following), following))
+    return itineraries
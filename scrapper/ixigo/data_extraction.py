@@ -1,6 +1,18 @@
 import csv
-from bs4 import BeautifulSoup
 import re
+import logging
+import sys
+
+from scrapper.api_records import map_api_records
+from scrapper.capture import SCRAPER_DEBUG, html_pages
+from scrapper.html_backend import parse_html
+from scrapper.js_extraction import build_extract_script
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr 
+)
+logger = logging.getLogger(__name__)
 
 # --- Configuration ---
 HTML_FILE_PATH = ["./scrapper/ss/mmt_res_0.html",
@@ -14,21 +26,95 @@ HTML_FILE_PATH = ["./scrapper/ss/mmt_res_0.html",
                     ]
 OUTPUT_CSV_PATH = "flight_data_extracted.csv"
 
+# --- Search API (captured over CDP) ---
+# Where the search response keeps its list of flights (see api_records.iter_results).
+# These paths and the keys below are not yet checked against live responses, which is
+# why FLIGHT_CDP_CAPTURE is off by default.
+API_RESULT_PATHS = ['data.flights', 'data.results.*.flights']
+# Candidate JSON keys for each record field, first match wins
+API_FIELD_KEYS = {
+    'Airline': ['airlineName', 'airline.name', 'carrierName'],
+    'flight_no': ['flightNumber', 'flightNo', 'flightCode'],
+    'Departure_Time': ['departureTime', 'depTime', 'departure.time'],
+    'Departure_City': ['origin', 'departureAirportCode', 'from'],
+    'Duration': ['durationText', 'duration', 'totalDuration'],
+    'Arrival_Time': ['arrivalTime', 'arrTime', 'arrival.time'],
+    'Arrival_City': ['destination', 'arrivalAirportCode', 'to'],
+    'flight_type': ['stopsText', 'stops'],
+    'Layover_Duration': ['layoverDuration'],
+    'Layover_City': ['layoverCity'],
+    'Price': ['fare.totalFare', 'totalFare', 'displayFare', 'price'],
+    'Offers': ['offerText', 'discountText'],
+    'extra_badges': ['badgeText', 'tag'],
+}
+API_REQUIRED_FIELDS = ('Airline', 'Departure_Time', 'Arrival_Time', 'Price')
+API_DEFAULTS = {'flight_type': 'Standard'}
+
+# --- In-browser extraction ---
+FLIGHT_CARD_SELECTOR = 'div.shadow-card'
+# JavaScript twin of extract_flight_data for one card; run through sb.execute_script.
+# ``state`` carries values over from the previous card the same way the Python loop does.
+BROWSER_EXTRACT_CARD = """
+function (card, state) {
+    var airlineInfo = card.querySelector('div.airlineInfo');
+    if (!airlineInfo) { return null; }
+    var badgeArea = fx.findExactClass(card, 'div', 'absolute -top-2 left-20');
+    var badge = badgeArea ? badgeArea.querySelector('span') : null;
+    var flightOffer = badge ? fx.strippedText(badge) : null;
+    var airlineFlightDetails = airlineInfo.querySelectorAll('p');
+    state.airline = fx.strippedText(airlineFlightDetails[0]);
+    state.flightNo = fx.strippedText(airlineFlightDetails[1]);
+    var times = fx.findAllExactClass(card, 'h6', 'h6 text-primary font-medium');
+    var timeTile = card.querySelector('div.timeTile');
+    if (timeTile) {
+        var locations = timeTile.querySelectorAll('p');
+        state.departureCity = locations[0].textContent.trim();
+        state.duration = locations[1].textContent.trim();
+        state.arrivalCity = locations[3].textContent.trim();
+    }
+    var priceSection = card.querySelector('div.text-right');
+    var price = null;
+    var offers = null;
+    if (priceSection) {
+        price = priceSection.querySelector('div.items-baseline').textContent.trim();
+        offers = priceSection.querySelector('span.dynot').textContent.trim();
+    }
+    return {
+        'Airline': state.airline,
+        'flight_no': state.flightNo,
+        'Departure_Time': times[0].textContent.trim(),
+        'Departure_City': fx.defined(state.departureCity),
+        'Duration': fx.defined(state.duration),
+        'Arrival_Time': times[1].textContent.trim(),
+        'Arrival_City': fx.defined(state.arrivalCity),
+        'flight_type': flightOffer === null ? 'Standard' : flightOffer,
+        'Layover_Duration': null,
+        'Layover_City': null,
+        'Price': price,
+        'Offers': offers,
+        'extra_badges': flightOffer
+    };
+}
+"""
+BROWSER_EXTRACT_SCRIPT = build_extract_script(FLIGHT_CARD_SELECTOR, BROWSER_EXTRACT_CARD)
+
 def write_html_to_file(html_content, filename="./scrapper/ss/mmt_pretty.html"):
     with open(filename, 'w', encoding='utf-8') as f:
         f.write(html_content)
 
-def extract_flight_data(html_content,index):
+def extract_flight_data(html_content,index,backend=None):
     """
-    Parses the HTML content to extract flight details using Beautiful Soup.
+    Parses the HTML content to extract flight details with the configured
+    HTML backend (FLIGHT_HTML_BACKEND, or ``backend``; see scrapper.html_backend).
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    pretty_html_string = soup.prettify()
-    write_html_to_file(pretty_html_string)
+    soup = parse_html(html_content, backend)
+    if SCRAPER_DEBUG:
+        write_html_to_file(soup.prettify())
     flights_data = []
-    print(index)
+    logger.debug(f"Parsing ixigo page {index}")
+    # Skip the sort/filter strip (also a shadow-card); scraped pages hold only flight cards
     flight_listings = soup.find_all('div', class_='shadow-card')
-    flight_listings = flight_listings[1:]
+    flight_listings = [card for card in flight_listings if card.find('div', class_='airlineInfo')]
     for flight in flight_listings:
        # try:
             # 2. Extract Type (Cheapest, 3rd Fastest, Free Meal)
@@ -101,6 +187,13 @@ def extract_flight_data(html_content,index):
     #print(f"\nExtraction complete: {len(flights_data)} flights extracted from {index}")        
     return flights_data
 
+def extract_flight_data_from_api(payloads):
+    """
+    Maps search API JSON captured over CDP into the same records as extract_flight_data.
+    """
+    return map_api_records(payloads, API_RESULT_PATHS, API_FIELD_KEYS, API_REQUIRED_FIELDS,
+                           defaults=API_DEFAULTS)
+
 def save_to_csv(data, filename):
     """Saves the extracted data to a CSV file."""
     if not data:
@@ -118,9 +211,22 @@ def save_to_csv(data, filename):
         print(f"Error saving to CSV: {e}")
 
 
-def parse_flight_data():
-    """Main function to run the script."""
+def parse_flight_data(scraped=None):
+    """
+    Parses the pages captured by scrap_data (a ScrapeResult or raw HTML); each
+    scraped page holds only cards not seen on earlier scrolls, so no dedupe is
+    needed. Without one, falls back to the saved HTML_FILE_PATH snapshots.
+    """
     flight_data = []
+    if scraped is not None:
+        if getattr(scraped, "cards", None):
+            return scraped.cards
+        api_records = extract_flight_data_from_api(getattr(scraped, "api_payloads", None) or [])
+        if api_records:
+            return api_records
+        for index, html_content in enumerate(html_pages(scraped)):
+            flight_data.extend(extract_flight_data(html_content, index))
+        return flight_data
     for i in HTML_FILE_PATH:
         try:
             with open(i, 'r', encoding='utf-8') as f:
@@ -135,9 +241,9 @@ def parse_flight_data():
 
         flight_data.extend(extract_flight_data(html_content,i))
     flight_data = [dict(fs) for fs in set(frozenset(d.items()) for d in flight_data)]
-    print(flight_data)
+    return flight_data
    # save_to_csv(flight_data, OUTPUT_CSV_PATH)
 
 
 if __name__ == "__main__":
-    parse_flight_data()
\ No newline at end of file
+    print(parse_flight_data())
\ No newline at end of file
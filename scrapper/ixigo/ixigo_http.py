@@ -0,0 +1,23 @@
+from scrapper.http_fetch import base_url_for, fetch_into_result
+
+BASE_URL = base_url_for("ixigo", "https://www.ixigo.com")
+
+
+async def fetch_data(origin, destination, travel_date, request_id=None, client=None):
+    """
+    Browserless counterpart of ixigo_scrap.scrap_data: fetches the search page over
+    the pooled HTTP client and returns a ScrapeResult for ``parse_flight_data``.
+    Format for ixigo: travel_date=15122025 (18/11/2025 is converted)
+    """
+    params = {
+        "from": origin,
+        "to": destination,
+        "date": travel_date.replace("/", ""),
+        "adults": 1,
+        "children": 0,
+        "infants": 0,
+        "class": "e",
+        "source": "Search Form",
+    }
+    return await fetch_into_result("ixigo", f"{BASE_URL}/search/result/flight", params=params,
+                                   request_id=request_id, client=client)
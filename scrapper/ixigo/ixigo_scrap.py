@@ -1,76 +1,199 @@
 from seleniumbase import SB
+import json
 import logging
+import os
 import sys
 
 from scrapper.mmt.mmt_scrap import scrap_sb
+from scrapper.browser_pool import ensure_window_size
+from scrapper.cancellation import check_cancelled
+from scrapper.capture import DEBUG_DIR, SCRAPER_DEBUG, ScrapeResult, new_request_id
+from scrapper.ixigo.data_extraction import BROWSER_EXTRACT_CARD, extract_flight_data_from_api
+from scrapper.js_extraction import JS_EXTRACT, JS_HELPERS
+from scrapper.network_capture import CDP_CAPTURE, ResponseCapture, wait_for_results
+from scrapper.readiness import ReadinessStrategy, wait_until_ready
+from scrapper.resource_blocking import BlockingPolicy, block_resources
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     stream=sys.stderr 
 )
 logger = logging.getLogger(__name__)
-def scrap_data(origin="LKO", destination="DEL", travel_date="25122025"):
+
+# The first shadow-card is the filter/summary strip, so wait for at least one flight after it
+READINESS = ReadinessStrategy(selector='div.shadow-card', timeout=20, min_count=2)
+# Short settle after dismissing the onboarding overlay
+OVERLAY_READINESS = ReadinessStrategy(selector='div.shadow-card', timeout=3, min_count=2, stable_for=0.5)
+# Settle time for the virtualized list to render after each scroll
+SCROLL_READINESS = ReadinessStrategy(selector='div.shadow-card', timeout=2, stable_for=0.3, network_idle=0.5)
+MAX_SCROLLS = 40
+
+def build_collect_script(extract_card=None):
+    """
+    Script returning the flight cards not seen before on this page (keyed by flight
+    number + times), then scrolling the results list down by one viewport. Cards
+    come back as outerHTML, or as records when ``extract_card`` is given.
+
+    A card is only marked seen once it was extracted, so one that throws (e.g.
+    half-rendered mid-scroll) is retried on the next call; ``failed`` counts the
+    cards that have not extracted yet. Run RESET_CARDS_SCRIPT before the first
+    call of each search, as a pooled page keeps the seen cards of the last one.
+    """
+    return JS_HELPERS + """
+var extractCard = %s;
+var state = window.__flightCardsState = window.__flightCardsState || {};
+var seen = window.__flightCardsSeen = window.__flightCardsSeen || {};
+var failed = window.__flightCardsFailed = window.__flightCardsFailed || {};
+var list = document.querySelector('.bg-neutral-60.h-screen.overflow-y-auto') || document.scrollingElement;
+var fresh = [];
+document.querySelectorAll('div.shadow-card').forEach(function (card) {
+    var info = card.querySelector('div.airlineInfo');
+    if (!info) { return; }
+    var times = Array.from(card.querySelectorAll('h6')).map(function (h) { return h.textContent.trim(); });
+    var key = info.textContent.trim() + '|' + times.join('|');
+    if (seen[key]) { return; }
+    if (extractCard) {
+        try {
+            var record = extractCard(card, state);
+            if (record) { fresh.push(record); }
+        } catch (e) {
+            failed[key] = String(e);
+            return;
+        }
+    } else {
+        fresh.push(card.outerHTML);
+    }
+    seen[key] = true;
+    delete failed[key];
+});
+var atEnd = list.scrollTop + list.clientHeight >= list.scrollHeight - 2;
+list.scrollBy(0, list.clientHeight);
+return JSON.stringify({cards: fresh, atEnd: atEnd, failed: Object.keys(failed).length});
+""" % (extract_card.strip() if extract_card else "null")
+
+# Forgets the cards collected by an earlier search on the same (pooled) page
+RESET_CARDS_SCRIPT = """
+window.__flightCardsState = {};
+window.__flightCardsSeen = {};
+window.__flightCardsFailed = {};
+return true;
+"""
+COLLECT_NEW_CARDS_SCRIPT = build_collect_script()
+EXTRACT_NEW_CARDS_SCRIPT = build_collect_script(BROWSER_EXTRACT_CARD)
+# XHR/fetch responses that carry the search results
+API_URL_PATTERNS = [r"ixigo\.com/api/.*/flights/search", r"ixigo\.com/.*/search/result"]
+# Cards are text only; logos, fonts and trackers are dropped while scrolling the tall window
+RESOURCE_POLICY = BlockingPolicy()
+
+def search_url(origin, destination, travel_date):
+    """Format for ixigo: travel_date=15122025"""
+    return f"https://www.ixigo.com/search/result/flight?from={origin}&to={destination}&date={travel_date}&adults=1&children=0&infants=0&class=e&source=Search+Form"
+
+def scrap_data(origin="LKO", destination="DEL", travel_date="25122025", sb=None, request_id=None, cancel=None):
     '''
     Format for mmt: travel_date="18/11/2025"
-    Format for ixigo: travel_date=15122025
+    Format for ixigo: travel_date=15122025 (18/11/2025 is converted)
+    Pass ``sb`` to reuse a pooled browser instead of launching one; a cancelled
+    ``cancel`` CancelToken aborts the scrape at its next wait.
+    Returns a ScrapeResult with the flights extracted in the browser (or one page
+    of newly appeared cards per scroll when FLIGHT_JS_EXTRACT=0), or with the
+    search API payloads when those are captured over CDP.
     '''
     #with SB(uc=True, test=True, headless2=True) as sb:
-    with SB(uc=True, test=True) as sb:    
-        #url = f"https://www.makemytrip.com/flight/search?itinerary={origin}-{destination}-{travel_date}&tripType=O&paxType=A-1_C-0_I-0&intl=false&cabinClass=E&lang=eng"
-        url = f"https://www.ixigo.com/search/result/flight?from={origin}&to={destination}&date={travel_date}&adults=1&children=0&infants=0&class=e&source=Search+Form"
-        sb.set_window_size(1400, 8000)
-
-        sb.activate_cdp_mode(url)
-        sb.activate_jquery()
-        sb.sleep(12)
-        #document.elementFromPoint(2, 5).click();
-        sb.execute_script("jQuery, document.elementFromPoint(2, 5).click();")
-        #sb.execute_script("document.querySelector('.bg-neutral-60.h-screen.overflow-y-auto').scrollTo(0, 2000);")
-        
+    if sb is None:
+        with SB(uc=True, test=True) as sb:
+            return scrap_data(origin, destination, travel_date, sb=sb, request_id=request_id, cancel=cancel)
+    result = ScrapeResult(provider="ixigo", request_id=request_id or new_request_id())
+    travel_date = travel_date.replace("/", "")
+    capture = ResponseCapture(API_URL_PATTERNS) if CDP_CAPTURE else None
+    blocker = None
+    try:
+        blocker = block_resources(sb, RESOURCE_POLICY, "ixigo")
+        return _scrap_results(sb, origin, destination, travel_date, result, capture, cancel)
+    finally:
+        if capture:
+            capture.detach()
+        if blocker:
+            blocker.detach(sb)
+
+def _scrap_results(sb, origin, destination, travel_date, result, capture, cancel=None):
+    #url = f"https://www.makemytrip.com/flight/search?itinerary={origin}-{destination}-{travel_date}&tripType=O&paxType=A-1_C-0_I-0&intl=false&cabinClass=E&lang=eng"
+    url = search_url(origin, destination, travel_date)
+    ensure_window_size(sb, 1400, 8000)
 
-        # multi_line_script_scroll = """
-        #      const scrollStep = 5; // Amount to scroll in each step (pixels)
-        #      const scrollIntervalTime = 10; // Time between steps (milliseconds)
-
-        #     function simulateStepByStepScroll() {
-        #         const totalPageHeight = document.body.scrollHeight;
-        #         const viewportHeight = window.innerHeight;
-        #         let currentScrollPosition = window.pageYOffset;
-
-        #         const scrollInterval = setInterval(function() {
-        #             // Check if we have reached the bottom of the page
-        #             if (currentScrollPosition >= totalPageHeight - viewportHeight) {
-        #             clearInterval(scrollInterval); // Stop the scrolling
-        #             console.log("Reached the bottom of the page.");
-        #             return;
-        #             }
-
-        #             // Scroll down by the defined step amount
-        #             window.scrollBy(0, scrollStep);
-        #             currentScrollPosition += scrollStep;
-        #         }, scrollIntervalTime);
-        #         }
-        #  simulateStepByStepScroll();
-        # """
-
-        # sb.execute_script(multi_line_script)
-        #OnboardingSheetLottie_OnboardingSheetInternationalButton__CUHff
-        #sb.wait_for_element_present("button.OnboardingSheetLottie_OnboardingSheetInternationalButton__CUHff", timeout=10)
-        #sb.assert_element('button[class*="OnboardingSheetLottie_OnboardingSheetInternationalButton__CUHff"]')
-
-        #sb.click("button.OnboardingSheetLottie_OnboardingSheetInternationalButton__CUHff")
-        #sb.click('body')
-        #sb.get_page_source()
-        sb.sleep(2)
-        for i in range(0, 8000,1000):
-            sb.execute_script(f"document.querySelector('.bg-neutral-60.h-screen.overflow-y-auto').scrollTo(0, {i});")
-            sb.save_screenshot('./ss/mmt_res.png')
-            sr = sb.get_page_source()
-            #sr = sb.get_attribute(".listingContainer div","innerHTML")
-            write_to_file(sr,filename=f"./scrapper/ss/mmt_res_{i}.html",mode="w")
-            
-        print("Scraping completed")
-        sb.quit()
+    if capture:
+        capture.attach(sb)
+    sb.activate_cdp_mode(url)
+    result.api_payloads = wait_for_results(sb, READINESS, "ixigo", capture, extract_flight_data_from_api,
+                                           cancel=cancel)
+    if result.api_payloads:
+        logger.info(f"Scraping completed from search API ({result.request_id})")
+        return result
+    sb.activate_jquery()
+    #document.elementFromPoint(2, 5).click();
+    sb.execute_script("jQuery, document.elementFromPoint(2, 5).click();")
+    #sb.execute_script("document.querySelector('.bg-neutral-60.h-screen.overflow-y-auto').scrollTo(0, 2000);")
+    
+
+    # multi_line_script_scroll = """
+    #      const scrollStep = 5; // Amount to scroll in each step (pixels)
+    #      const scrollIntervalTime = 10; // Time between steps (milliseconds)
+
+    #     function simulateStepByStepScroll() {
+    #         const totalPageHeight = document.body.scrollHeight;
+    #         const viewportHeight = window.innerHeight;
+    #         let currentScrollPosition = window.pageYOffset;
+
+    #         const scrollInterval = setInterval(function() {
+    #             // Check if we have reached the bottom of the page
+    #             if (currentScrollPosition >= totalPageHeight - viewportHeight) {
+    #             clearInterval(scrollInterval); // Stop the scrolling
+    #             console.log("Reached the bottom of the page.");
+    #             return;
+    #             }
+
+    #             // Scroll down by the defined step amount
+    #             window.scrollBy(0, scrollStep);
+    #             currentScrollPosition += scrollStep;
+    #         }, scrollIntervalTime);
+    #         }
+    #  simulateStepByStepScroll();
+    # """
+
+    # sb.execute_script(multi_line_script)
+    #OnboardingSheetLottie_OnboardingSheetInternationalButton__CUHff
+    #sb.wait_for_element_present("button.OnboardingSheetLottie_OnboardingSheetInternationalButton__CUHff", timeout=10)
+    #sb.assert_element('button[class*="OnboardingSheetLottie_OnboardingSheetInternationalButton__CUHff"]')
+
+    #sb.click("button.OnboardingSheetLottie_OnboardingSheetInternationalButton__CUHff")
+    #sb.click('body')
+    #sb.get_page_source()
+    wait_until_ready(sb, OVERLAY_READINESS, "ixigo", cancel=cancel)
+    cards = failed = 0
+    script = EXTRACT_NEW_CARDS_SCRIPT if JS_EXTRACT else COLLECT_NEW_CARDS_SCRIPT
+    sb.execute_script(RESET_CARDS_SCRIPT)
+    for step in range(MAX_SCROLLS):
+        check_cancelled(cancel)
+        batch = json.loads(sb.execute_script(script))
+        failed = batch["failed"]
+        if SCRAPER_DEBUG:
+            sb.save_screenshot(os.path.join(DEBUG_DIR, f"ixigo_{result.request_id}_{step}.png"))
+        if not batch["cards"] and not batch["failed"] and step > 0:
+            break
+        if batch["cards"]:
+            cards += len(batch["cards"])
+            if JS_EXTRACT:
+                result.cards.extend(batch["cards"])
+            else:
+                result.add_page("".join(batch["cards"]))
+        if batch["atEnd"]:
+            break
+        wait_until_ready(sb, SCROLL_READINESS, "ixigo_scroll", cancel=cancel)
+        
+    if failed:
+        logger.warning(f"{failed} ixigo card(s) could not be extracted ({result.request_id})")
+    logger.info(f"Scraping completed: {cards} cards in {step + 1} scroll(s) ({result.request_id})")
+    return result
 
 def write_to_file(content, filename="./scrapper/mmt_res.html",mode="a"):
     with open(filename, mode, encoding="utf-8") as f:
@@ -0,0 +1,70 @@
+import json
+import logging
+import sys
+
+from scrapper.capture import ScrapeResult, new_request_id
+from scrapper.ixigo.data_extraction import extract_flight_data_from_api
+from scrapper.ixigo.ixigo_scrap import (API_URL_PATTERNS, COLLECT_NEW_CARDS_SCRIPT, EXTRACT_NEW_CARDS_SCRIPT,
+                                        MAX_SCROLLS, OVERLAY_READINESS, READINESS, RESET_CARDS_SCRIPT,
+                                        RESOURCE_POLICY, SCROLL_READINESS, search_url)
+from scrapper.js_extraction import JS_EXTRACT, evaluate_in_tab
+from scrapper.network_capture import wait_for_results_async
+from scrapper.readiness import wait_until_ready_async
+from scrapper.tab_engine import tab_engine
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# The tab's viewport stands in for the 1400x8000 window of the SB scraper
+VIEWPORT = (1400, 8000)
+# Clicking the page corner closes the onboarding overlay
+DISMISS_OVERLAY_SCRIPT = """
+var corner = document.elementFromPoint(2, 5);
+if (corner) { corner.click(); }
+return true;
+"""
+
+
+async def scrap_data(origin, destination, travel_date, request_id=None, engine=None):
+    """
+    Async counterpart of ixigo_scrap.scrap_data, run in a tab of the shared
+    TabEngine browser.
+    Format for ixigo: travel_date=15122025 (18/11/2025 is converted)
+    """
+    engine = engine or tab_engine
+    result = ScrapeResult(provider="ixigo", request_id=request_id or new_request_id())
+    url = search_url(origin, destination, travel_date.replace("/", ""))
+    async with engine.tab("ixigo", RESOURCE_POLICY, API_URL_PATTERNS, VIEWPORT) as (tab, capture):
+        await tab.get(url)
+        result.api_payloads = await wait_for_results_async(tab, READINESS, "ixigo", capture,
+                                                           extract_flight_data_from_api)
+        if result.api_payloads:
+            logger.info(f"Scraping completed from search API ({result.request_id})")
+            return result
+        await evaluate_in_tab(tab, DISMISS_OVERLAY_SCRIPT)
+        await wait_until_ready_async(tab, OVERLAY_READINESS, "ixigo")
+        cards = failed = 0
+        script = EXTRACT_NEW_CARDS_SCRIPT if JS_EXTRACT else COLLECT_NEW_CARDS_SCRIPT
+        await evaluate_in_tab(tab, RESET_CARDS_SCRIPT)
+        for step in range(MAX_SCROLLS):
+            batch = json.loads(await evaluate_in_tab(tab, script))
+            failed = batch["failed"]
+            if not batch["cards"] and not batch["failed"] and step > 0:
+                break
+            if batch["cards"]:
+                cards += len(batch["cards"])
+                if JS_EXTRACT:
+                    result.cards.extend(batch["cards"])
+                else:
+                    result.add_page("".join(batch["cards"]))
+            if batch["atEnd"]:
+                break
+            await wait_until_ready_async(tab, SCROLL_READINESS, "ixigo_scroll")
+    if failed:
+        logger.warning(f"{failed} ixigo card(s) could not be extracted ({result.request_id})")
+    logger.info(f"Scraping completed in a tab: {cards} cards in {step + 1} scroll(s) ({result.request_id})")
+    return result
@@ -0,0 +1,109 @@
+import logging
+import os
+import sys
+import time
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Searches submitted and not yet finished that the server accepts at once
+MAX_JOBS = int(os.getenv("FLIGHT_MAX_JOBS", "200"))
+# Finished jobs are kept this long for get_search_results, then dropped
+JOB_TTL_SECONDS = float(os.getenv("FLIGHT_JOB_TTL_SECONDS", "1800"))
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = "pending", "running", "done", "failed", "cancelled"
+
+
+class TooManyJobs(Exception):
+    """A search was refused because MAX_JOBS searches are already outstanding."""
+
+
+class SearchJob:
+    """One submitted search: its parameters, per-provider progress and the flights found so far."""
+
+    def __init__(self, job_id, params, providers, clock=time.monotonic):
+        self.job_id = job_id
+        self.params = params
+        self.clock = clock
+        self.state = PENDING
+        self.error = None
+        self.created = clock()
+        self.finished = None
+        self.task = None
+        self.providers = {key: {"status": "pending"} for key in providers}
+        self._flights = {}
+
+    def progress(self, provider, flights, status):
+        """Progress callback of search_route: a provider started, or finished with ``flights``."""
+        self.state = RUNNING
+        self.providers[provider] = status
+        self._flights[provider] = flights
+
+    def finish(self, providers=None, error=None, state=None):
+        if providers:
+            self.providers.update(providers)
+        self.error = error
+        self.state = state or (FAILED if error else DONE)
+        self.finished = self.clock()
+
+    @property
+    def active(self):
+        return self.state in (PENDING, RUNNING)
+
+    @property
+    def flights(self):
+        return [flight for key in self.providers for flight in self._flights.get(key, [])]
+
+    def status(self):
+        report = {
+            "job_id": self.job_id,
+            "state": self.state,
+            "elapsed_s": round((self.finished or self.clock()) - self.created, 1),
+            "flights_ready": len(self.flights),
+            "providers": self.providers,
+            **self.params,
+        }
+        if self.error:
+            report["error"] = self.error
+        return report
+
+
+class JobStore:
+    """In-memory search jobs, bounded by MAX_JOBS outstanding and JOB_TTL_SECONDS after they finish."""
+
+    def __init__(self, max_jobs=MAX_JOBS, ttl=JOB_TTL_SECONDS, clock=time.monotonic):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.clock = clock
+        self._jobs = {}
+
+    def prune(self):
+        now = self.clock()
+        for job_id, job in list(self._jobs.items()):
+            if not job.active and now - job.finished > self.ttl:
+                del self._jobs[job_id]
+
+    def create(self, job_id, params, providers):
+        self.prune()
+        outstanding = sum(job.active for job in self._jobs.values())
+        if outstanding >= self.max_jobs:
+            raise TooManyJobs(f"{outstanding} searches are already outstanding (limit {self.max_jobs})")
+        job = SearchJob(job_id, params, providers, self.clock)
+        self._jobs[job_id] = job
+        return job
+
+    def get(self, job_id):
+        self.prune()
+        return self._jobs.get(job_id)
+
+    def stats(self):
+        self.prune()
+        states = {}
+        for job in self._jobs.values():
+            states[job.state] = states.get(job.state, 0) + 1
+        return {"jobs": len(self._jobs), "max_outstanding": self.max_jobs, "states": states}
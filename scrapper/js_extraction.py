@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import sys
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# Set FLIGHT_JS_EXTRACT=0 to ship the page source back and parse it in Python instead
+JS_EXTRACT = os.getenv("FLIGHT_JS_EXTRACT", "1") == "1"
+
+# BeautifulSoup equivalents used by the per-provider card extractors
+JS_HELPERS = """
+var fx = {
+    text: function (el) { return el.textContent; },
+    strippedText: function (el) {
+        var parts = [];
+        (function walk(node) {
+            Array.prototype.forEach.call(node.childNodes, function (child) {
+                if (child.nodeType === 3) {
+                    var value = child.nodeValue.trim();
+                    if (value) { parts.push(value); }
+                } else if (child.nodeType === 1) {
+                    walk(child);
+                }
+            });
+        })(el);
+        return parts.join('');
+    },
+    classString: function (el) {
+        return (el.getAttribute('class') || '').trim().split(/\\s+/).join(' ');
+    },
+    findAllExactClass: function (root, tag, classes) {
+        return Array.prototype.filter.call(root.querySelectorAll(tag), function (el) {
+            return fx.classString(el) === classes;
+        });
+    },
+    findExactClass: function (root, tag, classes) {
+        return fx.findAllExactClass(root, tag, classes)[0] || null;
+    },
+    defined: function (value) {
+        // Python raises NameError/IndexError here, which skips the card
+        if (value === undefined) { throw new Error('missing field'); }
+        return value;
+    }
+};
+"""
+
+
+def build_extract_script(card_selector, extract_card):
+    """
+    Wraps a provider's ``function (card, state) {...}`` card extractor into a
+    script that returns every card on the page as a JSON array of records.
+    Cards whose extractor throws are skipped, like the Python parsers do.
+    """
+    return JS_HELPERS + """
+var extractCard = %s;
+var state = {};
+var records = [];
+document.querySelectorAll(%s).forEach(function (card) {
+    try {
+        var record = extractCard(card, state);
+        if (record) { records.push(record); }
+    } catch (e) {}
+});
+return JSON.stringify(records);
+""" % (extract_card.strip(), json.dumps(card_selector))
+
+
+def extract_in_browser(sb, script, provider):
+    """Runs an extractor script in the page; returns its records or None on failure."""
+    try:
+        records = json.loads(sb.execute_script(script))
+    except Exception as e:
+        logger.warning(f"In-browser extraction failed for {provider}: {e}")
+        return None
+    logger.info(f"Extracted {len(records)} {provider} flights in the browser.")
+    return records
+
+
+async def evaluate_in_tab(tab, script):
+    """Runs an ``sb.execute_script``-style script (ending in ``return``) in a cdp_driver tab."""
+    return await tab.evaluate("(function () {\n%s\n})()" % script)
+
+
+async def extract_in_tab(tab, script, provider):
+    """``extract_in_browser`` for a cdp_driver tab."""
+    try:
+        records = json.loads(await evaluate_in_tab(tab, script))
+    except Exception as e:
+        logger.warning(f"In-browser extraction failed for {provider}: {e}")
+        return None
+    logger.info(f"Extracted {len(records)} {provider} flights in the browser.")
+    return records
+
+
+def compare_with_parser(sb, script, extract, html_path, provider):
+    """
+    Loads a saved page (e.g. from scrapper/ss) in the browser and checks the
+    JavaScript extractor against the Python ``extract`` function on the same page.
+    """
+    with open(html_path, "r", encoding="utf-8") as f:
+        expected = extract(f.read())
+    sb.open("file://" + os.path.abspath(html_path))
+    actual = extract_in_browser(sb, script, provider)
+    if actual != expected:
+        logger.error(f"{provider}: browser extractor returned {len(actual or [])} records, "
+                     f"parser returned {len(expected)} from {html_path}")
+        return False
+    logger.info(f"{provider}: browser extractor matches parser ({len(expected)} records).")
+    return True
+
+
+if __name__ == "__main__":
+    from seleniumbase import SB
+
+    from scrapper.expedia import data_extraction as expedia_data_extraction
+    from scrapper.ixigo import data_extraction as ixigo_data_extraction
+    from scrapper.mmt import data_extraction as mmt_data_extraction
+
+    checks = [
+        ("mmt", mmt_data_extraction.BROWSER_EXTRACT_SCRIPT, mmt_data_extraction.extract_flight_data,
+         "./scrapper/ss/mmt1_res.html"),
+        ("ixigo", ixigo_data_extraction.BROWSER_EXTRACT_SCRIPT,
+         lambda html: ixigo_data_extraction.extract_flight_data(html, 0), "./scrapper/ss/mmt_res.html"),
+        ("expedia", expedia_data_extraction.BROWSER_EXTRACT_SCRIPT, expedia_data_extraction.extract_flight_data,
+         "./scrapper/ss/mmt_res_expedia.html"),
+    ]
+    with SB(headless=True) as sb:
+        results = [compare_with_parser(sb, script, extract, path, provider)
+                   for provider, script, extract, path in checks]
+    sys.exit(0 if all(results) else 1)
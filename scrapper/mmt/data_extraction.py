@@ -1,8 +1,12 @@
 import csv
-from bs4 import BeautifulSoup
 import re
 import logging
 import sys
+
+from scrapper.api_records import map_api_records
+from scrapper.capture import SCRAPER_DEBUG, html_pages
+from scrapper.html_backend import parse_html
+from scrapper.js_extraction import build_extract_script
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -30,17 +34,63 @@ END_DURATION_SELECTOR = 'div[class*="timeInfoRight"]'
 # 5. Selector for the Final Price
 PRICE_SELECTOR = 'div[class*="priceSection"]'
 
+# --- Search API (captured over CDP) ---
+# Where the search response keeps its list of flights (see api_records.iter_results).
+# These paths and the keys below are not yet checked against live responses, which is
+# why FLIGHT_CDP_CAPTURE is off by default.
+API_RESULT_PATHS = ['cardList', 'data.cardList']
+# Candidate JSON keys for each record field, first match wins
+API_FIELD_KEYS = {
+    'Airline': ['airlineName', 'airline.name', 'carrierName'],
+    'Departure_Time': ['depTime', 'departureTime', 'departure.time', 'depDateTime'],
+    'Departure_City': ['fromCity', 'depCity', 'departureCity', 'from.cityName'],
+    'Arrival_Time': ['arrTime', 'arrivalTime', 'arrival.time', 'arrDateTime'],
+    'Arrival_City': ['toCity', 'arrCity', 'arrivalCity', 'to.cityName'],
+    'Layover_Duration': ['duration', 'journeyDuration', 'totalDuration'],
+    'Layover_City': ['stopsText', 'layoverCity', 'stopInfo'],
+    'Price': ['fare.totalFare', 'totalFare', 'displayFare', 'price'],
+    'Offers': ['offerText', 'persuasionText', 'couponText'],
+}
+API_REQUIRED_FIELDS = ('Airline', 'Departure_Time', 'Arrival_Time', 'Price')
+API_DEFAULTS = {'Offers': 'N/A', 'Layover_Duration': 'N/A', 'Layover_City': 'N/A'}
+
+# --- In-browser extraction ---
+# JavaScript twin of extract_flight_data for one card; run through sb.execute_script
+BROWSER_EXTRACT_CARD = """
+function (card, state) {
+    var airlineElement = card.querySelector('p[class*="airlineName"]');
+    var departureElement = card.querySelector('div[class*="timeInfoLeft"]');
+    var layoverElement = card.querySelector('div[class*="stop-info"]');
+    var arrivalElement = card.querySelector('div[class*="timeInfoRight"]');
+    var priceElement = card.querySelector('div[class*="priceSection"]');
+    var firstP = function (el) { var p = el.querySelector('p'); return p ? p.textContent : 'N/A'; };
+    return {
+        'Airline': airlineElement ? airlineElement.textContent.trim() : 'N/A',
+        'Departure_Time': firstP(departureElement),
+        'Departure_City': departureElement.querySelector('p.blackText').textContent,
+        'Arrival_Time': firstP(arrivalElement),
+        'Arrival_City': arrivalElement.querySelector('p.blackText').textContent,
+        'Layover_Duration': firstP(layoverElement),
+        'Layover_City': layoverElement.querySelector('p.flightsLayoverInfo').textContent,
+        'Price': priceElement ? priceElement.querySelector('span').textContent.trim() : 'N/A',
+        'Offers': fx.findExactClass(card, 'p', 'alertMsg appendBottom10 appendTop10 textCenter').textContent
+    };
+}
+"""
+BROWSER_EXTRACT_SCRIPT = build_extract_script(FLIGHT_LISTING_SELECTOR, BROWSER_EXTRACT_CARD)
+
 def write_html_to_file(html_content, filename="./scrapper/ss/mmt1_pretty.html"):
     with open(filename, 'w', encoding='utf-8') as f:
         f.write(html_content)
 
-def extract_flight_data(html_content):
+def extract_flight_data(html_content, backend=None):
     """
-    Parses the HTML content to extract flight details using Beautiful Soup.
+    Parses the HTML content to extract flight details with the configured
+    HTML backend (FLIGHT_HTML_BACKEND, or ``backend``; see scrapper.html_backend).
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    pretty_html_string = soup.prettify()
-    write_html_to_file(pretty_html_string)
+    soup = parse_html(html_content, backend)
+    if SCRAPER_DEBUG:
+        write_html_to_file(soup.prettify())
     flight_data = []
 
     # Find all flight listing cards
@@ -117,6 +167,13 @@ def extract_flight_data(html_content):
 
     return flight_data
 
+def extract_flight_data_from_api(payloads):
+    """
+    Maps search API JSON captured over CDP into the same records as extract_flight_data.
+    """
+    return map_api_records(payloads, API_RESULT_PATHS, API_FIELD_KEYS, API_REQUIRED_FIELDS,
+                           defaults=API_DEFAULTS)
+
 def save_to_csv(data, filename):
     """Saves the extracted data to a CSV file."""
     if not data:
@@ -134,8 +191,19 @@ def save_to_csv(data, filename):
         logger.error(f"Error saving to CSV: {e}")
 
 
-def parse_flight_data():
-    """Main function to run the script."""
+def parse_flight_data(scraped=None):
+    """
+    Parses the page captured by scrap_data (a ScrapeResult or raw HTML).
+    Without one, falls back to the saved page at HTML_FILE_PATH.
+    """
+    if scraped is not None:
+        if getattr(scraped, "cards", None):
+            return scraped.cards
+        api_records = extract_flight_data_from_api(getattr(scraped, "api_payloads", None) or [])
+        if api_records:
+            return api_records
+        pages = html_pages(scraped)
+        return extract_flight_data(pages[-1]) if pages else []
     try:
         with open(HTML_FILE_PATH, 'r', encoding='utf-8') as f:
             html_content = f.read()
@@ -0,0 +1,21 @@
+from scrapper.http_fetch import base_url_for, fetch_into_result
+
+BASE_URL = base_url_for("mmt", "https://www.makemytrip.com")
+
+
+async def fetch_data(origin, destination, travel_date, request_id=None, client=None):
+    """
+    Browserless counterpart of mmt_scrap.scrap_data: fetches the search page over
+    the pooled HTTP client and returns a ScrapeResult for ``parse_flight_data``.
+    Format for mmt: travel_date="18/11/2025"
+    """
+    params = {
+        "itinerary": f"{origin}-{destination}-{travel_date}",
+        "tripType": "O",
+        "paxType": "A-1_C-0_I-0",
+        "intl": "false",
+        "cabinClass": "E",
+        "lang": "eng",
+    }
+    return await fetch_into_result("mmt", f"{BASE_URL}/flight/search", params=params,
+                                   request_id=request_id, client=client)
@@ -1,5 +1,12 @@
 from seleniumbase import SB
 import logging,sys
+
+from scrapper.capture import ScrapeResult, new_request_id
+from scrapper.js_extraction import JS_EXTRACT, extract_in_browser
+from scrapper.mmt.data_extraction import BROWSER_EXTRACT_SCRIPT, extract_flight_data_from_api
+from scrapper.network_capture import CDP_CAPTURE, ResponseCapture, wait_for_results
+from scrapper.readiness import ReadinessStrategy
+from scrapper.resource_blocking import BLOCKED_URLS, BlockingPolicy, block_resources
 # --- Configure Logging to use STDERR ---
 logging.basicConfig(
     level=logging.INFO,
@@ -12,6 +19,13 @@ logger = logging.getLogger(__name__)
 
 # --- Configuration ---
 HTML_FILE_PATH = "./scrapper/ss/mmt1_res.html" 
+# Results are ready once the flight cluster cards stop being added
+READINESS = ReadinessStrategy(selector='div[data-test*=component-clusterItem]', timeout=15)
+# XHR/fetch responses that carry the search results
+API_URL_PATTERNS = [r"makemytrip\.com/api/.*search", r"flights-cb\.makemytrip\.com/.*search"]
+# Images, fonts and trackers (plus MMT's own page-event tracker) are not needed for the listing
+PRICE_LOCK_POPUP_BUTTON = 'button.priceLockProCtaButton.whiteText'
+RESOURCE_POLICY = BlockingPolicy(blocked_urls=BLOCKED_URLS + ["*pdt.makemytrip.com*"])
 def scrap_sb(origin="LKO", destination="IXL", travel_date="18/11/2025"):
     with SB(uc=True, test=True) as sb:
         url = f"https://www.makemytrip.com/flight/search?itinerary={origin}-{destination}-{travel_date}&tripType=O&paxType=A-1_C-0_I-0&intl=false&cabinClass=E&lang=eng"
@@ -27,32 +41,57 @@ def scrap_sb(origin="LKO", destination="IXL", travel_date="18/11/2025"):
             f.write(sr)
         logger.info("Scraping completed")
         sb.quit()
-def scrap_data(origin, destination, travel_date):
-    """Synchronous scraping function to run in thread"""
-    try:
+def search_url(origin, destination, travel_date):
+    return f"https://www.makemytrip.com/flight/search?itinerary={origin}-{destination}-{travel_date}&tripType=O&paxType=A-1_C-0_I-0&intl=false&cabinClass=E&lang=eng"
+
+def scrap_data(origin, destination, travel_date, sb=None, request_id=None, cancel=None):
+    """Synchronous scraping function to run in thread.
+
+    Pass ``sb`` (e.g. leased from ``scrapper.browser_pool.BrowserPool``) to reuse a
+    warm browser; otherwise a fresh SB session is started and quit for this call.
+    Returns a ScrapeResult holding the captured page for ``parse_flight_data``;
+    when the search API is captured over CDP the page is not captured at all.
+    A cancelled ``cancel`` CancelToken aborts the scrape at its next wait.
+    """
+    if sb is None:
         with SB(uc=True, test=True, xvfb=True) as sb:
-            url = f"https://www.makemytrip.com/flight/search?itinerary={origin}-{destination}-{travel_date}&tripType=O&paxType=A-1_C-0_I-0&intl=false&cabinClass=E&lang=eng"
-            sb.activate_cdp_mode(url)
-            
-            sb.sleep(5)
-            try:
-                sb.click('button.priceLockProCtaButton.whiteText')
-            except Exception:
-                logger.warning("Popup button not found or already closed.")
-                
-            sr = sb.get_page_source()
-            
-            import os
-            os.makedirs(os.path.dirname(HTML_FILE_PATH), exist_ok=True)
+            return scrap_data(origin, destination, travel_date, sb=sb, request_id=request_id, cancel=cancel)
+    result = ScrapeResult(provider="mmt", request_id=request_id or new_request_id())
+    capture = ResponseCapture(API_URL_PATTERNS) if CDP_CAPTURE else None
+    blocker = None
+    try:
+        url = search_url(origin, destination, travel_date)
+        blocker = block_resources(sb, RESOURCE_POLICY, "mmt")
+        if capture:
+            capture.attach(sb)
+        sb.activate_cdp_mode(url)
+        
+        result.api_payloads = wait_for_results(sb, READINESS, "mmt", capture, extract_flight_data_from_api,
+                                               cancel=cancel)
+        if result.api_payloads:
+            logger.info(f"Scraping completed from search API ({result.request_id}).")
+            return result
+        # A persistent profile usually has the price-lock popup dismissed already
+        try:
+            if sb.is_element_visible(PRICE_LOCK_POPUP_BUTTON):
+                sb.click(PRICE_LOCK_POPUP_BUTTON)
+        except Exception:
+            logger.warning("Popup button not found or already closed.")
             
-            with open(HTML_FILE_PATH, "w", encoding="utf-8") as f:
-                f.write(sr)
-            logger.info("Scraping completed successfully.")
-            sb.quit()
-            return True
+        if JS_EXTRACT:
+            result.cards = extract_in_browser(sb, BROWSER_EXTRACT_SCRIPT, "mmt") or []
+        if not result.cards:
+            result.add_page(sb.get_page_source())
+        logger.info(f"Scraping completed successfully ({result.request_id}).")
+        return result
     except Exception as e:
         logger.error(f"Error during scraping: {e}")
         raise e
+    finally:
+        if capture:
+            capture.detach()
+        if blocker:
+            blocker.detach(sb)
 
 if __name__ == "__main__":
     scrap_sb()
\ No newline at end of file
@@ -0,0 +1,44 @@
+import logging
+import sys
+
+from scrapper.capture import ScrapeResult, new_request_id
+from scrapper.js_extraction import JS_EXTRACT, extract_in_tab
+from scrapper.mmt.data_extraction import BROWSER_EXTRACT_SCRIPT, extract_flight_data_from_api
+from scrapper.mmt.mmt_scrap import (API_URL_PATTERNS, PRICE_LOCK_POPUP_BUTTON, READINESS,
+                                    RESOURCE_POLICY, search_url)
+from scrapper.network_capture import wait_for_results_async
+from scrapper.tab_engine import tab_engine
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+
+async def scrap_data(origin, destination, travel_date, request_id=None, engine=None):
+    """
+    Async counterpart of mmt_scrap.scrap_data: scrapes in a tab of the shared
+    TabEngine browser and returns a ScrapeResult for ``parse_flight_data``.
+    Format for mmt: travel_date="18/11/2025"
+    """
+    engine = engine or tab_engine
+    result = ScrapeResult(provider="mmt", request_id=request_id or new_request_id())
+    async with engine.tab("mmt", RESOURCE_POLICY, API_URL_PATTERNS) as (tab, capture):
+        await tab.get(search_url(origin, destination, travel_date))
+        result.api_payloads = await wait_for_results_async(tab, READINESS, "mmt", capture,
+                                                           extract_flight_data_from_api)
+        if result.api_payloads:
+            logger.info(f"Scraping completed from search API ({result.request_id}).")
+            return result
+        try:
+            await tab.click_if_visible(PRICE_LOCK_POPUP_BUTTON)
+        except Exception:
+            logger.warning("Popup button not found or already closed.")
+        if JS_EXTRACT:
+            result.cards = await extract_in_tab(tab, BROWSER_EXTRACT_SCRIPT, "mmt") or []
+        if not result.cards:
+            result.add_page(await tab.get_page_source())
+    logger.info(f"Scraping completed in a tab ({result.request_id}).")
+    return result
@@ -0,0 +1,151 @@
+import base64
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+import mycdp
+
+from scrapper.readiness import wait_until_ready, wait_until_ready_async
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# Set FLIGHT_CDP_CAPTURE=1 to read flights from the search API responses. Off by default
+# until each provider's API_RESULT_PATHS and API_FIELD_KEYS are checked against live traffic.
+CDP_CAPTURE = os.getenv("FLIGHT_CDP_CAPTURE", "0") == "1"
+
+CAPTURED_RESOURCE_TYPES = (mycdp.network.ResourceType.XHR, mycdp.network.ResourceType.FETCH)
+
+
+def run_cdp(sb, coroutine):
+    """Runs a coroutine on the CDP event loop of an ``sb`` in CDP mode."""
+    return sb.cdp.get_event_loop().run_until_complete(coroutine)
+
+
+class ResponseCapture:
+    """
+    Listens to the Network domain of the active tab and keeps the JSON bodies of
+    XHR/fetch responses whose URL matches one of ``url_patterns``.
+
+    Call ``attach`` before navigating, ``ready`` while waiting for the page and
+    ``collect`` to fetch the bodies; ``detach`` removes the handlers so a pooled
+    browser does not keep feeding a finished capture.
+    """
+
+    def __init__(self, url_patterns, settle=0.5):
+        self.url_patterns = [re.compile(p) for p in url_patterns]
+        self.settle = settle
+        self._tab = None
+        self._responses = {}   # request id -> url
+        self._finished = set()
+        self._last_event = 0.0
+
+    def _matches(self, url):
+        return any(pattern.search(url) for pattern in self.url_patterns)
+
+    async def _on_response(self, event):
+        if event.type_ in CAPTURED_RESOURCE_TYPES and self._matches(event.response.url):
+            self._responses[event.request_id] = event.response.url
+            self._last_event = time.monotonic()
+
+    async def _on_finished(self, event):
+        if event.request_id in self._responses:
+            self._finished.add(event.request_id)
+            self._last_event = time.monotonic()
+
+    def attach(self, sb):
+        if not getattr(sb, "cdp", None):
+            sb.activate_cdp_mode("about:blank")
+        self.attach_tab(sb.cdp.get_active_tab())
+
+    def attach_tab(self, tab):
+        """Attaches to a cdp_driver tab directly (used by the async tab engine)."""
+        self._tab = tab
+        self._tab.add_handler(mycdp.network.ResponseReceived, self._on_response)
+        self._tab.add_handler(mycdp.network.LoadingFinished, self._on_finished)
+
+    def detach(self):
+        if self._tab is None:
+            return
+        for event, handler in ((mycdp.network.ResponseReceived, self._on_response),
+                               (mycdp.network.LoadingFinished, self._on_finished)):
+            handlers = self._tab.handlers.get(event, [])
+            if handler in handlers:
+                handlers.remove(handler)
+        self._tab = None
+
+    def ready(self):
+        """True once a matching response finished and no new one arrived for ``settle`` s."""
+        return bool(self._finished) and time.monotonic() - self._last_event >= self.settle
+
+    async def _fetch_bodies(self):
+        payloads = []
+        for request_id in list(self._finished):
+            try:
+                body, is_base64 = await self._tab.send(mycdp.network.get_response_body(request_id))
+            except Exception as e:
+                logger.debug(f"Could not read body for {self._responses[request_id]}: {e}")
+                continue
+            if is_base64:
+                body = base64.b64decode(body).decode("utf-8", errors="replace")
+            try:
+                payloads.append(json.loads(body))
+            except ValueError:
+                continue
+        return payloads
+
+    def collect(self, sb):
+        """Fetches and decodes the JSON bodies of every finished matching response."""
+        return run_cdp(sb, self.collect_async())
+
+    async def collect_async(self):
+        if self._tab is None or not self._finished:
+            return []
+        payloads = await self._fetch_bodies()
+        logger.info(f"Captured {len(payloads)} API payload(s) over CDP.")
+        return payloads
+
+
+def wait_for_results(sb, strategy, provider, capture=None, extract=None, cancel=None):
+    """
+    Waits for a provider's results, preferring the search API over the DOM.
+
+    Returns the captured API payloads when ``extract(payloads)`` maps them to
+    flights; otherwise waits for the DOM per ``strategy`` and returns ``[]`` so
+    the caller falls back to capturing the rendered page.
+    """
+    if capture is None:
+        wait_until_ready(sb, strategy, provider, cancel=cancel)
+        return []
+    wait = wait_until_ready(sb, strategy, provider, until=capture.ready, cancel=cancel)
+    if wait.reason != "until":
+        return []
+    payloads = capture.collect(sb)
+    if payloads and extract(payloads):
+        return payloads
+    logger.info(f"{provider} API payloads did not map to flights; falling back to DOM.")
+    wait_until_ready(sb, strategy, provider, cancel=cancel)
+    return []
+
+
+async def wait_for_results_async(tab, strategy, provider, capture=None, extract=None):
+    """``wait_for_results`` for a cdp_driver tab."""
+    if capture is None:
+        await wait_until_ready_async(tab, strategy, provider)
+        return []
+    wait = await wait_until_ready_async(tab, strategy, provider, until=capture.ready)
+    if wait.reason != "until":
+        return []
+    payloads = await capture.collect_async()
+    if payloads and extract(payloads):
+        return payloads
+    logger.info(f"{provider} API payloads did not map to flights; falling back to DOM.")
+    await wait_until_ready_async(tab, strategy, provider)
+    return []
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import math
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from scrapper.rate_limit import TokenBucket
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Background scrapes per hour spent refreshing popular routes (0 disables prefetch)
+PREFETCH_BUDGET_PER_HOUR = float(os.getenv("FLIGHT_PREFETCH_BUDGET", "60"))
+# Most popular route/date pairs kept warm
+PREFETCH_ROUTES = int(os.getenv("FLIGHT_PREFETCH_ROUTES", "30"))
+# Only travel dates from today up to this many days ahead are prefetched
+PREFETCH_HORIZON_DAYS = int(os.getenv("FLIGHT_PREFETCH_HORIZON_DAYS", "30"))
+# Popularity (searches, decayed) a route/date needs before it is worth prefetching;
+# 1.5 means a second search within about a half-life of the first
+PREFETCH_MIN_SEARCHES = float(os.getenv("FLIGHT_PREFETCH_MIN_SEARCHES", "1.5"))
+# Popularity halves over this many hours without searches
+PREFETCH_HALF_LIFE_HOURS = float(os.getenv("FLIGHT_PREFETCH_HALF_LIFE_HOURS", "24"))
+PREFETCH_INTERVAL = 15.0   # seconds between checks for idle capacity
+DATE_FORMAT = "%d/%m/%Y"
+
+
+class RoutePopularity:
+    """Exponentially decaying search counts per (origin, destination, travel date)."""
+
+    def __init__(self, half_life_hours=PREFETCH_HALF_LIFE_HOURS, clock=time.time):
+        self.decay = math.log(2) / (half_life_hours * 3600)
+        self.clock = clock
+        self._routes = {}  # (origin, destination, travel_date) -> [score, updated, providers]
+
+    def _score(self, entry, now):
+        return entry[0] * math.exp(-self.decay * (now - entry[1]))
+
+    def record(self, origin, destination, travel_date, providers):
+        now = self.clock()
+        key = (origin.strip().upper(), destination.strip().upper(), travel_date)
+        entry = self._routes.setdefault(key, [0.0, now, set()])
+        entry[0] = self._score(entry, now) + 1
+        entry[1] = now
+        entry[2].update(providers)
+
+    def hot(self, limit=PREFETCH_ROUTES, min_score=PREFETCH_MIN_SEARCHES, horizon_days=PREFETCH_HORIZON_DAYS):
+        """Most popular ``(origin, destination, travel_date, providers, score)`` still worth refreshing."""
+        now = self.clock()
+        today = datetime.fromtimestamp(now).date()
+        last_day = today + timedelta(days=horizon_days)
+        hot = []
+        for key, entry in list(self._routes.items()):
+            day = datetime.strptime(key[2], DATE_FORMAT).date()
+            score = self._score(entry, now)
+            if day < today or score < 0.05:
+                del self._routes[key]  # departed, or nobody has asked in a long time
+                continue
+            if day <= last_day and score >= min_score:
+                hot.append((*key, sorted(entry[2]), score))
+        hot.sort(key=lambda route: route[4], reverse=True)
+        return hot[:limit]
+
+    def stats(self, limit=10):
+        return [{"route": f"{o}-{d}", "travel_date": day, "providers": providers, "score": round(score, 2)}
+                for o, d, day, providers, score in self.hot(limit, min_score=0)]
+
+
+class Prefetcher:
+    """
+    Background loop that keeps the result cache warm for popular routes.
+
+    Every PREFETCH_INTERVAL it checks ``is_idle()``; while there is idle scrape
+    capacity it refreshes the hottest route/date/provider whose cache entry is
+    missing or older than ``refresh_after`` seconds, spending one token of a
+    ``budget_per_hour`` token bucket per scrape. ``refresh(provider, origin,
+    destination, travel_date)`` does the scrape (at background priority) and
+    ``cache_age(...)`` reports an entry's age or None.
+    """
+
+    def __init__(self, popularity, refresh, cache_age, is_idle, refresh_after,
+                 budget_per_hour=PREFETCH_BUDGET_PER_HOUR, interval=PREFETCH_INTERVAL):
+        self.popularity = popularity
+        self.refresh = refresh
+        self.cache_age = cache_age
+        self.is_idle = is_idle
+        self.refresh_after = refresh_after
+        self.interval = interval
+        self.budget = TokenBucket(budget_per_hour / 3600, max(1.0, budget_per_hour / 60), max_wait=0)
+        self.enabled = budget_per_hour > 0 and refresh_after > 0
+        self.refreshed = 0
+        self.failed = 0
+        self._task = None
+
+    def start(self):
+        """Starts the loop on the running event loop (once); safe to call on every search."""
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Prefetcher started ({self.budget.rate * 3600:.0f} scrapes/hour budget).")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def _next(self):
+        for origin, destination, travel_date, providers, _ in self.popularity.hot():
+            for provider in providers:
+                age = self.cache_age(provider, origin, destination, travel_date)
+                if age is None or age > self.refresh_after:
+                    return provider, origin, destination, travel_date
+        return None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            while self.is_idle():
+                target = self._next()
+                if target is None or not self.budget.try_acquire():
+                    break
+                try:
+                    refreshed = await self.refresh(*target)
+                except Exception as e:
+                    refreshed = False
+                    logger.warning(f"Prefetch of {target} failed: {e}")
+                if not refreshed:
+                    self.failed += 1
+                    break  # try again next interval rather than spending the budget on it now
+                self.refreshed += 1
+
+    def stats(self):
+        return {"enabled": self.enabled, "running": self._task is not None and not self._task.done(),
+                "refreshed": self.refreshed, "failed": self.failed, "budget": self.budget.stats(),
+                "hot_routes": self.popularity.stats()}
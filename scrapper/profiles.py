@@ -0,0 +1,205 @@
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # no cross-process locking (Windows); in-process locks still apply
+    fcntl = None
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Set FLIGHT_BROWSER_PROFILES=0 to launch every browser with a throwaway profile
+BROWSER_PROFILES = os.getenv("FLIGHT_BROWSER_PROFILES", "1") == "1"
+PROFILE_DIR = os.getenv("FLIGHT_PROFILE_DIR", "./scrapper/profiles")
+PROFILES_PER_PROVIDER = int(os.getenv("FLIGHT_PROFILES_PER_PROVIDER", "2"))
+PROFILE_MAX_AGE_HOURS = float(os.getenv("FLIGHT_PROFILE_MAX_AGE_HOURS", "72"))
+PROFILE_MAX_MB = int(os.getenv("FLIGHT_PROFILE_MAX_MB", "500"))
+PRUNE_INTERVAL = 3600
+
+CREATED_MARKER = ".created"
+# Chrome cache folders dropped when a profile outgrows PROFILE_MAX_MB; cookies survive
+CACHE_DIRS = [
+    os.path.join("Default", "Cache"),
+    os.path.join("Default", "Code Cache"),
+    os.path.join("Default", "GPUCache"),
+    os.path.join("Default", "Service Worker", "CacheStorage"),
+    "GrShaderCache",
+    "ShaderCache",
+]
+
+
+def dir_size_mb(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total / (1024 * 1024)
+
+
+class ProfileLock:
+    """Exclusive lock on one profile, held by this process for as long as a browser uses it."""
+
+    _held = set()
+    _held_lock = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def try_acquire(self):
+        with self._held_lock:
+            if self.path in self._held:
+                return False
+            self._held.add(self.path)
+        if fcntl is None:
+            return True
+        try:
+            self._file = open(self.path + ".lock", "a")
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            if self._file:
+                self._file.close()
+                self._file = None
+            with self._held_lock:
+                self._held.discard(self.path)
+            return False
+
+    def release(self):
+        if self._file:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        with self._held_lock:
+            self._held.discard(self.path)
+
+
+class Profile:
+    """A locked user-data-dir for one provider; ``release`` hands it back."""
+
+    def __init__(self, provider, path, lock):
+        self.provider = provider
+        self.path = path
+        self._lock = lock
+
+    def release(self):
+        if self._lock is None:
+            return
+        try:
+            os.utime(self.path)
+        except OSError:
+            pass
+        self._lock.release()
+        self._lock = None
+
+
+class ProfilePool:
+    """
+    Persistent Chrome user-data-dirs, ``per_provider`` slots per provider under
+    ``root/<provider>/<slot>``. A slot is used by one browser at a time (locked
+    across processes); profiles older than ``max_age_hours`` are recreated and
+    caches of profiles larger than ``max_mb`` are trimmed by ``prune``.
+    """
+
+    def __init__(self, root=PROFILE_DIR, per_provider=PROFILES_PER_PROVIDER,
+                 max_age_hours=PROFILE_MAX_AGE_HOURS, max_mb=PROFILE_MAX_MB,
+                 prune_interval=PRUNE_INTERVAL):
+        self.root = os.path.abspath(root)
+        self.per_provider = per_provider
+        self.max_age = max_age_hours * 3600
+        self.max_mb = max_mb
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    def _slot_path(self, provider, slot):
+        return os.path.join(self.root, provider, str(slot))
+
+    def _expired(self, path):
+        try:
+            created = os.path.getmtime(os.path.join(path, CREATED_MARKER))
+        except OSError:
+            return False
+        return time.time() - created > self.max_age
+
+    def _prepare(self, path):
+        if os.path.isdir(path) and self._expired(path):
+            logger.info(f"Recreating expired browser profile {path}")
+            shutil.rmtree(path, ignore_errors=True)
+        if not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True)
+            open(os.path.join(path, CREATED_MARKER), "w").close()
+
+    def acquire(self, provider):
+        """Locks a free profile slot for ``provider``; returns None when all are in use."""
+        self.maybe_prune()
+        os.makedirs(os.path.join(self.root, provider), exist_ok=True)
+        for slot in range(self.per_provider):
+            path = self._slot_path(provider, slot)
+            lock = ProfileLock(path)
+            if not lock.try_acquire():
+                continue
+            try:
+                self._prepare(path)
+            except OSError as e:
+                lock.release()
+                logger.warning(f"Could not prepare browser profile {path}: {e}")
+                continue
+            return Profile(provider, path, lock)
+        logger.info(f"All {self.per_provider} {provider} profiles are in use.")
+        return None
+
+    def maybe_prune(self):
+        if time.monotonic() - self._last_prune < self.prune_interval:
+            return
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_prune = time.monotonic()
+            self.prune()
+        finally:
+            self._prune_lock.release()
+
+    def prune(self):
+        """Drops expired profiles and trims oversized caches; profiles in use are skipped."""
+        if not os.path.isdir(self.root):
+            return
+        for provider in os.listdir(self.root):
+            provider_dir = os.path.join(self.root, provider)
+            if not os.path.isdir(provider_dir):
+                continue
+            for slot in os.listdir(provider_dir):
+                path = os.path.join(provider_dir, slot)
+                if not os.path.isdir(path):
+                    continue
+                lock = ProfileLock(path)
+                if not lock.try_acquire():
+                    continue
+                try:
+                    stale = not slot.isdigit() or int(slot) >= self.per_provider
+                    if stale or self._expired(path):
+                        logger.info(f"Pruning browser profile {path}")
+                        shutil.rmtree(path, ignore_errors=True)
+                    elif dir_size_mb(path) > self.max_mb:
+                        logger.info(f"Trimming caches of browser profile {path}")
+                        for cache_dir in CACHE_DIRS:
+                            shutil.rmtree(os.path.join(path, cache_dir), ignore_errors=True)
+                finally:
+                    lock.release()
+
+    def stats(self):
+        in_use = len(ProfileLock._held)
+        return {"root": self.root, "per_provider": self.per_provider, "in_use": in_use}
@@ -0,0 +1,148 @@
+import logging
+import os
+import sys
+import time
+
+from scrapper.fares import cheapest_price
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# With source=["all"], query a fast subset first and add the others only when it is thin
+ADAPTIVE_SELECTION = os.getenv("FLIGHT_ADAPTIVE_SELECTION", "1") == "1"
+# Flights a search should return before the remaining providers are skipped
+SELECT_MIN_FLIGHTS = int(os.getenv("FLIGHT_SELECT_MIN_FLIGHTS", "15"))
+# Searches of a route a provider needs before it can be left out of it
+SELECT_MIN_SAMPLES = int(os.getenv("FLIGHT_SELECT_MIN_SAMPLES", "3"))
+# Providers not searched on a route for this long are queried again to refresh their stats
+SELECT_STALE_SECONDS = float(os.getenv("FLIGHT_SELECT_STALE_SECONDS", "21600"))
+# A provider that had the cheapest fare at least this often is always queried
+SELECT_CHEAPEST_SHARE = float(os.getenv("FLIGHT_SELECT_CHEAPEST_SHARE", "0.3"))
+EWMA_ALPHA = 0.3
+
+# Statuses whose latency and flight count say something about the provider
+MEASURED_STATUSES = ("ok", "empty", "timeout")
+
+
+class RouteStats:
+    """Rolling latency, flight count and cheapest-fare share of one provider on one route."""
+
+    def __init__(self):
+        self.samples = 0
+        self.latency = None
+        self.flights = None
+        self.compared = 0   # searches where another provider's fares were there to compare with
+        self.cheapest = 0   # ... and this provider had the lowest
+        self.last_seen = None
+
+    def _ewma(self, current, sample):
+        return sample if current is None else current + EWMA_ALPHA * (sample - current)
+
+    def update(self, elapsed, flights, now):
+        self.samples += 1
+        self.latency = self._ewma(self.latency, elapsed)
+        self.flights = self._ewma(self.flights, flights)
+        self.last_seen = now
+
+    @property
+    def cheapest_share(self):
+        return self.cheapest / self.compared if self.compared else None
+
+    def stats(self):
+        return {
+            "samples": self.samples,
+            "latency_s": round(self.latency, 2) if self.latency is not None else None,
+            "flights": round(self.flights, 1) if self.flights is not None else None,
+            "cheapest_share": round(self.cheapest_share, 2) if self.cheapest_share is not None else None,
+        }
+
+
+class ProviderStats:
+    """
+    Per-provider, per-route history of searches and the selection policy built on it.
+
+    ``plan`` splits the providers of a search into a first wave and a fallback
+    wave: providers with too little or stale history on the route, the fastest
+    ones until their usual flight count reaches ``min_flights``, and any that
+    often has the cheapest fare go first; the rest run only if the first wave
+    comes back with fewer than ``min_flights`` flights.
+    """
+
+    def __init__(self, min_flights=SELECT_MIN_FLIGHTS, min_samples=SELECT_MIN_SAMPLES,
+                 stale_seconds=SELECT_STALE_SECONDS, cheapest_share=SELECT_CHEAPEST_SHARE,
+                 clock=time.monotonic):
+        self.min_flights = min_flights
+        self.min_samples = min_samples
+        self.stale_seconds = stale_seconds
+        self.cheapest_share = cheapest_share
+        self.clock = clock
+        self._routes = {}  # (provider, route) -> RouteStats
+
+    @staticmethod
+    def route(origin, destination):
+        return f"{origin.strip().upper()}-{destination.strip().upper()}"
+
+    def get(self, provider, route):
+        return self._routes.get((provider, route))
+
+    def record_search(self, route, results):
+        """
+        Folds one search into the history; ``results`` maps provider -> (flights, status).
+        Latency is the status's ``scrape_s``, which leaves out time queued for a scrape slot.
+        """
+        now = self.clock()
+        prices = {}
+        for provider, (flights, status) in results.items():
+            if (status.get("status") not in MEASURED_STATUSES or status.get("scrape_s") is None
+                    or status.get("cached")):
+                continue
+            stats = self._routes.setdefault((provider, route), RouteStats())
+            stats.update(status["scrape_s"], len(flights), now)
+            price = cheapest_price(flights)
+            if price is not None:
+                prices[provider] = price
+        if len(prices) < 2:
+            return
+        lowest = min(prices.values())
+        for provider, price in prices.items():
+            stats = self._routes[(provider, route)]
+            stats.compared += 1
+            if price == lowest:
+                stats.cheapest += 1
+
+    def _known(self, provider, route, now):
+        stats = self.get(provider, route)
+        return (stats is not None and stats.samples >= self.min_samples
+                and now - stats.last_seen <= self.stale_seconds)
+
+    def plan(self, providers, route):
+        """Returns ``(first, fallback)`` lists of providers for a search of ``route``."""
+        now = self.clock()
+        first = [p for p in providers if not self._known(p, route, now)]
+        known = sorted((p for p in providers if p not in first),
+                       key=lambda p: self.get(p, route).latency)
+        expected = 0.0
+        for provider in known:
+            stats = self.get(provider, route)
+            if expected >= self.min_flights:
+                share = stats.cheapest_share
+                if share is None or share < self.cheapest_share:
+                    continue
+            first.append(provider)
+            expected += stats.flights
+        fallback = [p for p in providers if p not in first]
+        if fallback:
+            logger.info(f"Route {route}: querying {first} first; {fallback} only if fewer than "
+                        f"{self.min_flights} flights come back.")
+        return first, fallback
+
+    def stats(self):
+        report = {}
+        for (provider, route), stats in self._routes.items():
+            report.setdefault(route, {})[provider] = stats.stats()
+        return report
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Searches per second and burst per provider; FLIGHT_RATE_<PROVIDER> / FLIGHT_BURST_<PROVIDER> override
+DEFAULT_RATE = float(os.getenv("FLIGHT_RATE_LIMIT", "0.5"))
+DEFAULT_BURST = float(os.getenv("FLIGHT_RATE_BURST", "3"))
+# Requests that would wait longer than this for a token are shed instead
+DEFAULT_MAX_WAIT = float(os.getenv("FLIGHT_RATE_MAX_WAIT", "30"))
+
+
+class RateLimited(Exception):
+    """A provider request was shed because its token bucket is exhausted."""
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at ``rate`` tokens/s up to ``burst``.
+
+    ``acquire`` reserves the next token (the balance may go negative, which
+    orders waiters first come, first served) and sleeps until it is due, or
+    sheds the request with RateLimited when that is more than ``max_wait``
+    away. ``clock`` and ``sleep`` are injectable so a fake clock can drive it.
+    """
+
+    def __init__(self, rate, burst, max_wait=DEFAULT_MAX_WAIT, clock=time.monotonic, sleep=asyncio.sleep):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.burst
+        self.updated = clock()
+        self.granted = 0
+        self.shed = 0
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """Takes a token if one is available right now."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.granted += 1
+            return True
+        return False
+
+    def try_acquire_spare(self):
+        """Takes a token only while the bucket is full, i.e. its traffic has left it unused."""
+        self._refill()
+        if self.tokens >= self.burst:
+            self.tokens -= 1
+            self.granted += 1
+            return True
+        return False
+
+    def reserve(self):
+        """Reserves the next token; returns seconds until it is due, or raises RateLimited."""
+        self._refill()
+        if self.rate <= 0:
+            wait = 0.0 if self.tokens >= 1 else float("inf")
+        else:
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+        if wait > self.max_wait:
+            self.shed += 1
+            raise RateLimited(f"next token in {wait:.1f}s exceeds the {self.max_wait:.0f}s wait limit")
+        self.tokens -= 1
+        self.granted += 1
+        return wait
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait <= 0:
+            return
+        try:
+            await self.sleep(wait)
+        except asyncio.CancelledError:
+            self.tokens += 1  # the reservation is handed back
+            self.granted -= 1
+            raise
+
+    def stats(self):
+        self._refill()
+        return {"rate": self.rate, "burst": self.burst, "tokens": round(self.tokens, 2),
+                "granted": self.granted, "shed": self.shed}
+
+
+class ProviderRateLimiter:
+    """One TokenBucket per provider, configured from the environment unless given explicitly."""
+
+    def __init__(self, limits=None, max_wait=DEFAULT_MAX_WAIT, clock=time.monotonic, sleep=asyncio.sleep):
+        self.limits = dict(limits or {})  # provider -> (rate, burst)
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets = {}
+
+    def _limits_for(self, provider):
+        if provider in self.limits:
+            return self.limits[provider]
+        rate = float(os.getenv(f"FLIGHT_RATE_{provider.upper()}", DEFAULT_RATE))
+        burst = float(os.getenv(f"FLIGHT_BURST_{provider.upper()}", DEFAULT_BURST))
+        return rate, burst
+
+    def bucket(self, provider):
+        if provider not in self._buckets:
+            rate, burst = self._limits_for(provider)
+            self._buckets[provider] = TokenBucket(rate, burst, self.max_wait, self.clock, self.sleep)
+        return self._buckets[provider]
+
+    async def acquire(self, provider, spare_only=False):
+        """
+        Waits for ``provider``'s next token; raises RateLimited when the request is
+        shed. With ``spare_only`` (background work) a token is only taken from a
+        full bucket, never waited for, so it cannot delay or shed other searches.
+        """
+        bucket = self.bucket(provider)
+        if not spare_only:
+            await bucket.acquire()
+        elif not bucket.try_acquire_spare():
+            bucket.shed += 1
+            raise RateLimited(f"no spare capacity ({bucket.tokens:.1f} of {bucket.burst:.0f} tokens left)")
+
+    def stats(self):
+        return {provider: bucket.stats() for provider, bucket in self._buckets.items()}
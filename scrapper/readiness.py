@@ -0,0 +1,164 @@
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+
+from scrapper.cancellation import check_cancelled
+from scrapper.js_extraction import evaluate_in_tab
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# Number of recent waits kept per provider for the timing summary
+TIMING_HISTORY = 200
+
+
+@dataclass
+class ReadinessStrategy:
+    """How to decide that a provider's results page has finished rendering."""
+    selector: str                # flight card selector to count
+    timeout: float = 15.0        # hard upper bound in seconds
+    min_count: int = 1           # cards needed before the count can be "stable"
+    stable_for: float = 1.0      # card count unchanged for this long -> ready
+    network_idle: float = 3.0    # no new network requests for this long -> ready (covers "no flights")
+    poll_interval: float = 0.25
+
+
+@dataclass
+class WaitResult:
+    reason: str      # "stable", "network_idle", "until" or "timeout"
+    elapsed: float
+    count: int
+
+
+def _probe_script(selector):
+    return (
+        "return JSON.stringify([document.querySelectorAll(%s).length, "
+        "performance.getEntriesByType('resource').length, document.readyState]);"
+        % json.dumps(selector)
+    )
+
+
+class WaitTimings:
+    """Thread-safe record of how long readiness waits took, per provider."""
+
+    def __init__(self, history=TIMING_HISTORY):
+        self._lock = threading.Lock()
+        self._waits = defaultdict(lambda: deque(maxlen=history))
+
+    def record(self, provider, result):
+        with self._lock:
+            self._waits[provider].append(result)
+
+    def percentile(self, provider, pct):
+        with self._lock:
+            elapsed = sorted(w.elapsed for w in self._waits.get(provider, ()))
+        if not elapsed:
+            return None
+        index = min(len(elapsed) - 1, int(round(pct / 100 * (len(elapsed) - 1))))
+        return elapsed[index]
+
+    def summary(self):
+        with self._lock:
+            providers = {key: list(waits) for key, waits in self._waits.items()}
+        summary = {}
+        for provider, waits in providers.items():
+            reasons = defaultdict(int)
+            for wait in waits:
+                reasons[wait.reason] += 1
+            summary[provider] = {
+                "waits": len(waits),
+                "p50": self.percentile(provider, 50),
+                "p90": self.percentile(provider, 90),
+                "max": max(w.elapsed for w in waits),
+                "reasons": dict(reasons),
+            }
+        return summary
+
+
+wait_timings = WaitTimings()
+
+
+class _ReadinessTracker:
+    """Decision logic shared by the sync and async waits, fed one probe at a time."""
+
+    def __init__(self, strategy, until=None):
+        self.strategy = strategy
+        self.until = until
+        self.start = time.monotonic()
+        self.last_count, self.count_since = -1, self.start
+        self.last_requests, self.requests_since = -1, self.start
+        self.count = 0
+
+    def update(self, probe):
+        """Takes a probe result (or None when it failed); returns the reason once ready."""
+        now = time.monotonic()
+        if probe is None:
+            count, requests, ready_state = self.last_count, self.last_requests, "loading"
+        else:
+            count, requests, ready_state = probe
+        self.count = count
+        if count != self.last_count:
+            self.last_count, self.count_since = count, now
+        if requests != self.last_requests:
+            self.last_requests, self.requests_since = requests, now
+        if self.until is not None and self.until():
+            return "until"
+        if count >= self.strategy.min_count and now - self.count_since >= self.strategy.stable_for:
+            return "stable"
+        if ready_state == "complete" and now - self.requests_since >= self.strategy.network_idle:
+            return "network_idle"
+        if now - self.start >= self.strategy.timeout:
+            return "timeout"
+        return None
+
+    def finish(self, reason, provider):
+        result = WaitResult(reason=reason, elapsed=time.monotonic() - self.start, count=max(self.count, 0))
+        wait_timings.record(provider, result)
+        logger.info(f"{provider} ready after {result.elapsed:.2f}s ({reason}, {result.count} cards)")
+        return result
+
+
+def wait_until_ready(sb, strategy, provider, until=None, cancel=None):
+    """
+    Polls the page until the flight card count is stable, the network goes idle,
+    ``until()`` returns True, or ``strategy.timeout`` passes, and records how
+    long the wait took. Raises ScrapeCancelled once ``cancel`` is cancelled.
+    """
+    script = _probe_script(strategy.selector)
+    tracker = _ReadinessTracker(strategy, until)
+    while True:
+        check_cancelled(cancel)
+        try:
+            probe = json.loads(sb.execute_script(script))
+        except Exception as e:
+            logger.debug(f"Readiness probe failed for {provider}: {e}")
+            probe = None
+        reason = tracker.update(probe)
+        if reason:
+            return tracker.finish(reason, provider)
+        time.sleep(strategy.poll_interval)
+
+
+async def wait_until_ready_async(tab, strategy, provider, until=None):
+    """``wait_until_ready`` for a cdp_driver tab; sleeps on the event loop between probes."""
+    script = _probe_script(strategy.selector)
+    tracker = _ReadinessTracker(strategy, until)
+    while True:
+        try:
+            probe = json.loads(await evaluate_in_tab(tab, script))
+        except Exception as e:
+            logger.debug(f"Readiness probe failed for {provider}: {e}")
+            probe = None
+        reason = tracker.update(probe)
+        if reason:
+            return tracker.finish(reason, provider)
+        await asyncio.sleep(strategy.poll_interval)
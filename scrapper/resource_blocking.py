@@ -0,0 +1,162 @@
+import logging
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+
+import mycdp
+
+from scrapper.network_capture import run_cdp
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# Set FLIGHT_BLOCK_RESOURCES=0 to let the results pages load everything
+BLOCK_RESOURCES = os.getenv("FLIGHT_BLOCK_RESOURCES", "1") == "1"
+
+# Nothing the parsers read comes from these; stylesheets and scripts stay allowed
+# because the results list (and ixigo's infinite scroll) need layout and the app
+BLOCKED_RESOURCE_TYPES = (
+    mycdp.network.ResourceType.IMAGE,
+    mycdp.network.ResourceType.FONT,
+    mycdp.network.ResourceType.MEDIA,
+    mycdp.network.ResourceType.TEXT_TRACK,
+    mycdp.network.ResourceType.PING,
+)
+# Ad, analytics and tag-manager hosts (Network.setBlockedURLs wildcards)
+BLOCKED_URLS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*googleadservices.com*",
+    "*googlesyndication.com*",
+    "*doubleclick.net*",
+    "*connect.facebook.net*",
+    "*facebook.com/tr*",
+    "*analytics.twitter.com*",
+    "*bat.bing.com*",
+    "*clarity.ms*",
+    "*hotjar.com*",
+    "*branch.io*",
+    "*appsflyer.com*",
+    "*criteo.com*",
+    "*taboola.com*",
+    "*outbrain.com*",
+    "*quantserve.com*",
+    "*scorecardresearch.com*",
+    "*newrelic.com*",
+    "*nr-data.net*",
+]
+# Never blocked: bot checks must still be able to render their challenge
+DEFAULT_ALLOW = [r"captcha", r"challenge"]
+
+
+@dataclass
+class BlockingPolicy:
+    """What a provider's results page may skip loading."""
+    resource_types: tuple = BLOCKED_RESOURCE_TYPES
+    blocked_urls: list = field(default_factory=lambda: list(BLOCKED_URLS))
+    allow: list = field(default_factory=lambda: list(DEFAULT_ALLOW))  # regexes never blocked
+
+
+class ResourceBlocker:
+    """
+    Applies a BlockingPolicy to the active tab: tracker hosts go to
+    ``Network.setBlockedURLs`` and the blocked resource types are failed through
+    ``Fetch`` request interception unless their URL matches ``policy.allow``.
+
+    Call ``attach`` before navigating and ``detach`` afterwards, so a pooled
+    browser does not carry one provider's policy into the next scrape.
+    """
+
+    def __init__(self, policy, provider=""):
+        self.policy = policy
+        self.provider = provider
+        self.allow = [re.compile(p, re.IGNORECASE) for p in policy.allow]
+        self.blocked = 0
+        self._tab = None
+
+    def _allowed(self, url):
+        return any(pattern.search(url) for pattern in self.allow)
+
+    async def _on_paused(self, event):
+        try:
+            if self._allowed(event.request.url):
+                await self._tab.send(mycdp.fetch.continue_request(event.request_id))
+            else:
+                self.blocked += 1
+                await self._tab.send(mycdp.fetch.fail_request(
+                    event.request_id, mycdp.network.ErrorReason.BLOCKED_BY_CLIENT))
+        except Exception as e:
+            logger.debug(f"Could not resolve paused request {event.request.url}: {e}")
+
+    async def _enable(self):
+        await self._tab.send(mycdp.network.enable())
+        await self._tab.send(mycdp.network.set_blocked_urls(urls=self.policy.blocked_urls))
+        patterns = [mycdp.fetch.RequestPattern(url_pattern="*", resource_type=resource_type,
+                                               request_stage=mycdp.fetch.RequestStage.REQUEST)
+                    for resource_type in self.policy.resource_types]
+        await self._tab.send(mycdp.fetch.enable(patterns=patterns))
+
+    async def _disable(self):
+        await self._tab.send(mycdp.fetch.disable())
+        await self._tab.send(mycdp.network.set_blocked_urls(urls=[]))
+
+    def attach(self, sb):
+        if not getattr(sb, "cdp", None):
+            sb.activate_cdp_mode("about:blank")
+        run_cdp(sb, self.attach_tab(sb.cdp.get_active_tab()))
+
+    def detach(self, sb):
+        if self._tab is not None:
+            run_cdp(sb, self.detach_tab())
+
+    async def attach_tab(self, tab):
+        """Applies the policy to a cdp_driver tab directly (used by the async tab engine)."""
+        self._tab = tab
+        self._tab.add_handler(mycdp.fetch.RequestPaused, self._on_paused)
+        await self._enable()
+
+    async def detach_tab(self):
+        if self._tab is None:
+            return
+        try:
+            await self._disable()
+        except Exception as e:
+            logger.warning(f"Could not clear resource blocking for {self.provider}: {e}")
+        handlers = self._tab.handlers.get(mycdp.fetch.RequestPaused, [])
+        if self._on_paused in handlers:
+            handlers.remove(self._on_paused)
+        self._tab = None
+        logger.info(f"Blocked {self.blocked} image/font/media request(s) for {self.provider}.")
+
+
+def block_resources(sb, policy, provider):
+    """Attaches a ResourceBlocker for ``policy``; returns it, or None when blocking is off."""
+    if not BLOCK_RESOURCES or policy is None:
+        return None
+    blocker = ResourceBlocker(policy, provider)
+    try:
+        blocker.attach(sb)
+    except Exception as e:
+        logger.warning(f"Resource blocking unavailable for {provider}: {e}")
+        blocker.detach(sb)
+        return None
+    return blocker
+
+
+async def block_resources_async(tab, policy, provider):
+    """``block_resources`` for a cdp_driver tab."""
+    if not BLOCK_RESOURCES or policy is None:
+        return None
+    blocker = ResourceBlocker(policy, provider)
+    try:
+        await blocker.attach_tab(tab)
+    except Exception as e:
+        logger.warning(f"Resource blocking unavailable for {provider}: {e}")
+        await blocker.detach_tab()
+        return None
+    return blocker
@@ -0,0 +1,59 @@
+import os
+import time
+from collections import OrderedDict
+
+# --- Configuration ---
+# How long a provider's flights for a route and date are served without a new scrape (0 disables)
+CACHE_TTL_SECONDS = float(os.getenv("FLIGHT_CACHE_TTL_SECONDS", "900"))
+CACHE_MAX_ENTRIES = int(os.getenv("FLIGHT_CACHE_MAX_ENTRIES", "2000"))
+
+
+class ResultCache:
+    """
+    Parsed flights per (provider, origin, destination, travel date), served for
+    ``ttl`` seconds. Least recently used entries are dropped past ``max_entries``.
+    """
+
+    def __init__(self, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (stored_at, flights)
+
+    @staticmethod
+    def key(provider, origin, destination, travel_date):
+        return provider, origin.strip().upper(), destination.strip().upper(), travel_date
+
+    def age(self, provider, origin, destination, travel_date):
+        """Seconds since the entry was stored, or None if there is none."""
+        entry = self._entries.get(self.key(provider, origin, destination, travel_date))
+        return None if entry is None else self.clock() - entry[0]
+
+    def get(self, provider, origin, destination, travel_date):
+        """Returns ``(flights, age_s)`` of a fresh entry, or None."""
+        if self.ttl <= 0:
+            return None
+        key = self.key(provider, origin, destination, travel_date)
+        entry = self._entries.get(key)
+        if entry is None or self.clock() - entry[0] > self.ttl:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return [dict(flight) for flight in entry[1]], self.clock() - entry[0]
+
+    def put(self, provider, origin, destination, travel_date, flights):
+        if self.ttl <= 0:
+            return
+        key = self.key(provider, origin, destination, travel_date)
+        self._entries[key] = (self.clock(), [dict(flight) for flight in flights])
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self._entries), "ttl_s": self.ttl, "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 2) if lookups else None}
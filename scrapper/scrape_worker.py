@@ -0,0 +1,107 @@
+"""
+Entry point of the WorkerPool's scrape processes.
+
+Workers are spawned, so each one imports its entry point's module from
+scratch. This module only pulls in the browser pool and the provider scrape
+functions, not the MCP server with its pools, limiters and prefetcher.
+"""
+import logging
+import os
+import sys
+import threading
+
+from scrapper.browser_pool import BrowserPool
+from scrapper.cancellation import CancelToken, ScrapeCancelled
+from scrapper.expedia import expedia_scrap
+from scrapper.ixigo import ixigo_scrap
+from scrapper.mmt import mmt_scrap
+from scrapper.profiles import ProfilePool
+
+try:
+    import psutil
+except ImportError:  # workers then report no RSS/CPU and the memory cap is skipped
+    psutil = None
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+STATS_INTERVAL = 5.0       # how often a worker reports its RSS and CPU
+
+# Provider -> blocking scraper, called with a leased ``sb``
+SCRAPERS = {
+    "mmt": mmt_scrap.scrap_data,
+    "ixigo": ixigo_scrap.scrap_data,
+    "expedia": expedia_scrap.scrap_data,
+}
+
+
+def _process_tree(pid):
+    root = psutil.Process(pid)
+    return [root] + root.children(recursive=True)
+
+
+def _measure(pid, cpu_cache):
+    """RSS (MB) and CPU (%) of a worker and every Chrome/Xvfb process it started."""
+    rss, cpu = 0, 0.0
+    for process in _process_tree(pid):
+        try:
+            rss += process.memory_info().rss
+            # cpu_percent needs the same Process object between calls
+            cpu += cpu_cache.setdefault(process.pid, process).cpu_percent(None)
+        except psutil.Error:
+            continue
+    return rss / (1024 * 1024), cpu
+
+
+def _report_stats(worker_id, results, stop):
+    cpu_cache = {}
+    while not stop.wait(STATS_INTERVAL):
+        try:
+            rss_mb, cpu_percent = _measure(os.getpid(), cpu_cache)
+        except psutil.Error:
+            continue
+        results.put(("stats", worker_id, rss_mb, cpu_percent))
+
+
+def worker_main(worker_id, tasks, results, pool_options, cancel_event):
+    """
+    Runs scrape jobs ``(job_id, provider, args, kwargs)`` on the worker's own
+    warm browser and sends results, errors and periodic RSS/CPU stats back over
+    ``results``. The supervisor sets ``cancel_event`` to abort the running job.
+    """
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()  # Chrome and Xvfb join our process group, so one killpg reaps them all
+    options = dict(pool_options)
+    profiles = ProfilePool() if options.pop("profiles", False) else None
+    pool = BrowserPool(size=1, max_size=1, profiles=profiles, **options)
+    if profiles is None:
+        pool.warm()  # with profiles the browser is launched for the first job's provider
+    stop = threading.Event()
+    if psutil is not None:
+        threading.Thread(target=_report_stats, args=(worker_id, results, stop), daemon=True).start()
+    results.put(("ready", worker_id, os.getpid()))
+    cancel = CancelToken(cancel_event)
+    try:
+        while True:
+            job = tasks.get()
+            if job is None:
+                break
+            job_id, provider, args, kwargs = job
+            cancel_event.clear()
+            try:
+                scrap = SCRAPERS[provider]
+                with pool.lease(provider=provider, cancel=cancel) as sb:
+                    value = scrap(*args, sb=sb, cancel=cancel, **kwargs)
+                results.put(("result", worker_id, job_id, value))
+            except ScrapeCancelled:
+                results.put(("error", worker_id, job_id, "ScrapeCancelled: cancelled by the server"))
+            except Exception as e:
+                results.put(("error", worker_id, job_id, f"{type(e).__name__}: {e}"))
+    finally:
+        stop.set()
+        pool.close()
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import os
+import sys
+from contextlib import asynccontextmanager
+
+import mycdp
+from seleniumbase.undetected.cdp_driver.cdp_util import start_async
+
+from scrapper.network_capture import CDP_CAPTURE, ResponseCapture
+from scrapper.resource_blocking import block_resources_async
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+MAX_TABS = int(os.getenv("FLIGHT_MAX_TABS", "12"))
+DEFAULT_VIEWPORT = (1400, 1000)
+# Tabs in the background would otherwise have their timers and rendering throttled
+BACKGROUND_TAB_ARGS = [
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+]
+
+
+class TabEngine:
+    """
+    One undetected Chrome driven over CDP from the event loop, with each
+    provider scrape running in its own tab. At most ``max_tabs`` tabs are open
+    at once; further scrapes wait for a tab to close.
+    """
+
+    def __init__(self, max_tabs=MAX_TABS, browser_options=None):
+        self.max_tabs = max_tabs
+        self.browser_options = dict(browser_options or {})
+        self.browser_options.setdefault("browser_args", BACKGROUND_TAB_ARGS)
+        self._browser = None
+        self._loop = None
+        self._start_lock = None
+        self._slots = None
+        self.open_tabs = 0
+        self.tabs_served = 0
+
+    def _bind(self):
+        # Locks belong to the loop that first uses the engine (FastMCP's)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._start_lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.max_tabs)
+            self._browser = None
+
+    async def start(self):
+        self._bind()
+        async with self._start_lock:
+            if self._browser is None or self._browser.stopped:
+                self._browser = await start_async(**self.browser_options)
+                logger.info(f"Started tab engine browser (up to {self.max_tabs} tabs).")
+        return self._browser
+
+    async def _open_tab(self, viewport):
+        browser = await self.start()
+        tab = await browser.get("about:blank", new_tab=True)
+        width, height = viewport
+        await tab.send(mycdp.emulation.set_focus_emulation_enabled(True))
+        await tab.send(mycdp.emulation.set_device_metrics_override(
+            width=width, height=height, device_scale_factor=1, mobile=False))
+        return tab
+
+    @asynccontextmanager
+    async def tab(self, provider, policy=None, api_url_patterns=None, viewport=DEFAULT_VIEWPORT):
+        """
+        Opens a tab for ``provider`` with its resource ``policy`` applied and, when
+        CDP capture is on, a ResponseCapture for ``api_url_patterns`` attached.
+        Yields ``(tab, capture)``; the tab is closed afterwards.
+        """
+        self._bind()
+        async with self._slots:
+            tab = await self._open_tab(viewport)
+            self.open_tabs += 1
+            capture = ResponseCapture(api_url_patterns) if CDP_CAPTURE and api_url_patterns else None
+            blocker = None
+            try:
+                blocker = await block_resources_async(tab, policy, provider)
+                if capture:
+                    capture.attach_tab(tab)
+                yield tab, capture
+            finally:
+                if capture:
+                    capture.detach()
+                if blocker:
+                    await blocker.detach_tab()
+                self.open_tabs -= 1
+                self.tabs_served += 1
+                try:
+                    await tab.close()
+                except Exception as e:
+                    logger.warning(f"Could not close {provider} tab: {e}")
+
+    def stats(self):
+        return {"max_tabs": self.max_tabs, "open_tabs": self.open_tabs,
+                "tabs_served": self.tabs_served, "running": self._browser is not None}
+
+    def close(self):
+        if self._browser is not None:
+            try:
+                self._browser.stop()
+            except Exception as e:
+                logger.warning(f"Error while stopping tab engine browser: {e}")
+            self._browser = None
+
+
+# Shared by every provider's tab scraper
+tab_engine = TabEngine()
@@ -0,0 +1,361 @@
+import importlib
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+import types
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from scrapper.cancellation import ScrapeCancelled
+
+try:
+    import psutil
+except ImportError:  # workers then report no RSS/CPU and the memory cap is skipped
+    psutil = None
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+DEFAULT_JOB_TIMEOUT = 120
+DEFAULT_MAX_TOTAL_RSS_MB = 4000
+# "module:function" run in each worker process; see scrapper.scrape_worker.worker_main
+DEFAULT_ENTRY_POINT = "scrapper.scrape_worker:worker_main"
+RETIRE_GRACE = 15.0        # seconds a retiring worker gets to exit before it is killed
+CANCEL_GRACE = 10.0        # seconds a cancelled scrape gets to stop before its worker is killed
+IDLE_RETIRE = 300.0        # workers above ``size`` that sat idle this long are retired
+SUPERVISOR_POLL = 0.5
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker process running a scrape died or was killed."""
+
+
+def _resolve(target):
+    module_name, function_name = target.split(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _run_entry_point(entry_point, *args):
+    # Imported in the child only, so the parent need not load the scrapers
+    _resolve(entry_point)(*args)
+
+
+@contextmanager
+def _main_module_hidden():
+    """
+    Keeps a spawned child from re-running the parent's ``__main__`` script (the
+    MCP server) as ``__mp_main__``: spawn only does that when it can find the
+    script through ``sys.modules["__main__"]``.
+    """
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+@dataclass
+class _Job:
+    id: int
+    provider: str
+    args: tuple
+    kwargs: dict
+    future: Future = field(default_factory=Future)
+    started: float = None
+
+
+class _Worker:
+    def __init__(self, context, worker_id, results, pool_options, entry_point):
+        self.id = worker_id
+        self.tasks = context.Queue()
+        self.cancel_event = context.Event()
+        self.process = context.Process(target=_run_entry_point, name=f"scrape-worker-{worker_id}",
+                                       args=(entry_point, worker_id, self.tasks, results, pool_options,
+                                             self.cancel_event),
+                                       daemon=True)
+        with _main_module_hidden():
+            self.process.start()
+        self.job = None
+        self.ready = False
+        self.retiring_since = None
+        self.cancelled_since = None
+        self.last_active = time.monotonic()
+        self.jobs_done = 0
+        self.rss_mb = None
+        self.cpu_percent = None
+
+    @property
+    def idle(self):
+        return self.ready and self.job is None and self.retiring_since is None
+
+    def retire(self):
+        if self.retiring_since is None:
+            self.retiring_since = time.monotonic()
+            self.tasks.put(None)
+
+    def kill(self):
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass  # not its own group leader yet
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+
+
+class WorkerPool:
+    """
+    Runs blocking scrapes in supervised worker processes, each with its own warm
+    browser. A job that runs past ``job_timeout`` has its worker's whole process
+    group killed; dead workers are respawned. When the workers' combined RSS
+    passes ``max_total_rss_mb`` the largest one is retired once it is idle.
+
+    ``size`` workers are kept alive; while jobs are queued more are started, up
+    to ``max_size``, and those extras are retired after IDLE_RETIRE idle seconds.
+
+    Workers run ``entry_point`` ("module:function", scrapper.scrape_worker's
+    worker_main by default). ``submit`` returns a concurrent.futures.Future
+    (wrap it with ``asyncio.wrap_future`` from async code).
+    """
+
+    def __init__(self, size=2, job_timeout=DEFAULT_JOB_TIMEOUT, max_total_rss_mb=DEFAULT_MAX_TOTAL_RSS_MB,
+                 pool_options=None, max_size=None, entry_point=DEFAULT_ENTRY_POINT):
+        self.size = size
+        self.entry_point = entry_point
+        self.max_size = max(max_size or size, size)
+        self.job_timeout = job_timeout
+        self.max_total_rss_mb = max_total_rss_mb
+        self.pool_options = dict(pool_options or {})
+        # spawn: never fork the server's threads and event loop into a worker
+        self._context = multiprocessing.get_context("spawn")
+        self._results = None
+        self._workers = {}
+        self._pending = []
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._worker_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self.restarts = 0
+
+    def start(self):
+        with self._lock:
+            if self._started or self._closed:
+                return
+            self._started = True
+            self._results = self._context.Queue()
+            for _ in range(self.size):
+                self._spawn()
+        threading.Thread(target=self._supervise, name="scrape-supervisor", daemon=True).start()
+
+    def _spawn(self):
+        worker = _Worker(self._context, next(self._worker_ids), self._results, self.pool_options,
+                         self.entry_point)
+        self._workers[worker.id] = worker
+        logger.info(f"Started scrape worker {worker.id} (pid {worker.process.pid}).")
+
+    def submit(self, provider, *args, **kwargs):
+        """Queues a scrape of ``provider`` (its scraper is called with a leased ``sb``) for a worker."""
+        self.start()
+        job = _Job(next(self._ids), provider, args, kwargs)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is closed.")
+            self._pending.append(job)
+            self._jobs[job.id] = job
+            self._dispatch()
+        return job.future
+
+    def _dispatch(self):
+        for worker in self._workers.values():
+            while self._pending and worker.idle:
+                job = self._pending.pop(0)
+                if not job.future.set_running_or_notify_cancel():
+                    self._jobs.pop(job.id, None)
+                    continue
+                job.started = time.monotonic()
+                worker.job = job
+                worker.tasks.put((job.id, job.provider, job.args, job.kwargs))
+        if self._pending and not self._closed:
+            active = [w for w in self._workers.values() if w.retiring_since is None]
+            starting = sum(1 for w in active if not w.ready)
+            for _ in range(min(len(self._pending) - starting, self.max_size - len(active))):
+                self._spawn()
+
+    def _active_count(self):
+        return sum(1 for w in self._workers.values() if w.retiring_since is None)
+
+    def cancel(self, future):
+        """
+        Cancels the job behind ``future``: a queued job is dropped, a running one
+        is asked to stop and its worker is killed if it has not within CANCEL_GRACE.
+        """
+        with self._lock:
+            job = next((j for j in self._jobs.values() if j.future is future), None)
+            if job is None:
+                return
+            if job in self._pending:
+                self._pending.remove(job)
+                self._jobs.pop(job.id, None)
+                job.future.cancel()
+                return
+            worker = next((w for w in self._workers.values() if w.job is job), None)
+            if worker is not None and worker.cancelled_since is None:
+                logger.info(f"Cancelling {job.provider} job on scrape worker {worker.id}.")
+                worker.cancelled_since = time.monotonic()
+                worker.cancel_event.set()
+            if not job.future.done():
+                job.future.set_exception(ScrapeCancelled())
+
+    def _finish(self, worker, job_id, value=None, error=None):
+        job = self._jobs.pop(job_id, None)
+        if worker.job is not None and worker.job.id == job_id:
+            worker.job = None
+            worker.cancelled_since = None
+            worker.last_active = time.monotonic()
+            worker.jobs_done += 1
+        if job is None or job.future.done():
+            return
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(value)
+
+    def _handle(self, message):
+        kind, worker_id = message[0], message[1]
+        worker = self._workers.get(worker_id)
+        if worker is None:
+            return
+        if kind == "ready":
+            worker.ready = True
+        elif kind == "stats":
+            worker.rss_mb, worker.cpu_percent = message[2], message[3]
+        elif kind == "result":
+            self._finish(worker, message[2], value=message[3])
+        elif kind == "error":
+            job = self._jobs.get(message[2])
+            provider = job.provider if job else "?"
+            self._finish(worker, message[2],
+                         error=RuntimeError(f"{provider} scrape failed in worker {worker_id}: {message[3]}"))
+
+    def _check_workers(self):
+        now = time.monotonic()
+        for worker in list(self._workers.values()):
+            job = worker.job
+            if job is not None and now - job.started > self.job_timeout:
+                logger.error(f"Killing scrape worker {worker.id}: {job.provider} job ran "
+                             f"over {self.job_timeout}s.")
+                worker.kill()
+                self._finish(worker, job.id, error=TimeoutError(
+                    f"{job.provider} scrape exceeded {self.job_timeout}s and its worker was killed."))
+            elif worker.cancelled_since is not None and now - worker.cancelled_since > CANCEL_GRACE:
+                logger.warning(f"Killing scrape worker {worker.id}: cancelled job did not stop.")
+                worker.kill()
+            elif worker.retiring_since is not None and now - worker.retiring_since > RETIRE_GRACE:
+                worker.kill()
+            if worker.process.is_alive():
+                continue
+            if worker.job is not None:
+                self._finish(worker, worker.job.id, error=WorkerCrashed(
+                    f"Scrape worker {worker.id} exited with code {worker.process.exitcode} "
+                    f"during a {worker.job.provider} job."))
+            del self._workers[worker.id]
+            if self._closed or self._active_count() >= self.size:
+                continue
+            if worker.retiring_since is None:
+                self.restarts += 1
+                logger.warning(f"Respawning scrape worker {worker.id} "
+                               f"(exit code {worker.process.exitcode}).")
+            self._spawn()
+        self._retire_idle_extras(now)
+        self._enforce_memory_cap()
+
+    def _retire_idle_extras(self, now):
+        extras = self._active_count() - self.size
+        for worker in sorted(self._workers.values(), key=lambda w: w.last_active):
+            if extras <= 0:
+                return
+            if worker.idle and now - worker.last_active > IDLE_RETIRE:
+                logger.info(f"Retiring idle scrape worker {worker.id}.")
+                worker.retire()
+                extras -= 1
+
+    def _enforce_memory_cap(self):
+        if psutil is None or not self.max_total_rss_mb:
+            return
+        measured = [w for w in self._workers.values() if w.rss_mb is not None and w.retiring_since is None]
+        total = sum(w.rss_mb for w in measured)
+        if total <= self.max_total_rss_mb:
+            return
+        idle = [w for w in measured if w.job is None]
+        if idle:
+            largest = max(idle, key=lambda w: w.rss_mb)
+            logger.info(f"Workers use {total:.0f} MB RSS (cap {self.max_total_rss_mb} MB); "
+                        f"retiring worker {largest.id} ({largest.rss_mb:.0f} MB).")
+            largest.retire()
+
+    def _supervise(self):
+        while True:
+            try:
+                message = self._results.get(timeout=SUPERVISOR_POLL)
+            except queue.Empty:
+                message = None
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                if self._closed:
+                    return
+                if message is not None:
+                    self._handle(message)
+                self._check_workers()
+                self._dispatch()
+
+    def stats(self):
+        with self._lock:
+            workers = [{
+                "id": w.id,
+                "pid": w.process.pid,
+                "busy": w.job is not None,
+                "provider": w.job.provider if w.job else None,
+                "jobs_done": w.jobs_done,
+                "rss_mb": round(w.rss_mb, 1) if w.rss_mb is not None else None,
+                "cpu_percent": round(w.cpu_percent, 1) if w.cpu_percent is not None else None,
+            } for w in self._workers.values()]
+            return {"size": self.size, "max_size": self.max_size, "queued": len(self._pending),
+                    "restarts": self.restarts,
+                    "total_rss_mb": round(sum(w["rss_mb"] or 0 for w in workers), 1),
+                    "workers": workers}
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers.values())
+            pending, self._pending = self._pending, []
+        for job in pending:
+            job.future.cancel()
+        for worker in workers:
+            worker.tasks.put(None)
+        deadline = time.monotonic() + RETIRE_GRACE
+        for worker in workers:
+            worker.process.join(timeout=max(0.1, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                worker.kill()
+            if worker.job is not None and not worker.job.future.done():
+                worker.job.future.set_exception(WorkerCrashed("Worker pool closed during the scrape."))
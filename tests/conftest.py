@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Make the scrapper package importable however pytest is launched, and the MCP
+# servers importable as the scripts they are (mcp_tool/__init__ loads the agent stack)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (project_root, os.path.join(project_root, "mcp_tool")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,112 @@
+"""
+Runs the in-page extractor scripts under Node.js against a saved page, so they
+can be checked without a browser.
+
+The page is parsed with lexbor (an HTML5 parser, like Chrome's) and handed to
+a small DOM exposing what the scripts use: querySelector(All), textContent,
+childNodes/nodeType/nodeValue, getAttribute and outerHTML. CSS selectors are
+matched in Python; every selector literal in the scripts is resolved up front.
+"""
+import json
+import re
+import shutil
+import subprocess
+
+from selectolax.lexbor import LexborHTMLParser
+
+NODE = shutil.which("node")
+
+# 'p[class*="airlineName"]' in querySelector('...') calls, and the tag of fx.find*ExactClass(root, 'div', ...)
+SELECTOR_LITERAL = re.compile(r"""querySelector(?:All)?\((?:'([^']*)'|("(?:[^"\\]|\\.)*"))\)""")
+EXACT_CLASS_TAG = re.compile(r"""fx\.find(?:All)?ExactClass\(\w+, '(\w+)'""")
+
+DOM_SHIM = r"""
+const input = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const matches = {};
+for (const [selector, ids] of Object.entries(input.matches)) { matches[selector] = new Set(ids); }
+
+class Text {
+    constructor(value) { this.nodeType = 3; this.nodeValue = value; }
+    get textContent() { return this.nodeValue; }
+}
+
+class Element {
+    constructor(node) {
+        this.nodeType = 1;
+        this.id_ = node.id;
+        this.tagName = node.tag.toUpperCase();
+        this.attributes_ = node.attrs;
+        this.outerHTML = node.html;
+        this.childNodes = node.children.map((child) => typeof child === 'string' ? new Text(child) : new Element(child));
+        this.scrollTop = 0;
+        this.clientHeight = 0;
+        this.scrollHeight = 0;
+    }
+    getAttribute(name) { return name in this.attributes_ ? this.attributes_[name] : null; }
+    get textContent() { return this.childNodes.map((child) => child.textContent).join(''); }
+    querySelectorAll(selector) {
+        const ids = matches[selector];
+        if (!ids) { throw new Error('selector was not resolved: ' + selector); }
+        const found = [];
+        (function walk(el) {
+            for (const child of el.childNodes) {
+                if (child.nodeType !== 1) { continue; }
+                if (ids.has(child.id_)) { found.push(child); }
+                walk(child);
+            }
+        })(this);
+        return found;
+    }
+    querySelector(selector) { return this.querySelectorAll(selector)[0] || null; }
+    scrollBy() {}
+}
+
+const root = new Element(input.root);
+const document = {
+    documentElement: root,
+    scrollingElement: root,
+    querySelectorAll: (selector) => root.querySelectorAll(selector),
+    querySelector: (selector) => root.querySelector(selector),
+};
+const window = {};
+const results = input.scripts.map((script) => new Function('document', 'window', script)(document, window));
+process.stdout.write(JSON.stringify(results));
+"""
+
+
+def _selectors(scripts):
+    selectors = set()
+    for script in scripts:
+        for single, double in SELECTOR_LITERAL.findall(script):
+            selectors.add(single if not double else json.loads(double))
+        selectors.update(EXACT_CLASS_TAG.findall(script))
+    return selectors
+
+
+def _tree(node, ids, with_html):
+    children = []
+    for child in node.iter(include_text=True):
+        if child.tag == "-text":
+            children.append(child.text_content)
+        elif not child.tag.startswith("-"):
+            children.append(_tree(child, ids, with_html))
+    element = {"id": ids.setdefault(node.mem_id, len(ids)), "tag": node.tag,
+               "attrs": {name: value or "" for name, value in node.attributes.items()}, "children": children,
+               "html": node.html if node.mem_id in with_html else None}
+    return element
+
+
+def run_scripts(html, scripts, html_for=None):
+    """
+    Runs ``scripts`` (``sb.execute_script``-style bodies ending in ``return``)
+    one after another on the parsed ``html``, sharing ``window``; returns what
+    each returned. Elements matching the ``html_for`` selector carry outerHTML.
+    """
+    root = LexborHTMLParser(html).root
+    ids = {}
+    with_html = {node.mem_id for node in root.css(html_for)} if html_for else set()
+    tree = _tree(root, ids, with_html)
+    matches = {selector: [ids[node.mem_id] for node in root.css(selector)] for selector in _selectors(scripts)}
+    completed = subprocess.run([NODE, "-e", DOM_SHIM], capture_output=True, text=True, check=True,
+                               input=json.dumps({"root": tree, "matches": matches, "scripts": scripts}))
+    return json.loads(completed.stdout)
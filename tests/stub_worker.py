@@ -0,0 +1,15 @@
+"""Worker entry point for WorkerPool tests: answers each job with its provider and arguments."""
+import os
+
+
+def worker_main(worker_id, tasks, results, pool_options, cancel_event):
+    results.put(("ready", worker_id, os.getpid()))
+    while True:
+        job = tasks.get()
+        if job is None:
+            break
+        job_id, provider, args, kwargs = job
+        if provider == "broken":
+            results.put(("error", worker_id, job_id, "RuntimeError: scrape failed"))
+        else:
+            results.put(("result", worker_id, job_id, (provider, args, kwargs)))
@@ -0,0 +1,53 @@
+import json
+import os
+
+import pytest
+
+from scrapper.api_records import iter_results, map_api_records
+from scrapper.expedia import data_extraction as expedia_data_extraction
+from scrapper.fixture_server import FIXTURE_DIR
+from scrapper.ixigo import data_extraction as ixigo_data_extraction
+from scrapper.mmt import data_extraction as mmt_data_extraction
+
+# provider -> (extract_flight_data_from_api, (airline, departure, arrival, price) of each flight in its payload)
+PROVIDERS = {
+    "mmt": (mmt_data_extraction.extract_flight_data_from_api, [
+        ("IndiGo", "06:05", "07:25", "4123"), ("Air India", "09:40", "11:05", "5210"),
+        ("Akasa Air", "14:10", "18:45", "6398")]),
+    "ixigo": (ixigo_data_extraction.extract_flight_data_from_api, [
+        ("IndiGo", "06:05", "07:25", "4310"), ("SpiceJet", "12:30", "13:45", "4875")]),
+    "expedia": (expedia_data_extraction.extract_flight_data_from_api, [
+        ("IndiGo", "6:05am", "7:25am", "Rs4,402"), ("Air India", "9:40am", "4:50pm", "Rs7,915")]),
+}
+
+
+def payload(provider):
+    with open(os.path.join(FIXTURE_DIR, f"{provider}_api.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("provider", sorted(PROVIDERS))
+def test_only_the_result_list_is_mapped(provider):
+    # The payloads also hold filters, sort options and fare calendars with flight-like keys
+    extract, expected = PROVIDERS[provider]
+    records = extract([payload(provider)])
+    assert [(r["Airline"], r["Departure_Time"], r["Arrival_Time"], r["Price"]) for r in records] == expected
+
+
+def test_a_flight_in_several_payloads_is_kept_once():
+    extract, expected = PROVIDERS["mmt"]
+    records = extract([payload("mmt"), payload("mmt")])
+    assert len(records) == len(expected)
+    assert records[0]["Offers"] == "Get Rs 250 off with MMTSUPER" and records[1]["Offers"] == "N/A"
+
+
+def test_results_without_a_required_field_are_skipped():
+    results = {"cardList": [{"airlineName": "IndiGo", "depTime": "06:05", "arrTime": "07:25"}]}
+    assert mmt_data_extraction.extract_flight_data_from_api([results]) == []
+
+
+def test_result_paths_step_into_lists():
+    payload = {"data": {"results": [{"flights": [{"id": 1}, "ad"]}, {"flights": [{"id": 2}]}, {"other": []}]}}
+    assert list(iter_results(payload, "data.results.*.flights")) == [{"id": 1}, {"id": 2}]
+    assert list(iter_results(payload, "data.missing")) == []
+    assert map_api_records([payload], ["data.results.*.flights"], {"id": ["id"]}, ("id",)) == [{"id": "1"}, {"id": "2"}]
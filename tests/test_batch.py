@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+
+import flight_search_server as server
+from scrapper.batch import BatchCheckpoint, query_id
+from scrapper.provider_stats import ProviderStats
+
+LKO_DEL = {"origin": "LKO", "destination": "DEL", "travel_date": "18/11/2025", "source": ["mmt", "ixigo"]}
+LKO_BOM = {"origin": "LKO", "destination": "BOM", "travel_date": "18/11/2025", "source": ["mmt", "ixigo"]}
+
+
+class FakeSearch:
+    """Stands in for search_provider; ``statuses[(key, destination)]`` lists the statuses of successive calls."""
+
+    def __init__(self, statuses=None):
+        self.statuses = {key: list(values) for key, values in (statuses or {}).items()}
+        self.calls = []
+
+    async def __call__(self, key, origin, destination, travel_date, request_id, priority=None):
+        self.calls.append((key, destination))
+        queued = self.statuses.get((key, destination))
+        status = queued.pop(0) if queued else "ok"
+        flights = [{"Airline": "IndiGo", "Price": "₹ 4,123", "provider": key}] if status == "ok" else []
+        return flights, {"status": status}
+
+
+@pytest.fixture
+def search(monkeypatch):
+    fake = FakeSearch()
+    monkeypatch.setattr(server, "search_provider", fake)
+    monkeypatch.setattr(server, "provider_stats", ProviderStats())
+    return fake
+
+
+def qid(query):
+    return query_id(query["origin"], query["destination"], query["travel_date"], query["source"])
+
+
+def records(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def run(queries, path, **options):
+    return asyncio.run(server.run_batch(queries, str(path), **options))
+
+
+def test_checkpoint_skips_written_queries_but_not_failed_ones(tmp_path):
+    path = tmp_path / "batch.jsonl"
+    path.write_text(json.dumps({"query_id": "a"}) + "\n" + json.dumps({"query_id": "b", "error": "x"}) + "\n"
+                    + '{"query_id": "c", "fli', encoding="utf-8")
+    checkpoint = BatchCheckpoint(str(path))
+    checkpoint.write({"query_id": "d"})
+    checkpoint.close()
+    assert checkpoint.done == {"a", "d"}
+    # The line cut short by a crash is closed off, so the new record stays readable
+    assert path.read_text(encoding="utf-8").splitlines()[-1] == '{"query_id": "d"}'
+
+
+def test_resume_skips_queries_already_written(search, tmp_path):
+    path = tmp_path / "batch.jsonl"
+    path.write_text(json.dumps({"query_id": qid(LKO_DEL), "flights": []}) + "\n", encoding="utf-8")
+    summary = run([LKO_DEL, LKO_BOM], path)
+    assert sorted(search.calls) == [("ixigo", "BOM"), ("mmt", "BOM")]
+    assert (summary["completed"], summary["already_done"]) == (1, 1)
+
+
+def test_queries_written_with_an_error_run_again(search, tmp_path):
+    path = tmp_path / "batch.jsonl"
+    path.write_text(json.dumps({"query_id": qid(LKO_DEL), "error": "no provider returned results"}) + "\n",
+                    encoding="utf-8")
+    summary = run([LKO_DEL], path)
+    assert sorted(search.calls) == [("ixigo", "DEL"), ("mmt", "DEL")]
+    assert (summary["completed"], summary["already_done"]) == (1, 0)
+    assert "error" not in records(path)[-1]
+
+
+def test_a_query_cut_short_by_a_crash_runs_again(search, tmp_path):
+    path = tmp_path / "batch.jsonl"
+    path.write_text(json.dumps({"query_id": qid(LKO_DEL)}) + "\n" + '{"query_id": "%s", "fli' % qid(LKO_BOM),
+                    encoding="utf-8")
+    summary = run([LKO_DEL, LKO_BOM], path)
+    assert sorted(search.calls) == [("ixigo", "BOM"), ("mmt", "BOM")]
+    assert (summary["completed"], summary["already_done"]) == (1, 1)
+    assert json.loads(path.read_text(encoding="utf-8").splitlines()[-1])["query_id"] == qid(LKO_BOM)
+
+
+def test_failed_searches_are_retried(search, tmp_path):
+    search.statuses = {("mmt", "DEL"): ["timeout", "ok"], ("ixigo", "DEL"): ["error", "error"]}
+    path = tmp_path / "batch.jsonl"
+    run([LKO_DEL], path, retries=1)
+    assert search.calls.count(("mmt", "DEL")) == 2 and search.calls.count(("ixigo", "DEL")) == 2
+    [record] = records(path)
+    assert {key: status["status"] for key, status in record["providers"].items()} == {"mmt": "ok", "ixigo": "error"}
+    assert "error" not in record
+
+
+def test_summary_counts(search, tmp_path):
+    search.statuses = {("mmt", "BOM"): ["error", "error"], ("ixigo", "BOM"): ["rate_limited", "rate_limited"]}
+    path = tmp_path / "batch.jsonl"
+    invalid = {"origin": "LKO", "destination": "DEL", "travel_date": "not a date"}
+    summary = run([LKO_DEL, LKO_BOM, LKO_DEL, invalid], path, retries=1)
+    assert {key: summary[key] for key in ("completed", "already_done", "invalid", "unfinished", "flights")} == {
+        "completed": 2, "already_done": 0, "invalid": 1, "unfinished": 0, "flights": 2}
+    assert [record.get("error") for record in records(path)] == [None, "no provider returned results"]
+
+
+def test_a_single_source_string_selects_that_provider(search, tmp_path):
+    run([dict(LKO_DEL, source="mmt")], tmp_path / "batch.jsonl")
+    assert search.calls == [("mmt", "DEL")]
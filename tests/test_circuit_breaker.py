@@ -0,0 +1,103 @@
+from scrapper.circuit_breaker import (BREAKER_MAX_OPEN_SECONDS, CLOSED, EMPTY, FAILURE, HALF_OPEN, OPEN, SUCCESS,
+                                      CircuitBreaker, CircuitBreakers)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def breaker(clock, **options):
+    options = {"window": 10, "min_calls": 4, "error_rate": 0.5, "empty_rate": 0.8, "open_seconds": 60,
+               **options}
+    return CircuitBreaker("mmt", clock=clock, **options)
+
+
+def record(breaker, *outcomes):
+    for outcome in outcomes:
+        assert breaker.allow()
+        breaker.record(outcome)
+
+
+def test_opens_on_error_rate_once_there_are_enough_calls():
+    b = breaker(FakeClock())
+    record(b, FAILURE, FAILURE, SUCCESS)
+    assert b.state == CLOSED  # under min_calls
+    record(b, SUCCESS)
+    assert b.state == OPEN
+    assert "50% of the last 4 searches failed" in b.reason
+    assert not b.allow()
+
+
+def test_opens_on_empty_rate():
+    b = breaker(FakeClock())
+    record(b, EMPTY, EMPTY, EMPTY, SUCCESS)
+    assert b.state == CLOSED  # 75% empty, under 80%
+    record(b, EMPTY)
+    assert b.state == OPEN
+    assert "returned no flights" in b.reason
+
+
+def test_lets_one_probe_through_when_half_open():
+    clock = FakeClock()
+    b = breaker(clock)
+    record(b, FAILURE, FAILURE, FAILURE, FAILURE)
+    clock.now = 59.0
+    assert not b.allow() and b.retry_in() == 1.0
+    clock.now = 60.0
+    assert b.allow()
+    assert b.state == HALF_OPEN
+    assert not b.allow()  # one probe at a time
+    b.record(SUCCESS)
+    assert b.state == CLOSED and b.stats()["calls"] == 0
+    assert b.allow()
+
+
+def test_failed_probes_double_the_open_time_up_to_the_cap():
+    clock = FakeClock()
+    b = breaker(clock, open_seconds=300)
+    record(b, FAILURE, FAILURE, FAILURE, FAILURE)
+    opened = []
+    for _ in range(3):
+        clock.now += b.open_seconds
+        assert b.allow()
+        b.record(EMPTY)
+        opened.append(b.open_seconds)
+    assert opened == [600, BREAKER_MAX_OPEN_SECONDS, BREAKER_MAX_OPEN_SECONDS]
+    assert b.state == OPEN
+    clock.now += b.open_seconds
+    assert b.allow()
+    b.record(SUCCESS)
+    assert b.open_seconds == 300  # back to the base after it closes
+
+
+def test_abandon_frees_the_probe_without_an_outcome():
+    clock = FakeClock()
+    b = breaker(clock)
+    record(b, FAILURE, FAILURE, FAILURE, FAILURE)
+    clock.now = 60.0
+    assert b.allow()
+    b.abandon()
+    assert b.state == HALF_OPEN
+    assert b.allow()  # the next search may probe
+    b.record(SUCCESS)
+    assert b.state == CLOSED
+
+
+def test_abandon_leaves_a_closed_breaker_alone():
+    b = breaker(FakeClock())
+    record(b, SUCCESS)
+    b.abandon()
+    assert (b.state, b.stats()["calls"]) == (CLOSED, 1)
+
+
+def test_breakers_are_created_per_provider_with_shared_options():
+    clock = FakeClock()
+    breakers = CircuitBreakers(clock=clock, min_calls=1)
+    breakers.get("mmt").record(FAILURE)
+    assert breakers.get("mmt").state == OPEN
+    assert breakers.get("ixigo").state == CLOSED
+    assert set(breakers.stats()) == {"mmt", "ixigo"}
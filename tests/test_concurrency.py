@@ -0,0 +1,24 @@
+from scrapper.concurrency import AdaptiveLimiter
+
+
+class CountingProbe:
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.values[min(self.calls, len(self.values)) - 1]
+
+
+def test_stats_reads_each_probe_once():
+    memory, load = CountingProbe(2048.4, 100.0), CountingProbe(0.5, 3.0)
+    limiter = AdaptiveLimiter(memory_probe=memory, load_probe=load)
+    stats = limiter.stats()
+    assert (stats["free_memory_mb"], stats["load_per_cpu"]) == (2048, 0.5)
+    assert (memory.calls, load.calls) == (1, 1)
+
+
+def test_stats_without_probes():
+    stats = AdaptiveLimiter(memory_probe=None, load_probe=None).stats()
+    assert (stats["free_memory_mb"], stats["load_per_cpu"]) == (None, None)
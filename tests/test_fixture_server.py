@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+import pytest
+
+from scrapper.expedia import data_extraction as expedia_data_extraction
+from scrapper.expedia import expedia_http
+from scrapper.fares import parse_price
+from scrapper.fixture_server import serve_fixtures
+from scrapper.ixigo import data_extraction as ixigo_data_extraction
+from scrapper.ixigo import ixigo_http
+from scrapper.mmt import data_extraction as mmt_data_extraction
+from scrapper.mmt import mmt_http
+
+# provider -> (fetch module, parse_flight_data, travel date in the provider's format, flights in its fixture)
+PROVIDERS = {
+    "mmt": (mmt_http, mmt_data_extraction.parse_flight_data, "18/11/2025", 15),
+    "ixigo": (ixigo_http, ixigo_data_extraction.parse_flight_data, "25122025", 3),
+    "expedia": (expedia_http, expedia_data_extraction.parse_flight_data, "02/01/2026", 14),
+}
+
+
+@pytest.fixture(scope="module")
+def fixture_url():
+    server = serve_fixtures()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+async def fetch(module, travel_date):
+    async with httpx.AsyncClient() as client:
+        return await module.fetch_data("LKO", "DEL", travel_date, request_id="test", client=client)
+
+
+@pytest.mark.parametrize("provider", sorted(PROVIDERS))
+def test_http_fetch_parses_fixture_page(provider, fixture_url, monkeypatch):
+    module, parse, travel_date, expected = PROVIDERS[provider]
+    monkeypatch.setattr(module, "BASE_URL", fixture_url)
+    result = asyncio.run(fetch(module, travel_date))
+    assert result.provider == provider
+    assert result.pages and not result.api_payloads
+    flights = parse(result)
+    assert len(flights) == expected
+    assert all(parse_price(flight["Price"]) for flight in flights)
+
+
+def test_unknown_path_is_not_found(fixture_url):
+    response = httpx.get(f"{fixture_url}/nowhere")
+    assert response.status_code == 404
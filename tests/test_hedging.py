@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from scrapper.hedging import Hedger
+
+
+def hedger(*latencies, **options):
+    options = {"percentile": 90, "min_samples": 3, "min_delay": 0.05, **options}
+    h = Hedger(**options)
+    for seconds in latencies:
+        h.record("mmt", seconds)
+    return h
+
+
+class Attempts:
+    """Coroutine factory whose n-th call queues ``queue[n]`` seconds, then scrapes for ``scrape[n]``."""
+
+    def __init__(self, scrape, queue=None):
+        self.scrape = scrape
+        self.queue = queue or [0] * len(scrape)
+        self.started = 0
+        self.cancelled = []
+
+    async def _attempt(self, n, on_admitted):
+        try:
+            await asyncio.sleep(self.queue[n])
+            on_admitted()
+            await asyncio.sleep(self.scrape[n])
+            return f"attempt {n}"
+        except asyncio.CancelledError:
+            self.cancelled.append(n)
+            raise
+
+    def __call__(self, on_admitted):
+        self.started += 1
+        return self._attempt(self.started - 1, on_admitted)
+
+
+def test_delay_is_the_latency_percentile_once_there_is_enough_history():
+    assert hedger(1.0, 2.0).delay("mmt") is None
+    assert hedger(*[i / 10 for i in range(1, 11)]).delay("mmt") == 1.0
+    assert hedger(*[i / 10 for i in range(1, 11)], percentile=50).delay("mmt") == 0.6
+    assert hedger(0.01, 0.01, 0.01).delay("mmt") == 0.05  # min_delay
+
+
+def test_a_slow_primary_is_hedged_and_loses():
+    h = hedger(0.05, 0.05, 0.05)
+    attempts = Attempts(scrape=[10, 0.01])
+    assert asyncio.run(h.run("mmt", attempts)) == "attempt 1"
+    assert attempts.cancelled == [0]
+    assert (h.hedged["mmt"], h.won["mmt"]) == (1, 1)
+
+
+def test_the_primary_wins_when_it_returns_first():
+    h = hedger(0.05, 0.05, 0.05)
+    attempts = Attempts(scrape=[0.1, 10])
+    assert asyncio.run(h.run("mmt", attempts)) == "attempt 0"
+    assert attempts.cancelled == [1]
+    assert (h.hedged["mmt"], h.won["mmt"]) == (1, 0)
+
+
+def test_latency_and_the_hedge_delay_run_from_admission():
+    h = hedger(0.1, 0.1, 0.1)
+    attempts = Attempts(scrape=[0.05], queue=[0.3])
+    assert asyncio.run(h.run("mmt", attempts)) == "attempt 0"
+    assert attempts.started == 1  # 0.35s in total, but only 0.05s of it after the slot
+    assert h._latencies["mmt"][-1] == pytest.approx(0.05, abs=0.04)
+
+
+def test_no_hedge_while_searches_are_queued():
+    h = hedger(0.05, 0.05, 0.05)
+    attempts = Attempts(scrape=[0.2])
+    assert asyncio.run(h.run("mmt", attempts, busy=lambda: True)) == "attempt 0"
+    assert attempts.started == 1
+    assert (h.hedged["mmt"], h.skipped["mmt"]) == (0, 1)
@@ -0,0 +1,48 @@
+import glob
+import os
+
+import pytest
+
+from scrapper import html_backend
+from scrapper.expedia import data_extraction as expedia_data_extraction
+from scrapper.html_backend import BACKENDS, parse_html, resolve_backend
+from scrapper.ixigo import data_extraction as ixigo_data_extraction
+from scrapper.mmt import data_extraction as mmt_data_extraction
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "scrapper", "ss", "*.html")))
+EXTRACTORS = {
+    "mmt": mmt_data_extraction.extract_flight_data,
+    "ixigo": lambda html, backend: ixigo_data_extraction.extract_flight_data(html, 0, backend),
+    "expedia": expedia_data_extraction.extract_flight_data,
+}
+INSTALLED = [backend for backend in BACKENDS if backend != "html.parser" and resolve_backend(backend) == backend]
+
+
+@pytest.mark.skipif(not INSTALLED, reason="only html.parser is installed")
+@pytest.mark.parametrize("fixture", FIXTURES, ids=os.path.basename)
+@pytest.mark.parametrize("provider", sorted(EXTRACTORS))
+def test_backends_extract_the_same_records(provider, fixture):
+    with open(fixture, "r", encoding="utf-8") as f:
+        html = f.read()
+    extract = EXTRACTORS[provider]
+    expected = extract(html, "html.parser")
+    for backend in INSTALLED:
+        assert extract(html, backend) == expected, backend
+
+
+@pytest.mark.skipif(html_backend.LexborHTMLParser is None, reason="selectolax is not installed")
+def test_lexbor_class_matching_follows_beautifulsoup():
+    html = ('<div class="card  cheap"><p class="a b">x</p><p class="b a">y</p><p class="a">z</p></div>'
+            '<span data-id="1">\n  <b>w</b>  </span>')
+    lexbor, soup = parse_html(html, "selectolax"), parse_html(html, "html.parser")
+    for name, attrs, class_ in [("p", None, "a"), ("p", None, "a b"), ("div", None, "card cheap"),
+                                ("span", {"data-id": "1"}, None)]:
+        assert ([node.text for node in lexbor.find_all(name, attrs, class_)]
+                == [node.text for node in soup.find_all(name, attrs, class_=class_)])
+
+
+def test_auto_picks_the_fastest_installed_backend():
+    assert resolve_backend("auto") == next(backend for backend in BACKENDS if resolve_backend(backend) == backend)
+    assert resolve_backend("html.parser") == "html.parser"
+    with pytest.raises(ValueError):
+        resolve_backend("html5lib")
@@ -0,0 +1,48 @@
+from scrapper.itineraries import rank_itineraries
+
+
+def flight(departs, arrives, price, airline="IndiGo", provider="mmt"):
+    return {"Airline": airline, "Departure_Time": departs, "Arrival_Time": arrives, "Price": f"₹ {price:,}",
+            "provider": provider}
+
+
+def totals(itineraries):
+    return [itinerary["total_price"] for itinerary in itineraries]
+
+
+def test_itineraries_are_ranked_by_total_price():
+    outbound = [flight("06:00", "08:00", 5000), flight("09:00", "11:00", 4000, "Vistara")]
+    inbound = [flight("18:00", "20:00", 3000), flight("19:00", "21:00", 3500, "Vistara")]
+    itineraries = rank_itineraries([outbound, inbound], ["18/11/2025", "25/11/2025"], limit=3)
+    assert totals(itineraries) == [7000, 7500, 8000]
+    assert [leg["Airline"] for leg in itineraries[0]["legs"]] == ["Vistara", "IndiGo"]
+
+
+def test_a_flight_listed_by_several_providers_is_kept_once_at_its_lowest_fare():
+    outbound = [flight("06:00", "08:00", 5200, provider="mmt"), flight("06:00", "08:00", 4900, provider="ixigo"),
+                flight("06:00", "08:00", 5100, provider="expedia")]
+    inbound = [flight("18:00", "20:00", 3000)]
+    itineraries = rank_itineraries([outbound, inbound], ["18/11/2025", "25/11/2025"])
+    assert totals(itineraries) == [7900]
+    assert itineraries[0]["legs"][0]["provider"] == "ixigo"
+
+
+def test_same_day_legs_must_leave_time_to_connect():
+    # The first leg lands at 08:00; the cheap second legs all leave too soon after
+    first = [flight("06:00", "08:00", 5000)]
+    second = [flight(f"07:0{i}", "09:00", 3000 + i) for i in range(8)] + [flight("12:00", "14:00", 6000)]
+    itineraries = rank_itineraries([first, second], ["18/11/2025", "18/11/2025"])
+    assert totals(itineraries) == [11000]
+    assert itineraries[0]["legs"][1]["Departure_Time"] == "12:00"
+
+
+def test_a_leg_landing_the_next_day_does_not_connect_on_the_same_day():
+    first = [flight("23:00", "01:30", 5000)]
+    second = [flight("09:00", "11:00", 3000)]
+    assert rank_itineraries([first, second], ["18/11/2025", "18/11/2025"]) == []
+    assert totals(rank_itineraries([first, second], ["18/11/2025", "19/11/2025"])) == [8000]
+
+
+def test_a_leg_without_priced_flights_gives_no_itineraries():
+    assert rank_itineraries([[flight("06:00", "08:00", 5000)], [{"Airline": "IndiGo", "Price": None}]],
+                            ["18/11/2025", "25/11/2025"]) == []
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+import flight_search_server as server
+from scrapper.jobs import CANCELLED, DONE, FAILED, PENDING, RUNNING, JobStore, SearchJob, TooManyJobs
+from scrapper.provider_stats import ProviderStats
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSearch:
+    """Stands in for search_provider; each provider returns one flight once its event is set."""
+
+    def __init__(self, *providers):
+        self.release = {key: asyncio.Event() for key in providers}
+
+    async def __call__(self, key, origin, destination, travel_date, request_id, hedge=False, priority=None):
+        await self.release[key].wait()
+        return [{"Airline": "IndiGo", "Price": "₹ 4,123", "provider": key}], {"status": "ok", "flights": 1}
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(server, "provider_stats", ProviderStats())
+
+
+def job(store, job_id="j1", providers=("mmt", "ixigo")):
+    return store.create(job_id, {"origin": "LKO", "destination": "DEL"}, list(providers))
+
+
+def test_a_job_reports_partial_flights_while_running_and_all_when_done(monkeypatch):
+    async def run():
+        search = FakeSearch("mmt", "ixigo")
+        monkeypatch.setattr(server, "search_provider", search)
+        submitted = job(JobStore())
+        assert submitted.state == PENDING
+        submitted.task = asyncio.ensure_future(server.run_search_job(
+            submitted, ["mmt", "ixigo"], "LKO", "DEL", "18/11/2025", adaptive=False, hedge=False, deadline_ms=0))
+        search.release["mmt"].set()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        partial = (submitted.state, [flight["provider"] for flight in submitted.flights],
+                   {key: status["status"] for key, status in submitted.providers.items()})
+        search.release["ixigo"].set()
+        await submitted.task
+        return partial, submitted
+
+    partial, finished = asyncio.run(run())
+    assert partial == (RUNNING, ["mmt"], {"mmt": "ok", "ixigo": "running"})
+    assert finished.state == DONE and finished.finished is not None
+    assert [flight["provider"] for flight in finished.flights] == ["mmt", "ixigo"]
+    assert finished.status()["flights_ready"] == 2
+
+
+def test_a_cancelled_job_is_marked_cancelled(monkeypatch):
+    async def run():
+        monkeypatch.setattr(server, "search_provider", FakeSearch("mmt"))
+        submitted = job(JobStore(), providers=["mmt"])
+        submitted.task = asyncio.ensure_future(server.run_search_job(
+            submitted, ["mmt"], "LKO", "DEL", "18/11/2025", adaptive=False, hedge=False, deadline_ms=0))
+        await asyncio.sleep(0)
+        submitted.task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await submitted.task
+        return submitted
+
+    cancelled = asyncio.run(run())
+    assert (cancelled.state, cancelled.error) == (CANCELLED, "search was cancelled")
+    assert not cancelled.active
+
+
+def test_a_failed_search_is_marked_failed(monkeypatch):
+    async def broken(*args, **kwargs):
+        raise RuntimeError("registry is broken")
+
+    monkeypatch.setattr(server, "search_providers", broken)
+    failed = job(JobStore(), providers=["mmt"])
+    asyncio.run(server.run_search_job(failed, ["mmt"], "LKO", "DEL", "18/11/2025", False, False, 0))
+    assert (failed.state, failed.status()["error"]) == (FAILED, "registry is broken")
+
+
+def test_too_many_outstanding_jobs_are_refused():
+    store = JobStore(max_jobs=2)
+    first, _ = job(store, "j1"), job(store, "j2")
+    with pytest.raises(TooManyJobs):
+        job(store, "j3")
+    first.finish({})
+    assert job(store, "j3").state == PENDING  # finished jobs do not count
+
+
+def test_finished_jobs_are_dropped_after_the_ttl():
+    clock = FakeClock()
+    store = JobStore(ttl=60, clock=clock)
+    finished, running = job(store, "j1"), job(store, "j2")
+    clock.now = 10.0
+    finished.finish({})
+    running.progress("mmt", [], {"status": "running"})
+    clock.now = 70.0
+    assert store.get("j1") is finished
+    clock.now = 70.1
+    assert store.get("j1") is None
+    assert store.get("j2") is running  # still running, kept however old
+    assert store.stats() == {"jobs": 1, "max_outstanding": store.max_jobs, "states": {RUNNING: 1}}
+
+
+def test_status_reports_elapsed_time_on_the_jobs_clock():
+    clock = FakeClock()
+    search = SearchJob("j1", {"origin": "LKO"}, ["mmt"], clock=clock)
+    clock.now = 2.5
+    assert search.status() == {"job_id": "j1", "state": PENDING, "elapsed_s": 2.5, "flights_ready": 0,
+                               "providers": {"mmt": {"status": "pending"}}, "origin": "LKO"}
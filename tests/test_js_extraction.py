@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+
+from page_dom import NODE, run_scripts
+from scrapper.expedia import data_extraction as expedia_data_extraction
+from scrapper.ixigo import data_extraction as ixigo_data_extraction
+from scrapper.ixigo import ixigo_scrap
+from scrapper.mmt import data_extraction as mmt_data_extraction
+
+SS_DIR = os.path.join(os.path.dirname(__file__), "..", "scrapper", "ss")
+
+# provider -> (in-page extractor script, Python parser, saved results page -> flights on it)
+EXTRACTORS = {
+    "mmt": (mmt_data_extraction.BROWSER_EXTRACT_SCRIPT, mmt_data_extraction.extract_flight_data,
+            {"mmt1_res.html": 15}),
+    "ixigo": (ixigo_data_extraction.BROWSER_EXTRACT_SCRIPT,
+              lambda html: ixigo_data_extraction.extract_flight_data(html, 0),
+              {"mmt_res.html": 3, "mmt_res_0.html": 0}),
+    "expedia": (expedia_data_extraction.BROWSER_EXTRACT_SCRIPT, expedia_data_extraction.extract_flight_data,
+                {"mmt_res_expedia.html": 14}),
+}
+
+pytestmark = pytest.mark.skipif(NODE is None, reason="Node.js is needed to run the in-page scripts")
+
+
+def read_fixture(name):
+    with open(os.path.join(SS_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("provider,fixture", [(provider, fixture) for provider, (_, _, fixtures)
+                                              in sorted(EXTRACTORS.items()) for fixture in fixtures])
+def test_browser_extractor_matches_parser(provider, fixture):
+    script, extract, fixtures = EXTRACTORS[provider]
+    html = read_fixture(fixture)
+    [records] = run_scripts(html, [script])
+    records = json.loads(records)
+    assert len(records) == fixtures[fixture]
+    assert records == extract(html)
+
+
+def flaky(extract_card, failures):
+    """Card extractor that throws on its first ``failures`` calls (a card caught half-rendered)."""
+    return ("(function () { var inner = %s; return function (card, state) {"
+            " window.__extractCalls = (window.__extractCalls || 0) + 1;"
+            " if (window.__extractCalls <= %d) { throw new Error('half rendered'); }"
+            " return inner(card, state); }; })()" % (extract_card.strip(), failures))
+
+
+def test_ixigo_collect_retries_cards_that_failed_to_extract():
+    script = ixigo_scrap.build_collect_script(flaky(ixigo_data_extraction.BROWSER_EXTRACT_CARD, 1))
+    html = read_fixture("mmt_res.html")
+    first, second, third = [json.loads(batch) for batch in
+                            run_scripts(html, [ixigo_scrap.RESET_CARDS_SCRIPT, script, script, script])[1:]]
+    assert (len(first["cards"]), first["failed"]) == (2, 1)
+    assert (len(second["cards"]), second["failed"]) == (1, 0)
+    assert (third["cards"], third["failed"]) == ([], 0)
+    # The retried card arrives one call later, so compare regardless of order
+    by_flight = lambda record: record["flight_no"]
+    assert sorted(first["cards"] + second["cards"], key=by_flight) == sorted(EXTRACTORS["ixigo"][1](html),
+                                                                            key=by_flight)
+
+
+def test_ixigo_collect_starts_over_after_reset():
+    script = ixigo_scrap.EXTRACT_NEW_CARDS_SCRIPT
+    html = read_fixture("mmt_res.html")
+    batches = [json.loads(batch) for batch in run_scripts(
+        html, [ixigo_scrap.RESET_CARDS_SCRIPT, script, script, ixigo_scrap.RESET_CARDS_SCRIPT, script])
+        if batch is not True]
+    assert [len(batch["cards"]) for batch in batches] == [3, 0, 3]
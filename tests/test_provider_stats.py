@@ -0,0 +1,60 @@
+from scrapper.provider_stats import ProviderStats
+
+ROUTE = "DEL-BOM"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def flights(count, price=5000):
+    return [{"Price": f"₹ {price + i:,}"} for i in range(count)]
+
+
+def ok(count, scrape_s, price=5000, **status):
+    return flights(count, price), {"status": "ok", "flights": count, "scrape_s": scrape_s, **status}
+
+
+def stats_for(clock, searches, **options):
+    """``searches`` maps provider -> (flights, scrape_s[, price]), recorded three times."""
+    options = {"min_flights": 15, "min_samples": 3, "stale_seconds": 3600, "cheapest_share": 0.3, **options}
+    stats = ProviderStats(clock=clock, **options)
+    for _ in range(3):
+        stats.record_search(ROUTE, {provider: ok(*search) for provider, search in searches.items()})
+    return stats
+
+
+def test_latency_comes_from_the_scrape_time_and_cached_results_are_skipped():
+    stats = ProviderStats(clock=FakeClock())
+    stats.record_search(ROUTE, {
+        "mmt": ok(10, 2.0, elapsed_s=9.0),
+        "ixigo": ok(10, 1.0, cached=True),
+        "expedia": ([], {"status": "rate_limited", "detail": "no token"}),
+    })
+    assert stats.get("mmt", ROUTE).latency == 2.0
+    assert stats.get("ixigo", ROUTE) is None
+    assert stats.get("expedia", ROUTE) is None
+
+
+def test_new_and_stale_providers_go_first():
+    clock = FakeClock()
+    stats = stats_for(clock, {"mmt": (20, 1.0), "ixigo": (20, 2.0, 6000)})
+    assert stats.plan(["mmt", "ixigo", "expedia"], ROUTE) == (["expedia", "mmt"], ["ixigo"])
+    clock.now = 3601.0
+    assert stats.plan(["mmt", "ixigo"], ROUTE) == (["mmt", "ixigo"], [])
+
+
+def test_first_wave_fills_up_to_min_flights_fastest_first():
+    stats = stats_for(FakeClock(), {"mmt": (10, 3.0, 6000), "ixigo": (10, 1.0, 6000), "expedia": (10, 2.0, 5000)})
+    # ixigo and expedia (fastest) expect 20 flights, enough for min_flights=15
+    assert stats.plan(["mmt", "ixigo", "expedia"], ROUTE) == (["ixigo", "expedia"], ["mmt"])
+
+
+def test_a_provider_often_cheapest_is_kept_past_min_flights():
+    stats = stats_for(FakeClock(), {"mmt": (10, 3.0, 4000), "ixigo": (10, 1.0, 6000), "expedia": (10, 2.0, 6000)})
+    assert stats.get("mmt", ROUTE).cheapest_share == 1.0
+    assert stats.plan(["mmt", "ixigo", "expedia"], ROUTE) == (["ixigo", "expedia", "mmt"], [])
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from scrapper.rate_limit import ProviderRateLimiter, RateLimited, TokenBucket
+
+
+class FakeClock:
+    """Clock and sleep for TokenBucket: sleeping only advances the fake time."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_tokens_refill_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=0.5, burst=2, clock=clock, sleep=clock.sleep)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    clock.now = 1.0
+    assert not bucket.try_acquire()  # half a token so far
+    clock.now = 2.0
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_refill_is_capped_at_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=3, clock=clock, sleep=clock.sleep)
+    assert bucket.try_acquire()
+    clock.now = 1000.0
+    assert bucket.stats()["tokens"] == 3
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_waits_grow_in_arrival_order_under_contention():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=0.5, burst=1, max_wait=30, clock=clock, sleep=clock.sleep)
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 2.0, 4.0, 6.0]
+    assert bucket.stats()["granted"] == 4
+
+
+def test_requests_past_max_wait_are_shed():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=0.5, burst=1, max_wait=3, clock=clock, sleep=clock.sleep)
+    bucket.reserve()
+    assert bucket.reserve() == 2.0
+    with pytest.raises(RateLimited):
+        bucket.reserve()
+    assert bucket.stats()["shed"] == 1
+    clock.now = 3.0  # the queued reservation has been paid off and half the next token
+    assert bucket.reserve() == 1.0
+
+
+def test_acquire_sleeps_until_the_token_is_due():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=1, clock=clock, sleep=clock.sleep)
+
+    async def acquire_three():
+        for _ in range(3):
+            await bucket.acquire()
+
+    asyncio.run(acquire_three())
+    assert clock.sleeps == [0.5, 0.5]
+    assert clock.now == 1.0
+
+
+def test_cancelled_acquire_hands_its_token_back():
+    clock = FakeClock()
+
+    async def never(seconds):
+        await asyncio.Event().wait()
+
+    bucket = TokenBucket(rate=1, burst=1, clock=clock, sleep=never)
+
+    async def cancel_waiter():
+        await bucket.acquire()
+        waiter = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(cancel_waiter())
+    assert bucket.stats()["tokens"] == 0
+    assert bucket.stats()["granted"] == 1
+
+
+def test_provider_limits_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("FLIGHT_RATE_MMT", "2")
+    monkeypatch.setenv("FLIGHT_BURST_MMT", "5")
+    clock = FakeClock()
+    limiter = ProviderRateLimiter(limits={"ixigo": (0.1, 1)}, clock=clock, sleep=clock.sleep)
+    assert (limiter.bucket("mmt").rate, limiter.bucket("mmt").burst) == (2.0, 5.0)
+    assert (limiter.bucket("ixigo").rate, limiter.bucket("ixigo").burst) == (0.1, 1.0)
+    assert limiter.bucket("mmt") is limiter.bucket("mmt")
+
+
+def test_spare_tokens_are_only_taken_from_a_full_bucket():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=0.5, burst=2, clock=clock, sleep=clock.sleep)
+    assert bucket.try_acquire_spare()
+    assert not bucket.try_acquire_spare()  # one token left for other searches
+    clock.now = 2.0
+    assert bucket.try_acquire_spare()
+
+
+def test_spare_only_acquire_never_waits():
+    clock = FakeClock()
+    limiter = ProviderRateLimiter(limits={"mmt": (0.5, 2)}, clock=clock, sleep=clock.sleep)
+
+    async def acquire():
+        await limiter.acquire("mmt")
+        await limiter.acquire("mmt", spare_only=True)
+
+    with pytest.raises(RateLimited, match="no spare capacity"):
+        asyncio.run(acquire())
+    assert clock.sleeps == []
+    assert limiter.stats()["mmt"]["shed"] == 1
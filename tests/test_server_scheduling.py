@@ -0,0 +1,187 @@
+import asyncio
+import itertools
+
+import pytest
+
+import flight_search_server as server
+from scrapper.circuit_breaker import CLOSED, CircuitBreakers
+from scrapper.concurrency import BACKGROUND, BATCH, INTERACTIVE, AdaptiveLimiter
+from scrapper.hedging import Hedger
+from scrapper.rate_limit import ProviderRateLimiter
+
+
+class FakeFetch:
+    """HTTP fetcher that records the order requests start in and holds each until released."""
+
+    def __init__(self):
+        self.started = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, origin, destination, travel_date, request_id=None):
+        self.started.append(request_id)
+        await self.release.wait()
+        return None
+
+
+@pytest.fixture
+def http_provider(monkeypatch):
+    monkeypatch.setitem(server.registry, "mmt", dict(server.registry["mmt"], mode="http"))
+    # Each clock reading is a minute later, so the bucket is always full again
+    monkeypatch.setattr(server, "rate_limiter", ProviderRateLimiter(limits={"mmt": (1, 10)},
+                                                                    clock=itertools.count(0, 60).__next__))
+    monkeypatch.setattr(server, "http_limiter", AdaptiveLimiter(floor=1, ceiling=1, initial=1,
+                                                                memory_probe=None, load_probe=None))
+
+
+def test_http_fetches_are_admitted_by_priority(http_provider):
+    async def run():
+        fetch = FakeFetch()
+        server.registry["mmt"]["fetch"] = fetch
+        scrapes = []
+        for request_id, priority in [("a", BATCH), ("b", BATCH), ("c", BACKGROUND), ("d", INTERACTIVE)]:
+            scrapes.append(asyncio.ensure_future(
+                server.scrape_source("mmt", "LKO", "DEL", "18/11/2025", request_id, priority)))
+            await asyncio.sleep(0)
+        assert fetch.started == ["a-mmt"]
+        assert server.http_limiter.stats()["classes"][BATCH]["queued"] == 1
+        fetch.release.set()
+        await asyncio.gather(*scrapes)
+        return fetch.started
+
+    assert asyncio.run(run()) == ["a-mmt", "d-mmt", "b-mmt", "c-mmt"]
+
+
+async def failing_fetch(origin, destination, travel_date, request_id=None):
+    raise RuntimeError("provider returned 503")
+
+
+def test_failed_prefetches_leave_the_breaker_and_hedger_alone(http_provider, monkeypatch):
+    monkeypatch.setattr(server, "circuit_breakers", CircuitBreakers(min_calls=1))
+    monkeypatch.setattr(server, "hedger", Hedger())
+    server.registry["mmt"]["fetch"] = failing_fetch
+
+    async def run():
+        return [await server.prefetch_route("mmt", "LKO", "DEL", "18/11/2025") for _ in range(3)]
+
+    assert asyncio.run(run()) == [False, False, False]
+    breaker = server.circuit_breakers.get("mmt")
+    assert (breaker.state, breaker.stats()["calls"]) == (CLOSED, 0)
+    assert server.hedger.stats() == {}
+
+
+def test_prefetch_waits_for_a_full_rate_limit_bucket(http_provider, monkeypatch):
+    monkeypatch.setattr(server, "rate_limiter", ProviderRateLimiter(limits={"mmt": (0.001, 2)}))
+    monkeypatch.setattr(server, "result_cache", server.ResultCache())
+
+    async def run():
+        fetch = FakeFetch()
+        fetch.release.set()
+        server.registry["mmt"]["fetch"] = fetch
+        await server.scrape_source("mmt", "LKO", "DEL", "18/11/2025", "live")
+        refreshed = await server.prefetch_route("mmt", "LKO", "DEL", "18/11/2025")
+        return refreshed, fetch.started
+
+    assert asyncio.run(run()) == (False, ["live-mmt"])
+    assert server.rate_limiter.stats()["mmt"]["tokens"] == pytest.approx(1, abs=0.01)
+
+
+def test_http_searches_in_flight_are_not_idle_capacity(http_provider):
+    async def run():
+        fetch = FakeFetch()
+        server.registry["mmt"]["fetch"] = fetch
+        scrape = asyncio.ensure_future(server.scrape_source("mmt", "LKO", "DEL", "18/11/2025", "live"))
+        await asyncio.sleep(0)
+        busy = server.prefetcher.is_idle()
+        fetch.release.set()
+        await scrape
+        return busy, server.prefetcher.is_idle()
+
+    assert asyncio.run(run()) == (False, True)
+
+
+def test_rate_limit_tokens_are_taken_once_a_slot_is_granted(http_provider):
+    async def run():
+        fetch = FakeFetch()
+        server.registry["mmt"]["fetch"] = fetch
+        scrapes = [asyncio.ensure_future(server.scrape_source("mmt", "LKO", "DEL", "18/11/2025", request_id))
+                   for request_id in "abc"]
+        await asyncio.sleep(0)
+        granted_while_queued = server.rate_limiter.stats()["mmt"]["granted"]
+        fetch.release.set()
+        await asyncio.gather(*scrapes)
+        return granted_while_queued, server.rate_limiter.stats()["mmt"]["granted"]
+
+    assert asyncio.run(run()) == (1, 3)
+
+
+class SlowFetch:
+    """HTTP fetcher taking ``seconds`` per search."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    async def __call__(self, origin, destination, travel_date, request_id=None):
+        await asyncio.sleep(self.seconds)
+        return request_id
+
+
+def test_time_queued_for_a_slot_does_not_time_out_a_healthy_provider(http_provider, monkeypatch):
+    monkeypatch.setattr(server, "PROVIDER_TIMEOUT", 0.3)
+    monkeypatch.setattr(server, "circuit_breakers", CircuitBreakers())
+    monkeypatch.setattr(server, "result_cache", server.ResultCache())
+    monkeypatch.setitem(server.registry["mmt"], "fetch", SlowFetch(0.2))
+    monkeypatch.setitem(server.registry["mmt"], "parse", lambda scraped: [{"Price": "₹3,732"}])
+
+    async def run():
+        return await asyncio.gather(*[server.search_provider("mmt", "LKO", "DEL", "18/11/2025", f"r{i}")
+                                      for i in range(6)])
+
+    assert [status["status"] for _, status in asyncio.run(run())] == ["ok"] * 6
+    assert server.circuit_breakers.get("mmt").state == CLOSED
+
+
+def test_scrape_time_leaves_out_the_time_queued_for_a_slot(http_provider, monkeypatch):
+    monkeypatch.setattr(server, "circuit_breakers", CircuitBreakers())
+    monkeypatch.setattr(server, "result_cache", server.ResultCache())
+    monkeypatch.setitem(server.registry["mmt"], "fetch", SlowFetch(0.2))
+    monkeypatch.setitem(server.registry["mmt"], "parse", lambda scraped: [{"Price": "₹3,732"}])
+
+    async def run():
+        return await asyncio.gather(*[server.search_provider("mmt", "LKO", "DEL", "18/11/2025", f"r{i}")
+                                      for i in range(3)])
+
+    # The third search waits ~0.4s for the single slot; its scrape still took ~0.2s
+    assert all(0.15 <= status["scrape_s"] < 0.35 for _, status in asyncio.run(run()))
+
+
+def test_a_scrape_running_past_the_timeout_counts_against_the_provider(http_provider, monkeypatch):
+    monkeypatch.setattr(server, "PROVIDER_TIMEOUT", 0.05)
+    monkeypatch.setattr(server, "circuit_breakers", CircuitBreakers())
+    monkeypatch.setattr(server, "result_cache", server.ResultCache())
+    monkeypatch.setitem(server.registry["mmt"], "fetch", SlowFetch(1))
+
+    flights, status = asyncio.run(server.search_provider("mmt", "LKO", "DEL", "18/11/2025", "r"))
+    assert (flights, status["status"]) == ([], "timeout")
+    assert server.circuit_breakers.get("mmt").stats()["error_rate"] == 1.0
+
+
+def test_providers_still_running_at_the_deadline_are_cancelled(http_provider, monkeypatch):
+    monkeypatch.setattr(server, "circuit_breakers", CircuitBreakers())
+    monkeypatch.setattr(server, "result_cache", server.ResultCache())
+    monkeypatch.setitem(server.registry["mmt"], "fetch", SlowFetch(10))
+    monkeypatch.setitem(server.registry["ixigo"], "mode", "http")
+    monkeypatch.setitem(server.registry["ixigo"], "fetch", SlowFetch(0.01))
+    monkeypatch.setitem(server.registry["ixigo"], "parse", lambda scraped: [{"Price": "₹3,732"}])
+    monkeypatch.setattr(server, "http_limiter", AdaptiveLimiter(floor=2, ceiling=2, initial=2,
+                                                                memory_probe=None, load_probe=None))
+
+    async def run():
+        deadline = asyncio.get_running_loop().time() + 0.2
+        return await server.search_providers(["mmt", "ixigo"], "LKO", "DEL", "18/11/2025", "r", deadline=deadline)
+
+    results = asyncio.run(run())
+    assert results["mmt"] == ([], {"status": "cancelled", "detail": "still running at the deadline"})
+    assert results["ixigo"][1]["status"] == "ok"
+    # A cancelled search is not the provider's fault
+    assert server.circuit_breakers.get("mmt").stats()["calls"] == 0
+    assert server.http_limiter.in_flight == 0
@@ -0,0 +1,22 @@
+import pytest
+
+from scrapper.worker_pool import WorkerPool
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(size=1, entry_point="stub_worker:worker_main")
+    yield pool
+    pool.close()
+
+
+def test_jobs_run_in_the_entry_point_process(pool):
+    future = pool.submit("mmt", "LKO", "DEL", "18/11/2025", request_id="r1-mmt")
+    assert future.result(timeout=30) == ("mmt", ("LKO", "DEL", "18/11/2025"), {"request_id": "r1-mmt"})
+    assert pool.stats()["workers"][0]["jobs_done"] == 1
+
+
+def test_worker_errors_fail_the_job(pool):
+    future = pool.submit("broken", "LKO", "DEL", "18/11/2025")
+    with pytest.raises(RuntimeError, match="broken scrape failed in worker 1: RuntimeError: scrape failed"):
+        future.result(timeout=30)